@@ -1,772 +1,3350 @@
-import sys
-import subprocess
-from datetime import datetime
-
-# ============================================
-# Abhängigkeiten prüfen / bei Bedarf installieren
-# ============================================
-
-REQUIRED_MODULES = [
-    ("pandas", "pandas"),
-    ("openpyxl", "openpyxl"),
-    ("numpy", "numpy"),
-    ("colorama", "colorama"),
-]
-
-def ensure_dependencies():
-    print("Prüfe benötigte Python-Module...")
-    for module_name, package_name in REQUIRED_MODULES:
-        try:
-            __import__(module_name)
-        except ImportError:
-            print(f"  Modul '{module_name}' fehlt – installiere '{package_name}'...")
-            try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", package_name])
-                print(f"  → '{package_name}' wurde installiert.")
-            except Exception as e:
-                print(f"  Konnte '{package_name}' nicht installieren: {e}")
-                print("  Bitte manuell installieren und Script erneut starten.")
-                sys.exit(1)
-
-ensure_dependencies()
-
-# ============================================
-# Imports nach erfolgreichem Dependency-Check
-# ============================================
-
-import os
-import shutil
-from pathlib import Path
-
-import pandas as pd
-import numpy as np
-from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.properties import WorksheetProperties, PageSetupProperties
-from colorama import init, Fore, Style
-
-init(autoreset=True)
-
-VERSION = "2.2.7"
-
-#########################################
-# UnivImport.py - 17.12.2025 - m.ludwig #
-#########################################
-
-# Zentrale Master-Version des Scripts auf dem Netzlaufwerk
-UPDATE_SOURCE = r"\\hrl.local\fs\data\MindenBruhns\MBImport\UnivImport\UnivImport.py"
-# Zentrale Master-Version der Artikelstammdaten auf dem Netzlaufwerk
-UPDATE_SOURCE_ARTIKEL = r"\\hrl.local\fs\data\MindenBruhns\MBImport\UnivImport\artikel.xlsx"
-
-# === Einstellungen ===
-INPUT_MB = "Mappe1.xlsx"
-INPUT_NG = "NG.xlsx"
-INPUT_NEF = "NEF.csv"
-OUTPUT_CSV = r"\\hrl.local\fs\data\niederegger\csv\mb\import.csv"
-OUTPUT_XLSX = "import.xlsx"
-
-START_BANNER = r"""
-             **
-            ****
-           ******
-         UnivImport - Universelles Import-Tool Lager 3/4
-           ******
-            ****
-             **
-"""
-
-# Spalten, die wir aus der Originaldatei behalten möchten
-columns_to_keep = [
-    "Artikelnummer",
-    "Benennung",
-    "LHM-Nr.",
-    "Charge",
-    "Menge",
-    "Einheit",
-    "Stelltyp",
-    "MHD",
-    "Gesamtgewicht",
-]
-
-# Ziel-Spaltennamen für den Import
-rename_map = {
-    "Artikelnummer": "Artikel-Nr.",
-    "Benennung": "Artikelbezeichnung",
-    "LHM-Nr.": "LG ID",
-    "Charge": "Charge",
-    "Menge": "Menge PS",
-    "Einheit": "Einheit",
-    "Stelltyp": "Lademittel",
-    "MHD": "MHD",
-    "Gesamtgewicht": "Gewicht kg",
-}
-
-# Mapping-Tabelle für Lademittel
-LADEMITTEL_MAPPING = {
-    "euro": "Euro",
-    "h1": "H1",
-    "industrie": "Industrie",
-    # Erweiterbar
-}
-
-def map_lademittel(value: str) -> str:
-    """Normalisiert 'Lademittel' anhand der Mapping-Tabelle."""
-    if not isinstance(value, str):
-        return ""
-    v = value.lower()
-    for key, target in LADEMITTEL_MAPPING.items():
-        if key in v:
-            return target
-    return ""
-
-def ensure_latest_version():
-    """
-    Prüft, ob auf dem Netzlaufwerk eine neuere UnivImport.py liegt.
-    Wenn ja, wird sie über die lokale Datei kopiert und das Script neu gestartet.
-
-    Zusätzlich: Aktualisiert artikel.xlsx (ohne Neustart), wenn im Netzlaufwerk neuer.
-    """
-    try:
-        local_script_path = Path(__file__).resolve()
-    except NameError:
-        print(Fore.RED + "[Update] Konnte __file__ nicht bestimmen – Update-Check wird übersprungen.")
-        return
-
-    network_script_path = Path(UPDATE_SOURCE)
-
-    # --- 1) Script-Update (wie bisher) ---
-    if network_script_path.exists():
-        try:
-            net_mtime = network_script_path.stat().st_mtime
-            local_mtime = local_script_path.stat().st_mtime
-        except OSError as e:
-            print(Fore.RED + f"[Update] Fehler beim Lesen der Dateizeitstempel (Script): {e}")
-        else:
-            print(Fore.CYAN + f"[Update] Lokales Script : {datetime.fromtimestamp(local_mtime)}")
-            print(Fore.CYAN + f"[Update] Master  Script : {datetime.fromtimestamp(net_mtime)}")
-
-            if net_mtime > local_mtime:
-                try:
-                    shutil.copy2(network_script_path, local_script_path)
-                    print(Fore.GREEN + "\n=== UPDATE DURCHGEFÜHRT (SCRIPT) ===")
-                    print(Fore.GREEN + f"Neue Version von: {network_script_path}")
-                    print(Fore.GREEN + f"Aktualisiert nach: {local_script_path}")
-                    print(Fore.GREEN + "Script wird mit der neuen Version neu gestartet...")
-
-                    python_exe = sys.executable or "python"
-                    script_path = str(local_script_path)
-
-                    subprocess.Popen([python_exe, script_path] + sys.argv[1:])
-                    sys.exit(0)
-
-                except Exception as e:
-                    print(Fore.RED + f"[Update] Fehler beim Aktualisieren der Script-Version: {e}")
-                    print(Fore.YELLOW + "Es wird mit der aktuellen lokalen Version fortgefahren.")
-            else:
-                print(Fore.GREEN + "[Update] Script ist aktuell. Kein Update nötig.")
-    else:
-        print(Fore.YELLOW + "[Update] Master-Script nicht gefunden – Script-Update nicht möglich.")
-
-    # --- 2) artikel.xlsx Update (ohne Neustart) ---
-    try:
-        network_art_path = Path(UPDATE_SOURCE_ARTIKEL)
-        local_art_path = local_script_path.parent / "artikel.xlsx"  # so nutzt dein Code die Datei
-    except Exception as e:
-        print(Fore.RED + f"[Update] Fehler beim Ermitteln der artikel.xlsx-Pfade: {e}")
-        return
-
-    if not network_art_path.exists():
-        print(Fore.YELLOW + "[Update] Master artikel.xlsx nicht gefunden – kein Update möglich.")
-        return
-
-    # Wenn lokal nicht existiert -> einfach kopieren
-    if not local_art_path.exists():
-        try:
-            shutil.copy2(network_art_path, local_art_path)
-            print(Fore.GREEN + f"[Update] artikel.xlsx wurde neu angelegt: {local_art_path}")
-        except Exception as e:
-            print(Fore.RED + f"[Update] Konnte artikel.xlsx nicht kopieren: {e}")
-        return
-
-    # mtime vergleichen
-    try:
-        net_mtime = network_art_path.stat().st_mtime
-        local_mtime = local_art_path.stat().st_mtime
-    except OSError as e:
-        print(Fore.RED + f"[Update] Fehler beim Lesen der Dateizeitstempel (artikel.xlsx): {e}")
-        return
-
-    print(Fore.CYAN + f"[Update] Lokale  artikel.xlsx : {datetime.fromtimestamp(local_mtime)}")
-    print(Fore.CYAN + f"[Update] Master  artikel.xlsx : {datetime.fromtimestamp(net_mtime)}")
-
-    if net_mtime > local_mtime:
-        try:
-            # Backup, damit nichts verloren geht
-            backup_path = local_art_path.with_suffix(".xlsx.bak")
-            shutil.copy2(local_art_path, backup_path)
-
-            shutil.copy2(network_art_path, local_art_path)
-            print(Fore.GREEN + f"[Update] artikel.xlsx aktualisiert. Backup: {backup_path}")
-        except Exception as e:
-            print(Fore.RED + f"[Update] Fehler beim Aktualisieren von artikel.xlsx: {e}")
-            print(Fore.YELLOW + "Tipp: Falls artikel.xlsx gerade in Excel geöffnet ist, schließen und erneut starten.")
-    else:
-        print(Fore.GREEN + "[Update] artikel.xlsx ist aktuell. Kein Update nötig.")
-
-import pandas as pd
-
-def _find_col(columns, needle: str) -> str:
-    needle = needle.lower()
-    for c in columns:
-        if c is None:
-            continue
-        if needle in str(c).strip().lower():
-            return c
-    raise KeyError(f"Keine Spalte gefunden, die '{needle}' enthält. Vorhanden: {list(columns)}")
-
-import re
-
-def _norm_match(x) -> str:
-    if pd.isna(x):
-        return ""
-    s = str(x).strip()
-
-    # erste Zahl finden: 10030004.112 (Punkt optional)
-    m = re.search(r"\d+(?:\.\d+)?", s)
-    return m.group(0) if m else ""
-
-def load_artikelmap_from_excel_fuzzy(path: str, kunde_filter: str | None = None) -> dict:
-    xls = pd.ExcelFile(path)
-
-    last_err = None
-    for sheet in xls.sheet_names:
-        try:
-            art = pd.read_excel(path, sheet_name=sheet)
-
-            col_match = _find_col(art.columns, "match")
-            col_bez   = _find_col(art.columns, "bezeichnung")
-            col_kunde = _find_col(art.columns, "kunde")
-
-            if kunde_filter:
-                mask = art[col_kunde].astype(str).str.lower().str.contains(str(kunde_filter).lower(), na=False)
-                art = art[mask].copy()
-
-            art = art.dropna(subset=[col_match, col_bez]).copy()
-
-            keys = art[col_match].apply(_norm_match)
-            vals = art[col_bez].astype(str).str.strip()
-
-            artikel_map = {}
-            for k, v in zip(keys, vals):
-                if not k:
-                    continue
-                artikel_map.setdefault(k, v)
-
-            return artikel_map
-
-        except Exception as e:
-            last_err = e
-            continue
-
-    raise ValueError(f"Konnte in keiner Tabelle passende Spalten finden. Letzter Fehler: {last_err}")
-
-import csv
-
-def read_csv_robust(path: str | Path) -> tuple[pd.DataFrame, str, str]:
-    # delimiter + encoding grob erkennen
-    with open(path, "rb") as f:
-        sample = f.read(4096)
-
-    encoding = None
-    for enc in ("utf-8-sig", "cp1252", "latin1"):
-        try:
-            text = sample.decode(enc, errors="strict")
-            encoding = enc
-            break
-        except Exception:
-            pass
-    if encoding is None:
-        encoding = "latin1"
-        text = sample.decode(encoding, errors="ignore")
-
-    try:
-        dialect = csv.Sniffer().sniff(text, delimiters=";,|\t,")
-        sep = dialect.delimiter
-    except Exception:
-        sep = ";"
-
-    df = pd.read_csv(path, sep=sep, encoding=encoding, dtype=str)
-    return df, sep, encoding
-
-def main():
-    # =====================================
-    # Kundenauswahl
-    # =====================================
-    KUNDEN = {
-        "0": ("BEENDEN", None),
-        "1": ("MB", "standard"),
-        "2": ("NG", "ng"),
-        "3": ("NEF","nef"),
-    }
-
-    print("\nKunde auswählen:")
-    for key, (label, _) in KUNDEN.items():
-        print(f"  {key} = {label}")
-
-    while True:
-        choice = input("Auswahl (0/1/2/3): ").strip()
-        if choice in KUNDEN:
-            break
-        print(Fore.RED + "Ungültige Auswahl – bitte 0, 1 oder 2 eingeben.")
-
-    label, kunde = KUNDEN[choice]
-    if kunde is None:
-        print(Fore.YELLOW + "Vorgang abgebrochen.")
-        return   # main() sauber beenden
-
-    print(f"→ Gewählt: {label}\n")
-    
-    input_file = INPUT_NEF if kunde == "nef" else (INPUT_NG if kunde == "ng" else INPUT_MB)
-    if not Path(input_file).exists():
-        raise FileNotFoundError(f"Eingabedatei nicht gefunden: {input_file}")
-
-    # =====================================
-    # Einlesen (abhängig vom Kunden)
-    # =====================================
-    extra_excel_line = ""
-
-    if kunde == "ng":
-        # --- NG: positionsbasiert einlesen ---
-        df_raw = pd.read_excel(input_file, header=None)
-        df_raw = df_raw.dropna(subset=[0]).copy()
-
-        df = pd.DataFrame({
-            "Artikelnummer": df_raw[0].astype(str).str.strip(),
-            "Benennung": "",
-            "LHM-Nr.": df_raw[7],
-            "Charge": df_raw[6],
-            "Menge": 1,
-            "Einheit": "BigBag",
-            "Stelltyp": "",
-            "MHD": df_raw[5],
-            "Gesamtgewicht": df_raw[1],
-        })
-
-        # Artikelstamm → Bezeichnung
-        artikel_map = load_artikelmap_from_excel_fuzzy("artikel.xlsx", kunde_filter="NG")
-        df["Artikelnummer"] = df["Artikelnummer"].apply(_norm_match)
-        df["Benennung"] = df["Artikelnummer"].map(artikel_map).fillna("")
-
-    elif kunde == "nef":
-        # --- NEF: CSV einlesen (Encoding/Trenner robust) ---
-        df, sep, enc = read_csv_robust(input_file)
-        print(Fore.CYAN + f"[NEF] CSV gelesen (sep={sep!r}, encoding={enc!r})")
-
-        # Spaltennamen säubern
-        df.columns = [str(c).strip() for c in df.columns]
-        
-        # NEF-Spalten auf unsere Standardnamen bringen
-        rename_nef = {
-            "Menge Kart.": "Menge PS",
-            "Bruttogewicht kg": "Gewicht kg",
-        }
-        df = df.rename(columns=rename_nef)
-
-        # Pflichtspalten (so wie NEF sie wirklich liefert)
-        required = ["LG ID", "Artikel-Nr.", "Artikelbezeichnung", "Menge PS", "MHD", "Charge"]
-        missing_cols = [c for c in required if c not in df.columns]
-        if missing_cols:
-            raise ValueError(f"[NEF] Fehlende Spalten in CSV: {missing_cols}. Vorhanden: {list(df.columns)}")
-
-        # Defaults, weil NEF diese Spalten nicht liefert
-        if "Einheit" not in df.columns:
-            df["Einheit"] = "UMK"
-        if "Lademittel" not in df.columns:
-            df["Lademittel"] = ""
-        if "Gewicht kg" not in df.columns:
-            df["Gewicht kg"] = ""
-        if "Lagerort" not in df.columns:
-            df["Lagerort"] = ""
-        if "Sonstiger Text" not in df.columns:
-            df["Sonstiger Text"] = ""
-        
-        if "Lademittel" in df.columns:
-            df = df.drop(columns=["Lademittel"])
-        if "Sonstiger Text" in df.columns:
-            df = df.drop(columns=["Sonstiger Text"])
-
-        # Typen wie bei euch
-        df["LG ID"] = pd.to_numeric(df["LG ID"], errors="coerce").fillna(0).astype(int)
-        df["Menge PS"] = pd.to_numeric(df["Menge PS"], errors="coerce").fillna(0).astype(int)
-
-        # Gewicht putzen (falls später gebraucht)
-        gewicht_raw = df["Gewicht kg"].astype(str).str.strip()
-        gewicht_raw = gewicht_raw.str.replace(r"[^0-9,\.]", "", regex=True)
-        gewicht_raw = gewicht_raw.str.replace(r"\.(?=[0-9]{3}(?:$|,))", "", regex=True)
-        gewicht_raw = gewicht_raw.str.replace(",", ".", regex=False)
-        df["Gewicht kg"] = pd.to_numeric(gewicht_raw, errors="coerce").fillna(0).round(2)
-
-    else:
-        # --- STANDARD: Header automatisch finden ---
-        df_raw = pd.read_excel(input_file, header=None)
-
-        expected_headers = [
-            "Artikelnummer",
-            "Benennung",
-            "LHM-Nr.",
-            "Charge",
-            "Menge",
-            "Einheit",
-            "Stelltyp",
-            "MHD",
-            "Gesamtgewicht",
-        ]
-
-        def norm(x):
-            return str(x).strip() if pd.notna(x) else ""
-
-        header_row_idx = None
-        for idx, row in df_raw.iterrows():
-            normalized_row = [norm(v) for v in row.tolist()]
-            if all(h in normalized_row for h in expected_headers):
-                header_row_idx = idx
-                break
-
-        if header_row_idx is None:
-            raise ValueError("Konnte keine Kopfzeile mit den erwarteten Spaltenüberschriften finden.")
-
-        header_row = [norm(v) for v in df_raw.iloc[header_row_idx].tolist()]
-        df = df_raw.iloc[header_row_idx + 1:].copy()
-        df.columns = header_row
-
-
-    # =====================================
-    # MB/NG Aufbereitung (NEF überspringen!)
-    # =====================================
-    if kunde != "nef":
-        df = df[columns_to_keep]
-        df = df.dropna(how="all")
-
-        art_raw = df["Artikelnummer"].astype(str).str.strip()
-        pattern = r"\d+(?:\.\d+)?" if kunde == "ng" else r"\d+"
-        mask_art = art_raw.str.fullmatch(pattern)
-
-        df = df[mask_art].copy()
-        df["Artikelnummer"] = art_raw[mask_art]
-
-        # MHD robust parsen
-        mhd_raw = df["MHD"]
-        mhd_parsed = pd.to_datetime(mhd_raw, errors="coerce", dayfirst=True)
-
-        mask_num = mhd_raw.notna() & mhd_raw.apply(lambda x: isinstance(x, (int, float)))
-        if mask_num.any():
-            mhd_parsed.loc[mask_num] = pd.to_datetime(mhd_raw[mask_num].astype(float), unit="D", origin="1899-12-30")
-
-        mask_digit_str = mhd_raw.notna() & ~mask_num & mhd_raw.astype(str).str.fullmatch(r"\d+")
-        if mask_digit_str.any():
-            mhd_parsed.loc[mask_digit_str] = pd.to_datetime(mhd_raw[mask_digit_str].astype(float), unit="D", origin="1899-12-30")
-
-        df["MHD"] = mhd_parsed.dt.strftime("%d.%m.%Y")
-
-        df = df.rename(columns=rename_map)
-
-        df["Einheit"] = df["Einheit"].apply(lambda x: "UMK" if isinstance(x, str) and x.strip().lower() == "container" else x)
-        df["Lademittel"] = df["Lademittel"].apply(map_lademittel)
-
-        df["Menge PS"] = pd.to_numeric(df["Menge PS"], errors="coerce").fillna(0)
-
-        gewicht_raw = df["Gewicht kg"].astype(str).str.strip()
-        gewicht_raw = gewicht_raw.str.replace(r"[^0-9,\.]", "", regex=True)
-        gewicht_raw = gewicht_raw.str.replace(r"\.(?=[0-9]{3}(?:$|,))", "", regex=True)
-        gewicht_raw = gewicht_raw.str.replace(",", ".", regex=False)
-        df["Gewicht kg"] = pd.to_numeric(gewicht_raw, errors="coerce").fillna(0)
-
-        df = df.groupby("LG ID", as_index=False).agg({
-            "Artikel-Nr.": "first",
-            "Artikelbezeichnung": "first",
-            "Charge": "first",
-            "Menge PS": "sum",
-            "Einheit": "first",
-            "Lademittel": "first",
-            "MHD": "first",
-            "Gewicht kg": "sum",
-        })
-
-        df["Artikel-Nr."] = df["Artikel-Nr."].astype(str).str.strip()
-        if kunde == "standard":
-            df["Artikel-Nr."] = df["Artikel-Nr."].str.zfill(6)
-
-        df["LG ID"] = pd.to_numeric(df["LG ID"], errors="coerce").fillna(0).astype(int)
-        df["Menge PS"] = df["Menge PS"].fillna(0).astype(int)
-
-        charge_num = pd.to_numeric(df["Charge"], errors="coerce").fillna(0).astype(int)
-        df["Charge"] = charge_num.astype(str)
-
-        df["Gewicht kg"] = df["Gewicht kg"].round(2)
-
-    # Zusatzspalten
-    df["Lagerort"] = ""
-    df["Sonstiger Text"] = ""
-
-     # === Interaktive Abfrage für Lagerort & Sonstiger Text (j/n/a/h) ===
-    try:
-        main_help = f"""
-    {Fore.CYAN}HILFE – Lagerort / Sonstiger Text{Style.RESET_ALL}
-
-      {Fore.GREEN}j{Style.RESET_ALL} = Eingaben gelten für {Fore.YELLOW}alle{Style.RESET_ALL} Zeilen
-      {Fore.RED}n{Style.RESET_ALL} = keine Änderungen
-      {Fore.CYAN}a{Style.RESET_ALL} = Auswahl einzelner Zeilen / Bereiche
-      {Fore.CYAN}h{Style.RESET_ALL} = diese Hilfe anzeigen
-
-    Auswahl ({Fore.CYAN}a{Style.RESET_ALL}):
-      - Einzelne Zeilen:  {Fore.YELLOW}3, 7, 12{Style.RESET_ALL}
-      - Bereiche:         {Fore.YELLOW}1-10{Style.RESET_ALL}
-      - Kombinationen:    {Fore.YELLOW}1-5, 8, 12-15{Style.RESET_ALL}
-      - Leere Eingabe beendet die Auswahl
-    """
-
-        select_help = f"""
-    {Fore.CYAN}HILFE – Zeilenauswahl{Style.RESET_ALL}
-
-    Beispiele:
-      1-10        → Zeile 1 bis 10
-      5,7,9       → einzelne Zeilen
-      1-5, 12-15  → Kombinationen
-
-    Tipps:
-      - Nummern sind {Fore.YELLOW}1-basiert{Style.RESET_ALL} (so wie angezeigt)
-      - Leere Eingabe beendet die Auswahl
-    """
-
-        def parse_ranges(text):
-            result = []
-            parts = [p.strip() for p in text.split(",") if p.strip()]
-            for part in parts:
-                if "-" in part:
-                    start, end = part.split("-")
-                    result.extend(range(int(start), int(end) + 1))
-                else:
-                    result.append(int(part))
-            return sorted(set(result))
-
-        # ============================
-        # NEF: nur Lagerort abfragen
-        # ============================
-        if kunde == "nef":
-            lagerort = input(
-                f"{Fore.YELLOW}Lagerort (NEF) – leer = keine Änderung:{Style.RESET_ALL} "
-            ).strip()
-            if lagerort:
-                df["Lagerort"] = lagerort
-
-        # ============================
-        # MB/NG: alter Dialog
-        # ============================
-        else:
-            while True:
-                prompt = (
-                    f"Möchten Sie '{Fore.YELLOW}Lagerort{Style.RESET_ALL}' und "
-                    f"'{Fore.YELLOW}Sonstiger Text{Style.RESET_ALL}' setzen? "
-                    f"({Fore.GREEN}j{Style.RESET_ALL}=alle / "
-                    f"{Fore.RED}n{Style.RESET_ALL}=keine / "
-                    f"{Fore.CYAN}a{Style.RESET_ALL}=Auswahl / "
-                    f"{Fore.CYAN}h{Style.RESET_ALL}=Help): "
-                )
-                answer = input(prompt).strip().lower()
-
-                if answer == "h":
-                    print(main_help)
-                    continue
-                if answer in ("j", "n", "a"):
-                    break
-                print(f"{Fore.RED}Ungültige Eingabe – 'h' für Hilfe.{Style.RESET_ALL}")
-
-            if answer == "j":
-                lagerort = input(f"{Fore.YELLOW}Lagerort (leer = keine Änderung):{Style.RESET_ALL} ").strip()
-                sonstiger_text = input(f"{Fore.YELLOW}'Sonstiger Text' (leer = keine Änderung):{Style.RESET_ALL} ").strip()
-                if lagerort:
-                    df["Lagerort"] = lagerort
-                if sonstiger_text:
-                    df["Sonstiger Text"] = sonstiger_text
-
-            elif answer == "a":
-                print("\nVerfügbare Zeilen:")
-                tmp = df[["Artikel-Nr.", "Artikelbezeichnung"]].copy()
-                tmp.insert(0, "Zeile", range(1, len(tmp) + 1))
-                print(tmp.to_string(index=False))
-
-                while True:
-                    auswahl = input(
-                        f"{Fore.CYAN}Zeilen/Bereiche eingeben "
-                        f"(z.B. 1-10, 17-25 | h=Help | Enter=fertig):{Style.RESET_ALL} "
-                    ).strip().lower()
-
-                    if auswahl == "":
-                        print(f"{Fore.GREEN}Auswahl beendet.{Style.RESET_ALL}")
-                        break
-                    if auswahl == "h":
-                        print(select_help)
-                        continue
-
-                    try:
-                        rows_1_based = parse_ranges(auswahl)
-                        max_row = len(df)
-                        rows = [r - 1 for r in rows_1_based if 1 <= r <= max_row]
-                        if not rows:
-                            print(f"{Fore.RED}Keine gültigen Zeilen ausgewählt.{Style.RESET_ALL}")
-                            continue
-                    except Exception:
-                        print(f"{Fore.RED}Ungültige Eingabe – 'h' für Hilfe.{Style.RESET_ALL}")
-                        continue
-
-                    lagerort = input(f"{Fore.YELLOW}Lagerort für diese Auswahl (leer = keine Änderung):{Style.RESET_ALL} ").strip()
-                    sonstiger_text = input(f"{Fore.YELLOW}'Sonstiger Text' für diese Auswahl (leer = keine Änderung):{Style.RESET_ALL} ").strip()
-
-                    if not lagerort and not sonstiger_text:
-                        print(f"{Fore.RED}Keine Änderungen eingegeben – Auswahl übersprungen.{Style.RESET_ALL}")
-                        continue
-
-                    if lagerort:
-                        df.loc[rows, "Lagerort"] = lagerort
-                    if sonstiger_text:
-                        df.loc[rows, "Sonstiger Text"] = sonstiger_text
-
-            elif answer == "n":
-                print(f"{Fore.GREEN}Keine Änderungen an Lagerort / Sonstiger Text.{Style.RESET_ALL}")
-
-        # Artikelnummern immer behandeln
-        df["Artikel-Nr."] = df["Artikel-Nr."].astype(str)
-
-        # --- " S" NUR für MB + Verkaufsware ---
-        if kunde == "standard":
-            mask_verkauf = df["Sonstiger Text"].str.lower() == "verkaufsware"
-            df.loc[mask_verkauf, "Artikel-Nr."] = df.loc[mask_verkauf, "Artikel-Nr."] + " S"
-
-        # --- Prefix je Kunde ---
-        if kunde == "ng":
-            prefix = "NG "
-        elif kunde == "nef":
-            prefix = "NEF "
-        else:
-            prefix = "MB "
-
-        df["Artikel-Nr."] = prefix + df["Artikel-Nr."]
-        
-        # DEBUG # print("DEBUG Artikel-Nr.:", df["Artikel-Nr."].head().tolist())
-
-    except EOFError:
-        prefix = "NG " if kunde == "ng" else ("NEF " if kunde == "nef" else "MB ")
-        df["Artikel-Nr."] = prefix + df["Artikel-Nr."].astype(str)
-
-    # Zusatzzeile für Excel
-    try:
-        ans_extra = input("Möchten Sie eine zusätzliche Zeile in der Excel-Datei hinterlegen? (j/n): ").strip().lower()
-        if ans_extra == "j":
-            extra_excel_line = input("Bitte geben Sie den gewünschten Text für die Excel-Kopfzeile ein: ").strip()
-        else:
-            extra_excel_line = ""
-    except EOFError:
-        extra_excel_line = ""
-
-    # =====================================
-    # Index & Spaltenreihenfolge
-    # =====================================
-    df = df.reset_index(drop=True)
-    if "Nr." not in df.columns:
-        df.insert(0, "Nr.", df.index + 1)
-    else:
-        df["Nr."] = range(1, len(df) + 1)
-
-    if kunde == "nef":
-        output_columns = [
-            "Nr.",
-            "Artikel-Nr.",
-            "Artikelbezeichnung",
-            "LG ID",
-            "Charge",
-            "Menge PS",
-            "Einheit",
-            "MHD",
-            "Gewicht kg",
-            "Lagerort",
-        ]
-    else:
-        output_columns = [
-            "Nr.",
-            "Artikel-Nr.",
-            "Artikelbezeichnung",
-            "LG ID",
-            "Charge",
-            "Menge PS",
-            "Einheit",
-            "Lademittel",
-            "MHD",
-            "Gewicht kg",
-            "Lagerort",
-            "Sonstiger Text",
-        ]
-
-    df = df[output_columns]
-
-
-    # Gewicht in CSV wieder mit Komma
-    df["Gewicht kg"] = df["Gewicht kg"].apply(lambda x: str(x).replace(".", ","))
-
-    # LG ID sicher numerisch (verhindert führendes "'" in Excel)
-    df["LG ID"] = pd.to_numeric(df["LG ID"], errors="coerce").fillna(0).astype(int)
-
-    # =====================================
-    # CSV speichern
-    # =====================================
-    df.to_csv(OUTPUT_CSV, index=False, sep=";", encoding="utf-8-sig")
-    print(Fore.GREEN + f"CSV geschrieben nach: {OUTPUT_CSV}")
-
-    # =====================================
-    # Excel speichern
-    # =====================================
-    with pd.ExcelWriter(OUTPUT_XLSX, engine="openpyxl") as writer:
-        sheet_name = "Ruecktour"
-
-        start_row = 2 if extra_excel_line else 0
-        df.to_excel(writer, sheet_name=sheet_name, index=False, startrow=start_row)
-
-        wb = writer.book
-        ws = writer.sheets[sheet_name]
-
-        if extra_excel_line:
-            ws.cell(row=1, column=1, value=extra_excel_line)
-
-        # Sicherheitsnetz: mindestens ein sichtbares Sheet
-        if not wb.worksheets:
-            wb.create_sheet(title=sheet_name)
-        if all(sh.sheet_state != "visible" for sh in wb.worksheets):
-            wb.worksheets[0].sheet_state = "visible"
-
-        max_row = ws.max_row
-        max_col = ws.max_column
-        last_col_letter = get_column_letter(max_col)
-
-        ws.print_area = f"A1:{last_col_letter}{max_row}"
-
-        ws.page_setup.orientation = "landscape"
-        ws.page_setup.fitToWidth = 1
-        ws.page_setup.fitToHeight = 1
-        ws.sheet_properties.pageSetUpPr = PageSetupProperties(fitToPage=True)
-
-        ws.page_margins.left = 0.3
-        ws.page_margins.right = 0.3
-        ws.page_margins.top = 0.5
-        ws.page_margins.bottom = 0.5
-
-        for col_idx, column_cells in enumerate(ws.columns, start=1):
-            max_length = max((len(str(cell.value)) for cell in column_cells), default=10)
-            adjusted_width = min(max_length + 2, 25)
-            ws.column_dimensions[get_column_letter(col_idx)].width = adjusted_width
-
-    print(Fore.GREEN + f"Excel-Datei geschrieben nach: {OUTPUT_XLSX}")
-
-
-if __name__ == "__main__":
-    print(Fore.GREEN + START_BANNER)
-    print(Fore.YELLOW + f"UnivImport Version {VERSION} mlu")
-    ensure_latest_version()
-    main()
+from __future__ import annotations
+
+import sys
+import subprocess
+import importlib
+import importlib.util
+from datetime import date, datetime
+
+# ============================================
+# Abhängigkeiten prüfen / bei Bedarf installieren
+# ============================================
+
+REQUIRED_MODULES = [
+    ("pandas", "pandas"),
+    ("openpyxl", "openpyxl"),
+    ("numpy", "numpy"),
+    ("colorama", "colorama"),
+]
+
+def ensure_dependencies():
+    # Nur nachsehen, ob die Module installiert sind (find_spec importiert nichts) –
+    # pandas & Co. werden erst geladen, wenn eine Verarbeitung sie wirklich braucht.
+    print("Prüfe benötigte Python-Module...")
+    for module_name, package_name in REQUIRED_MODULES:
+        if importlib.util.find_spec(module_name) is None:
+            print(f"  Modul '{module_name}' fehlt – installiere '{package_name}'...")
+            try:
+                subprocess.check_call([sys.executable, "-m", "pip", "install", package_name])
+                importlib.invalidate_caches()
+                print(f"  → '{package_name}' wurde installiert.")
+            except Exception as e:
+                print(f"  Konnte '{package_name}' nicht installieren: {e}")
+                print("  Bitte manuell installieren und Script erneut starten.")
+                sys.exit(1)
+
+# Nur beim direkten Start prüfen: ProcessPool-Worker (spawn) importieren das Script als
+# "__mp_main__" und würden sonst bei jedem Start erneut prüfen und ausgeben.
+if __name__ == "__main__":
+    ensure_dependencies()
+
+# ============================================
+# Imports nach erfolgreichem Dependency-Check
+# ============================================
+
+import os
+import glob
+import fnmatch
+import json
+import time
+import pickle
+import atexit
+import shutil
+import hashlib
+import argparse
+import itertools
+import contextlib
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+from colorama import init, Fore, Style
+
+class _LazyModule:
+    """
+    Platzhalter für schwere Module (pandas, numpy): importiert erst beim ersten Zugriff
+    und ersetzt sich dann im Modul-Namensraum durch das echte Modul.
+    """
+
+    def __init__(self, module_name: str, alias: str):
+        self._module_name = module_name
+        self._alias = alias
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Vorab-Threads und Hauptthread greifen oft gleichzeitig zu – nur einer importiert (und misst)
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    with PROFILE.stage(f"import {self._module_name}", shared=True):
+                        module = importlib.import_module(self._module_name)
+                    globals()[self._alias] = module
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+pd = _LazyModule("pandas", "pd")
+np = _LazyModule("numpy", "np")
+
+init(autoreset=True)
+
+VERSION = "2.2.7"
+
+#########################################
+# UnivImport.py - 17.12.2025 - m.ludwig #
+#########################################
+
+# Zentrale Master-Version des Scripts auf dem Netzlaufwerk
+UPDATE_SOURCE = r"\\hrl.local\fs\data\MindenBruhns\MBImport\UnivImport\UnivImport.py"
+# Zentrale Master-Version der Artikelstammdaten auf dem Netzlaufwerk
+UPDATE_SOURCE_ARTIKEL = r"\\hrl.local\fs\data\MindenBruhns\MBImport\UnivImport\artikel.xlsx"
+
+# === Einstellungen ===
+INPUT_MB = "Mappe1.xlsx"
+INPUT_NG = "NG.xlsx"
+INPUT_NEF = "NEF.csv"
+OUTPUT_CSV = r"\\hrl.local\fs\data\niederegger\csv\mb\import.csv"
+OUTPUT_XLSX = "import.xlsx"
+
+# =====================================
+# Laufzeitmessung (--profile)
+# =====================================
+
+class StageTimer:
+    """
+    Misst benannte Abschnitte mit perf_counter. Solange nicht eingeschaltet,
+    kostet ein Abschnitt nur einen Attributzugriff. Thread-sicher.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.records: list[tuple[str, float, float, str]] = []  # (Name, Start, Dauer, Thread)
+        self.ignored: set[str] = set()  # Threads, deren Abschnitte nicht zählen (Vorab-Einlesen anderer Kunden)
+        self.shared: set[str] = set()   # Abschnitte, die immer zählen (z.B. Modul-Importe)
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+        self.origin = time.perf_counter()
+        with self._lock:
+            self.records.clear()
+            self.ignored.clear()
+
+    @contextlib.contextmanager
+    def stage(self, name: str, shared: bool = False):
+        """shared: zählt auch in einem Thread, der später per ignore_thread verworfen wird."""
+        if not self.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            record = (name, t0 - self.origin, time.perf_counter() - t0, threading.current_thread().name)
+            with self._lock:
+                if shared:
+                    self.shared.add(name)
+                if shared or record[3] not in self.ignored:
+                    self.records.append(record)
+
+    def ignore_thread(self, thread: str):
+        """Verwirft die Abschnitte eines Threads, auch künftige – außer den gemeinsamen."""
+        with self._lock:
+            self.ignored.add(thread)
+            self.records[:] = [r for r in self.records if r[3] != thread or r[0] in self.shared]
+
+    def report(self):
+        """Tabelle: Summe je Abschnitt (Abschnitte können verschachtelt sein oder parallel laufen)."""
+        total = time.perf_counter() - self.origin
+        sums: dict[str, list] = {}
+        for name, start, duration, thread in self.records:
+            entry = sums.setdefault(name, [start, 0.0, 0, thread])
+            entry[1] += duration
+            entry[2] += 1
+        print(Fore.CYAN + "\n[Profil] Laufzeiten je Abschnitt")
+        print(f"  {'Abschnitt':<15} {'ms':>10} {'Anteil':>7} {'Aufrufe':>8}  Thread")
+        for name, (_, duration, count, thread) in sorted(sums.items(), key=lambda kv: kv[1][0]):
+            share = duration / total if total else 0.0
+            print(f"  {name:<15} {duration * 1000:>10.1f} {share:>7.0%} {count:>8}  {thread}")
+        print(f"  {'gesamt':<15} {total * 1000:>10.1f}")
+
+    def write_trace(self, path: str | Path):
+        """JSON-Trace im Chrome-Trace-Format (chrome://tracing oder ui.perfetto.dev)."""
+        events = [
+            {"name": name, "ph": "X", "ts": round(start * 1e6), "dur": round(duration * 1e6),
+             "pid": os.getpid(), "tid": thread}
+            for name, start, duration, thread in self.records
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, indent=1)
+        print(Fore.CYAN + f"[Profil] Trace geschrieben nach: {path}")
+
+PROFILE = StageTimer()
+
+# =====================================
+# Hintergrund-Aufgaben
+# =====================================
+
+class _ThreadOutput:
+    """Ersatz für sys.stdout: Ausgaben angemeldeter Threads werden gesammelt statt gedruckt."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._buffers: dict[int, list[str]] = {}
+
+    def capture(self, buffer: list[str]):
+        self._buffers[threading.get_ident()] = buffer
+
+    def release(self):
+        self._buffers.pop(threading.get_ident(), None)
+
+    def write(self, text: str) -> int:
+        buffer = self._buffers.get(threading.get_ident())
+        if buffer is None:
+            return self._stream.write(text)
+        buffer.append(text)
+        return len(text)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+# Der Ersatz für sys.stdout steht nur, solange Hintergrund-Aufgaben laufen
+_output_lock = threading.Lock()
+_output_users = 0
+
+def _capture_output(buffer: list[str]) -> _ThreadOutput:
+    """Sammelt die Ausgaben des aufrufenden Threads in buffer; setzt den Ersatz ein, falls sys.stdout keiner ist."""
+    global _output_users
+    with _output_lock:
+        if not isinstance(sys.stdout, _ThreadOutput):
+            sys.stdout = _ThreadOutput(sys.stdout)
+        output = sys.stdout
+        output.capture(buffer)
+        _output_users += 1
+    return output
+
+def _release_output(output: _ThreadOutput):
+    """Gegenstück zu _capture_output; die letzte Aufgabe stellt das ursprüngliche sys.stdout wieder her."""
+    global _output_users
+    with _output_lock:
+        output.release()
+        _output_users -= 1
+        if _output_users == 0 and sys.stdout is output:
+            sys.stdout = output._stream
+
+class BackgroundTask:
+    """
+    Führt func(*args) in einem Hintergrund-Thread aus. Dessen Konsolenausgaben landen nicht mitten
+    in einer Eingabeaufforderung, sondern werden erst mit result() gedruckt (oder verworfen).
+    """
+
+    def __init__(self, name: str, func, *args):
+        self._output: list[str] = []
+        self._result = None
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._run, args=(func, args), name=f"UnivImport-{name}", daemon=True)
+        self.thread_name = self._thread.name
+        self._thread.start()
+
+    def _run(self, func, args):
+        output = None
+        try:
+            output = _capture_output(self._output)
+            self._result = func(*args)
+        except BaseException as e:
+            self._error = e
+        finally:
+            if output is not None:
+                _release_output(output)
+
+    def result(self):
+        """Wartet auf das Ergebnis, druckt die gesammelten Ausgaben und reicht Fehler weiter."""
+        self._thread.join()
+        if self._output:
+            print("".join(self._output), end="")
+            self._output.clear()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+START_BANNER = r"""
+             **
+            ****
+           ******
+         UnivImport - Universelles Import-Tool Lager 3/4
+           ******
+            ****
+             **
+"""
+
+# Spalten, die wir aus der Originaldatei behalten möchten
+columns_to_keep = [
+    "Artikelnummer",
+    "Benennung",
+    "LHM-Nr.",
+    "Charge",
+    "Menge",
+    "Einheit",
+    "Stelltyp",
+    "MHD",
+    "Gesamtgewicht",
+]
+
+# Ziel-Spaltennamen für den Import
+rename_map = {
+    "Artikelnummer": "Artikel-Nr.",
+    "Benennung": "Artikelbezeichnung",
+    "LHM-Nr.": "LG ID",
+    "Charge": "Charge",
+    "Menge": "Menge PS",
+    "Einheit": "Einheit",
+    "Stelltyp": "Lademittel",
+    "MHD": "MHD",
+    "Gesamtgewicht": "Gewicht kg",
+}
+
+# Zuordnungstabellen – Vorgaben, in UnivImport.json unter "lademittel" bzw. "einheit" ergänzbar
+# (gleicher Schlüssel überschreibt, null entfernt einen Eintrag, neue Einträge kommen ans Ende)
+
+# Lademittel: Teiltext (ohne Groß/Klein) → Lademittel; enthält ein Wert mehrere, gilt der erste Eintrag
+LADEMITTEL_MAPPING = {
+    "euro": "Euro",
+    "h1": "H1",
+    "industrie": "Industrie",
+}
+
+# Einheit: ganzer Wert (ohne Groß/Klein und Leerzeichen außen) → Einheit; alles andere bleibt
+EINHEIT_MAPPING = {
+    "container": "UMK",
+}
+
+def _zuordnung_aus_konfig(name: str, vorgabe: dict[str, str]) -> dict[str, str]:
+    """Vorgabetabelle mit dem Abschnitt name aus der Konfiguration; Schlüssel klein geschrieben."""
+    tabelle = {k.strip().lower(): v for k, v in vorgabe.items()}
+    abweichung = load_konfig().get(name, {})
+    if not isinstance(abweichung, dict):
+        raise ValueError(f"Konfiguration {KONFIG_DATEI}: {name!r} muss ein Objekt Text → Text sein")
+    for key, target in abweichung.items():
+        if target is not None and not isinstance(target, str):
+            raise ValueError(f"Konfiguration {KONFIG_DATEI}: {name}[{key!r}] muss Text oder null sein")
+        key = key.strip().lower()
+        if not key:
+            raise ValueError(f"Konfiguration {KONFIG_DATEI}: {name} enthält einen leeren Schlüssel")
+        if target is None:
+            tabelle.pop(key, None)
+        else:
+            tabelle[key] = target
+    return tabelle
+
+_ZUORDNUNG: tuple | None = None
+_ZUORDNUNG_LOCK = threading.Lock()
+
+def zuordnungen() -> tuple[re.Pattern | None, list[str], dict[str, str]]:
+    """
+    (Lademittel-Muster, Lademittel je Gruppe, Einheit-Tabelle) – einmal je Prozess übersetzt.
+    Das Muster ist eine Alternation (?:.*?(euro))|(?:.*?(h1))|…: match probiert die Einträge in
+    Tabellenreihenfolge, die Nummer der passenden Gruppe ergibt das Lademittel.
+    """
+    global _ZUORDNUNG
+    with _ZUORDNUNG_LOCK:
+        if _ZUORDNUNG is None:
+            lademittel = _zuordnung_aus_konfig("lademittel", LADEMITTEL_MAPPING)
+            muster = (re.compile("|".join(f"(?:.*?({re.escape(k)}))" for k in lademittel), re.DOTALL)
+                      if lademittel else None)
+            _ZUORDNUNG = (muster, list(lademittel.values()), _zuordnung_aus_konfig("einheit", EINHEIT_MAPPING))
+        return _ZUORDNUNG
+
+def map_lademittel(value: str) -> str:
+    """Normalisiert 'Lademittel' anhand der Lademittel-Tabelle ('' ohne Treffer)."""
+    if not isinstance(value, str):
+        return ""
+    muster, ziele, _ = zuordnungen()
+    m = muster.match(value.lower()) if muster else None
+    return ziele[m.lastindex - 1] if m else ""
+
+def map_einheit(value):
+    """Übersetzt 'Einheit' anhand der Einheit-Tabelle (z.B. Container → UMK), alles andere bleibt."""
+    if isinstance(value, str):
+        return zuordnungen()[2].get(value.strip().lower(), value)
+    return value
+
+# Normalisierer für KundenPlan (Profilfeld "normalisierer"): Wert → Wert, je unterschiedlichem Wert einmal aufgerufen
+# (map_unique) – auch bei großen Dateien nur so oft, wie es verschiedene Werte gibt
+NORMALISIERER = {
+    "einheit": map_einheit,
+    "lademittel": map_lademittel,
+}
+
+# =====================================
+# Update-Check (im Hintergrund)
+# =====================================
+# Länger als UPDATE_TIMEOUT Sekunden wird nie auf das Netzlaufwerk gewartet
+UPDATE_TIMEOUT = 10
+# Gleiche Größe und Änderungszeit (± so viele Sekunden, Netzlaufwerke runden) → aktuell, ohne zu lesen
+UPDATE_MTIME_TOLERANZ = 2.0
+
+_update_thread: threading.Thread | None = None
+_update_deadline = 0.0
+_update_log: list[str] = []
+
+def _log_update(text: str):
+    # Ausgaben sammeln statt drucken – sonst landen sie mitten in den Eingabeaufforderungen
+    _update_log.append(text)
+
+def _flush_update_log():
+    while _update_log:
+        print(_update_log.pop(0))
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+def _sha256_file(path: Path) -> str | None:
+    try:
+        return _sha256(path.read_bytes())
+    except OSError:
+        return None
+
+def _same_stat(path: Path, master: Path) -> bool:
+    """Gleiche Größe und Änderungszeit wie der Master – dann wird weder gelesen noch gehasht."""
+    try:
+        st, master_st = path.stat(), master.stat()
+    except OSError:
+        return False
+    return st.st_size == master_st.st_size and abs(st.st_mtime - master_st.st_mtime) <= UPDATE_MTIME_TOLERANZ
+
+def _adopt_mtime(path: Path, master: Path):
+    """Übernimmt die Änderungszeit des Masters, damit der nächste Start nur noch stat() braucht."""
+    try:
+        master_st = master.stat()
+        os.utime(path, ns=(master_st.st_atime_ns, master_st.st_mtime_ns))
+    except OSError:
+        pass
+
+def _staged_script_path(local_script_path: Path) -> Path:
+    return local_script_path.with_name(local_script_path.name + ".new")
+
+def _write_verified(path: Path, data: bytes):
+    """Schreibt erst eine .part-Datei und benennt sie nach Prüfung des Hashes um."""
+    part_path = path.with_name(path.name + ".part")
+    part_path.write_bytes(data)
+    if _sha256_file(part_path) != _sha256(data):
+        part_path.unlink()
+        raise OSError(f"Prüfsumme von {part_path} stimmt nicht")
+    os.replace(part_path, path)
+
+def _check_script_update(local_script_path: Path):
+    network_script_path = Path(UPDATE_SOURCE)
+    if not network_script_path.exists():
+        _log_update(Fore.YELLOW + "[Update] Master-Script nicht gefunden – Script-Update nicht möglich.")
+        return
+
+    staged_path = _staged_script_path(local_script_path)
+    if _same_stat(local_script_path, network_script_path):
+        _log_update(Fore.GREEN + "[Update] Script ist aktuell. Kein Update nötig.")
+        return
+    if _same_stat(staged_path, network_script_path):
+        _log_update(Fore.CYAN + "[Update] Neue Script-Version liegt bereits bereit.")
+        return
+
+    try:
+        data = network_script_path.read_bytes()
+    except OSError as e:
+        _log_update(Fore.RED + f"[Update] Fehler beim Lesen des Master-Scripts: {e}")
+        return
+
+    net_hash = _sha256(data)
+    if net_hash == _sha256_file(local_script_path):
+        _adopt_mtime(local_script_path, network_script_path)
+        _log_update(Fore.GREEN + "[Update] Script ist aktuell. Kein Update nötig.")
+        return
+
+    if _sha256_file(staged_path) == net_hash:
+        _adopt_mtime(staged_path, network_script_path)
+        _log_update(Fore.CYAN + "[Update] Neue Script-Version liegt bereits bereit.")
+        return
+
+    try:
+        _write_verified(staged_path, data)
+        _adopt_mtime(staged_path, network_script_path)
+    except OSError as e:
+        _log_update(Fore.RED + f"[Update] Fehler beim Bereitstellen der neuen Script-Version: {e}")
+        return
+    _log_update(Fore.GREEN + f"[Update] Neue Script-Version von {network_script_path} bereitgestellt.")
+
+def _check_artikel_update(local_art_path: Path):
+    network_art_path = Path(UPDATE_SOURCE_ARTIKEL)
+    if not network_art_path.exists():
+        _log_update(Fore.YELLOW + "[Update] Master artikel.xlsx nicht gefunden – kein Update möglich.")
+        return
+
+    if _same_stat(local_art_path, network_art_path):
+        _log_update(Fore.GREEN + "[Update] artikel.xlsx ist aktuell. Kein Update nötig.")
+        return
+
+    try:
+        data = network_art_path.read_bytes()
+    except OSError as e:
+        _log_update(Fore.RED + f"[Update] Fehler beim Lesen der Master artikel.xlsx: {e}")
+        return
+
+    if local_art_path.exists() and _sha256(data) == _sha256_file(local_art_path):
+        # gleicher Inhalt, andere Zeit: einmal angleichen (der Artikel-Cache lädt dann einmal neu)
+        _adopt_mtime(local_art_path, network_art_path)
+        _log_update(Fore.GREEN + "[Update] artikel.xlsx ist aktuell. Kein Update nötig.")
+        return
+
+    try:
+        if local_art_path.exists():
+            # Backup, damit nichts verloren geht
+            backup_path = local_art_path.with_suffix(".xlsx.bak")
+            shutil.copy2(local_art_path, backup_path)
+            _write_verified(local_art_path, data)
+            _adopt_mtime(local_art_path, network_art_path)
+            _log_update(Fore.GREEN + f"[Update] artikel.xlsx aktualisiert. Backup: {backup_path}")
+        else:
+            _write_verified(local_art_path, data)
+            _adopt_mtime(local_art_path, network_art_path)
+            _log_update(Fore.GREEN + f"[Update] artikel.xlsx wurde neu angelegt: {local_art_path}")
+        invalidate_artikel_cache()
+    except OSError as e:
+        _log_update(Fore.RED + f"[Update] Fehler beim Aktualisieren von artikel.xlsx: {e}")
+        _log_update(Fore.YELLOW + "Tipp: Falls artikel.xlsx gerade in Excel geöffnet ist, schließen und erneut starten.")
+
+def _run_update_check(local_script_path: Path):
+    with PROFILE.stage("update-check"):
+        # --- 1) Script: nur bereitstellen, aktiv ab dem nächsten Start ---
+        _check_script_update(local_script_path)
+        # --- 2) artikel.xlsx: sofort austauschen (ohne Neustart) ---
+        _check_artikel_update(local_script_path.parent / "artikel.xlsx")
+
+def ensure_latest_version():
+    """
+    Startet den Update-Check im Hintergrund und kehrt sofort zurück.
+
+    Stimmen Größe und Änderungszeit mit dem Master überein, gilt die Datei ohne Lesen als aktuell;
+    sonst wird per SHA-256 verglichen und die lokale Kopie übernimmt danach die Zeit des Masters.
+    Eine neuere UnivImport.py wird als UnivImport.py.new bereitgestellt und beim Beenden über das
+    lokale Script gelegt – sie gilt also ab dem nächsten Start, ohne Neustart. artikel.xlsx wird direkt ersetzt.
+    """
+    global _update_thread, _update_deadline
+
+    try:
+        local_script_path = Path(__file__).resolve()
+    except NameError:
+        print(Fore.RED + "[Update] Konnte __file__ nicht bestimmen – Update-Check wird übersprungen.")
+        return
+
+    atexit.register(apply_pending_update, local_script_path)
+
+    _update_deadline = time.monotonic() + UPDATE_TIMEOUT
+    _update_thread = threading.Thread(
+        target=_run_update_check, args=(local_script_path,), name="UnivImport-Update", daemon=True
+    )
+    _update_thread.start()
+
+def wait_for_update(timeout: float | None = None) -> bool:
+    """Wartet auf den Update-Check (höchstens bis UPDATE_TIMEOUT nach dem Start). True = fertig."""
+    if _update_thread is None:
+        return True
+    remaining = max(0.0, _update_deadline - time.monotonic())
+    with PROFILE.stage("update-wait"):
+        _update_thread.join(remaining if timeout is None else min(timeout, remaining))
+    # Meldungen nur im Vordergrund ausgeben (sonst landen sie im Puffer einer BackgroundTask)
+    if threading.current_thread() is threading.main_thread():
+        _flush_update_log()
+    return not _update_thread.is_alive()
+
+def apply_pending_update(local_script_path: Path):
+    """Legt eine bereitgestellte UnivImport.py.new über das lokale Script (beim Beenden)."""
+    if _update_thread is not None and _update_thread.is_alive():
+        _log_update(Fore.YELLOW + "[Update] Netzlaufwerk antwortet nicht – Update-Check beim nächsten Start erneut.")
+    _flush_update_log()
+
+    staged_path = _staged_script_path(local_script_path)
+    if not staged_path.exists():
+        return
+    try:
+        os.replace(staged_path, local_script_path)
+    except OSError as e:
+        print(Fore.RED + f"[Update] Neue Script-Version konnte nicht installiert werden: {e}")
+        return
+    print(Fore.GREEN + "\n=== UPDATE DURCHGEFÜHRT (SCRIPT) ===")
+    print(Fore.GREEN + f"Aktualisiert: {local_script_path}")
+    print(Fore.GREEN + "Die neue Version ist ab dem nächsten Start aktiv.")
+
+def _find_col(columns, needle: str) -> str:
+    needle = needle.lower()
+    for c in columns:
+        if c is None:
+            continue
+        if needle in str(c).strip().lower():
+            return c
+    raise KeyError(f"Keine Spalte gefunden, die '{needle}' enthält. Vorhanden: {list(columns)}")
+
+import re
+
+# erste Zahl: 10030004.112 (Punkt optional)
+ARTIKEL_KEY_PATTERN = r"(\d+(?:\.\d+)?)"
+
+def extract_artikel_keys(values: pd.Series) -> pd.Series:
+    """Schlüssel für die Artikelzuordnung (erste Zahl im Text), ohne Treffer → ''."""
+    return values.astype(str).str.strip().str.extract(ARTIKEL_KEY_PATTERN, expand=False).fillna("")
+
+def load_artikelmap_from_excel_fuzzy(path: str, kunde_filter: str | None = None) -> dict:
+    # pandas kennt den eigenen XML-Leser nicht – dafür openpyxl (liest ebenfalls ohne Zusatzpaket)
+    engine = resolve_excel_reader()
+    xls = pd.ExcelFile(path, engine="openpyxl" if engine == "xml" else engine)
+
+    last_err = None
+    for sheet in xls.sheet_names:
+        try:
+            art = pd.read_excel(xls, sheet_name=sheet)
+
+            col_match = _find_col(art.columns, "match")
+            col_bez   = _find_col(art.columns, "bezeichnung")
+            col_kunde = _find_col(art.columns, "kunde")
+
+            if kunde_filter:
+                mask = art[col_kunde].astype(str).str.lower().str.contains(str(kunde_filter).lower(), na=False)
+                art = art[mask].copy()
+
+            art = art.dropna(subset=[col_match, col_bez]).copy()
+
+            keys = extract_artikel_keys(art[col_match])
+            vals = art[col_bez].astype(str).str.strip()
+
+            artikel_map = {}
+            for k, v in zip(keys, vals):
+                if not k:
+                    continue
+                artikel_map.setdefault(k, v)
+
+            return artikel_map
+
+        except Exception as e:
+            last_err = e
+            continue
+
+    raise ValueError(f"Konnte in keiner Tabelle passende Spalten finden. Letzter Fehler: {last_err}")
+
+def _artikel_key_variants(keys: pd.Series) -> tuple[pd.Series, pd.Series]:
+    """Ersatzformen eines Schlüssels: ohne führende Nullen und nur die Grundnummer (vor dem Punkt)."""
+    stripped = keys.str.replace(r"^0+(?=\d)", "", regex=True)
+    return stripped, stripped.str.split(".", n=1).str[0]
+
+def build_artikel_fallback(artikel_map: dict) -> tuple[dict, dict]:
+    """
+    Index für Beinahe-Treffer. Rückgabe: (ohne führende Nullen → Schlüssel, Grundnummer → Schlüssel).
+    Eine Grundnummer wird nur aufgenommen, wenn alle Schlüssel dazu dieselbe Bezeichnung haben.
+    """
+    keys = pd.Series(list(artikel_map), dtype=object)
+    stripped, base = _artikel_key_variants(keys)
+    index = pd.DataFrame({"key": keys, "stripped": stripped, "base": base,
+                          "bez": keys.map(artikel_map)})
+
+    by_stripped = dict(index.drop_duplicates("stripped")[["stripped", "key"]].itertuples(index=False))
+    unambiguous = index.groupby("base")["bez"].nunique() == 1
+    by_base = index[index["base"].map(unambiguous)].drop_duplicates("base")
+    return by_stripped, dict(by_base[["base", "key"]].itertuples(index=False))
+
+def lookup_artikel(keys: pd.Series, artikel_map: dict) -> tuple[pd.Series, pd.DataFrame]:
+    """
+    Bezeichnung je Artikelschlüssel. Was nicht exakt in artikel_map steht, wird über
+    build_artikel_fallback aufgelöst (z.B. fehlendes ".112" oder führende Nullen). Die Grundnummer
+    gilt nur für Schlüssel ganz ohne Suffix – ein anderes Suffix (10030133.1 statt .112) bleibt ohne Treffer.
+    Rückgabe: (Bezeichnungen, Ersatztreffer je Schlüssel mit Zeilenanzahl)
+    """
+    names = keys.map(artikel_map)
+    missing = names.isna() & keys.ne("")
+    report = pd.DataFrame(columns=["Artikelnummer", "Zuordnung", "Bezeichnung", "Zeilen"])
+    if not missing.any():
+        return names.fillna(""), report
+
+    by_stripped, by_base = build_artikel_fallback(artikel_map)
+    counts = keys[missing].value_counts(sort=False)
+    miss = pd.Series(counts.index, dtype=object)
+    stripped, base = _artikel_key_variants(miss)
+    ohne_suffix = ~stripped.str.contains(".", regex=False)
+    matched = stripped.map(by_stripped).fillna(base[ohne_suffix].map(by_base))
+
+    found = matched.notna()
+    if found.any():
+        replacement = dict(zip(miss[found], matched[found]))
+        names[missing] = keys[missing].map(replacement).map(artikel_map)
+        report = pd.DataFrame({
+            "Artikelnummer": miss[found].to_numpy(),
+            "Zuordnung": matched[found].to_numpy(),
+            "Bezeichnung": matched[found].map(artikel_map).to_numpy(),
+            "Zeilen": counts[miss[found]].to_numpy(),
+        })
+    return names.fillna(""), report
+
+def print_artikel_fallback(report: pd.DataFrame, limit: int = 10):
+    """Meldet die über Ersatzschlüssel zugeordneten Artikelnummern."""
+    if report.empty:
+        return
+    print(Fore.YELLOW + f"[Artikel] {int(report['Zeilen'].sum())} Zeile(n) über ähnliche Artikelnummer zugeordnet – bitte prüfen:")
+    for row in report.head(limit).itertuples(index=False):
+        print(Fore.YELLOW + f"  {row.Artikelnummer} → {row.Zuordnung} ({row.Bezeichnung}), {row.Zeilen} Zeile(n)")
+    if len(report) > limit:
+        print(Fore.YELLOW + f"  ... und {len(report) - limit} weitere Artikelnummer(n)")
+
+# =====================================
+# Cache für die Artikelzuordnung
+# =====================================
+ARTIKEL_CACHE = "artikel.cache"
+ARTIKEL_CACHE_VERSION = 1
+
+def _artikel_cache_path() -> Path:
+    try:
+        return Path(__file__).resolve().parent / ARTIKEL_CACHE
+    except NameError:
+        return Path(ARTIKEL_CACHE)
+
+def _artikel_fingerprint(path: str | Path) -> tuple:
+    st = os.stat(path)
+    return (str(Path(path).resolve()), st.st_mtime_ns, st.st_size)
+
+def _read_artikel_cache() -> dict:
+    try:
+        with open(_artikel_cache_path(), "rb") as f:
+            cache = pickle.load(f)
+    except Exception:
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != ARTIKEL_CACHE_VERSION:
+        return {}
+    return cache.get("entries", {})
+
+def _write_artikel_cache(entries: dict):
+    cache_path = _artikel_cache_path()
+    tmp_path = None
+    try:
+        # eigene Temp-Datei je Aufruf – Prozesse und Threads (Vorab-Einlesen, Dienst) schreiben gleichzeitig
+        fd, tmp_name = tempfile.mkstemp(prefix=cache_path.name + ".", suffix=".tmp", dir=cache_path.parent)
+        tmp_path = Path(tmp_name)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump({"version": ARTIKEL_CACHE_VERSION, "entries": entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        # Cache ist nur eine Beschleunigung – Fehler nicht durchreichen
+        print(Fore.YELLOW + f"[Artikel] Cache konnte nicht geschrieben werden: {e}")
+        if tmp_path is not None:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+
+# Im laufenden Prozess (Watch-Modus) bleibt die Zuordnung zusätzlich im Speicher
+_artikel_memo: dict[str, tuple[tuple, dict]] = {}
+# Prüfen und Füllen von Speicher und Cache-Datei nur in einem Thread zugleich (wird sonst doppelt geladen)
+_ARTIKEL_LOCK = threading.Lock()
+
+def invalidate_artikel_cache():
+    """Verwirft den Artikel-Cache (z.B. nachdem eine neue artikel.xlsx kopiert wurde)."""
+    with _ARTIKEL_LOCK:
+        _artikel_memo.clear()
+        _remove_artikel_cache()
+
+def _remove_artikel_cache():
+    try:
+        _artikel_cache_path().unlink()
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(Fore.YELLOW + f"[Artikel] Cache konnte nicht gelöscht werden: {e}")
+
+def load_artikelmap_cached(path: str | Path, kunde_filter: str | None = None) -> dict:
+    """
+    Wie load_artikelmap_from_excel_fuzzy, aber mit Cache neben dem Script.
+    Schlüssel: Pfad, Änderungszeit und Größe der artikel.xlsx sowie kunde_filter.
+    """
+    fingerprint = _artikel_fingerprint(path)
+    filter_key = str(kunde_filter or "")
+    with _ARTIKEL_LOCK:
+        return _load_artikelmap_locked(path, kunde_filter, fingerprint, filter_key)
+
+def _load_artikelmap_locked(path: str | Path, kunde_filter: str | None, fingerprint: tuple, filter_key: str) -> dict:
+    memo = _artikel_memo.get(filter_key)
+    if memo is not None and memo[0] == fingerprint:
+        return memo[1]
+
+    entries = _read_artikel_cache()
+    entry = entries.get(filter_key)
+    if entry is not None and entry.get("fingerprint") == fingerprint:
+        _artikel_memo[filter_key] = (fingerprint, entry["map"])
+        return entry["map"]
+
+    artikel_map = load_artikelmap_from_excel_fuzzy(path, kunde_filter=kunde_filter)
+
+    # Einträge für andere Dateistände verwerfen, andere Kundenfilter behalten
+    entries = {k: v for k, v in entries.items() if v.get("fingerprint") == fingerprint}
+    entries[filter_key] = {"fingerprint": fingerprint, "map": artikel_map}
+    _write_artikel_cache(entries)
+    _artikel_memo[filter_key] = (fingerprint, artikel_map)
+    return artikel_map
+
+# =====================================
+# MHD-Normalisierung
+# =====================================
+EXCEL_EPOCH = "1899-12-30"
+_MHD_DIGITS = re.compile(r"\d+")
+
+def _parse_mhd_uniques(uniques) -> pd.DatetimeIndex:
+    """Parst jeden (eindeutigen) MHD-Wert genau einmal. Nicht erkennbare Werte → NaT."""
+    parsed = [pd.NaT] * len(uniques)
+    serial_pos, serial_val = [], []
+    text_pos, text_val = [], []
+
+    for i, v in enumerate(uniques):
+        if isinstance(v, (datetime, np.datetime64)):
+            parsed[i] = pd.Timestamp(v)
+        elif isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, (bool, np.bool_)):
+            serial_pos.append(i)
+            serial_val.append(float(v))
+        elif isinstance(v, str):
+            s = v.strip()
+            if _MHD_DIGITS.fullmatch(s):
+                serial_pos.append(i)
+                serial_val.append(float(s))
+            elif s:
+                text_pos.append(i)
+                text_val.append(s)
+
+    # Excel-Seriennummern (auch als Ziffern-Text)
+    if serial_pos:
+        ts = pd.to_datetime(np.asarray(serial_val, dtype=float), unit="D", origin=EXCEL_EPOCH, errors="coerce")
+        for i, t in zip(serial_pos, ts):
+            parsed[i] = t
+
+    # Text: erst das übliche TT.MM.JJJJ, dann ISO, zuletzt beliebige Formate mit Tag zuerst
+    if text_pos:
+        texts = pd.Index(text_val, dtype=object)
+        ts = pd.Series(pd.to_datetime(texts, format="%d.%m.%Y", errors="coerce"), dtype=object)
+        for fmt in ("ISO8601", "mixed"):
+            missing = ts.isna().to_numpy()
+            if not missing.any():
+                break
+            ts[missing] = list(pd.to_datetime(texts[missing], format=fmt, dayfirst=True, errors="coerce"))
+        for i, t in zip(text_pos, ts):
+            parsed[i] = t
+
+    return pd.DatetimeIndex(parsed)
+
+def parse_mhd(values: pd.Series) -> pd.Series:
+    """
+    Wandelt eine MHD-Spalte in datetime um: datetime-Werte, Excel-Seriennummern
+    (Zahl oder Ziffern-Text, Ursprung 1899-12-30) und Text mit Tag zuerst.
+    Es wird nur jeder unterschiedliche Wert geparst und danach zurückverteilt.
+    """
+    codes, uniques = pd.factorize(values)
+    parsed = _parse_mhd_uniques(uniques)
+    return pd.Series(parsed.take(codes, allow_fill=True, fill_value=pd.NaT), index=values.index)
+
+def format_mhd(values: pd.Series, fmt: str = "%d.%m.%Y") -> pd.Series:
+    """Wie parse_mhd, liefert aber direkt Text (z.B. 31.12.2025). Nicht erkennbare Werte → NaN."""
+    codes, uniques = pd.factorize(values)
+    texts = _parse_mhd_uniques(uniques).strftime(fmt).to_numpy(dtype=object)
+    texts = np.append(texts, np.nan)  # Index -1 (fehlender Wert) → NaN
+    return pd.Series(texts[codes], index=values.index, dtype=object)
+
+# =====================================
+# Zahlen im deutschen Format
+# =====================================
+_NUM_JUNK = re.compile(r"[^0-9,\.]")
+_NUM_THOUSANDS = re.compile(r"\.(?=[0-9]{3}(?:$|,))")
+
+def _german_float(v) -> float:
+    """'1.234,5 kg' → 1234.5 | Zahlen bleiben unverändert | nicht lesbar → NaN"""
+    if isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, (bool, np.bool_)):
+        return float(v)
+    if v is None or not isinstance(v, str):
+        return np.nan
+    t = _NUM_THOUSANDS.sub("", _NUM_JUNK.sub("", v)).replace(",", ".")
+    try:
+        return float(t)
+    except ValueError:
+        return np.nan
+
+def parse_german_number(values: pd.Series, fill: float = 0.0) -> pd.Series:
+    """
+    Liest Gewichte/Mengen im deutschen Format (Tausenderpunkte, Dezimalkomma, Einheiten-Reste).
+    Bereits numerische Spalten werden direkt übernommen, sonst wird jeder unterschiedliche Wert einmal gelesen.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype(float).fillna(fill)
+    codes, uniques = pd.factorize(values)
+    parsed = np.fromiter((_german_float(v) for v in uniques), dtype=float, count=len(uniques))
+    parsed = np.append(parsed, np.nan)[codes]  # Index -1 (fehlender Wert) → NaN
+    return pd.Series(parsed, index=values.index).fillna(fill)
+
+def to_int(values: pd.Series) -> pd.Series:
+    """Ganzzahlige Spalten (LG ID, Charge, ...): ungültig/fehlend → 0."""
+    if pd.api.types.is_integer_dtype(values):
+        return values.fillna(0).astype(int)  # Int64 aus dem CSV-Schema kann Lücken haben
+    return pd.to_numeric(values, errors="coerce").fillna(0).astype(int)
+
+def format_decimal_comma(values: pd.Series) -> pd.Series:
+    """Zahlen für die CSV wieder mit Dezimalkomma (12.5 → '12,5')."""
+    return values.astype(str).str.replace(".", ",", regex=False)
+
+# =====================================
+# Excel lesen (austauschbare Engines)
+# =====================================
+# "auto" = calamine, falls installiert (liest große Blätter um ein Vielfaches schneller), sonst openpyxl;
+# "xml" = eigener Leser mit konstantem Speicher (Streaming), für artikel.xlsx gilt dabei openpyxl
+EXCEL_READER = "auto"
+
+def _excel_cell(v):
+    # wie pandas: ganzzahlige Floats als int (sonst wird aus 123 → "123.0")
+    if isinstance(v, float) and v.is_integer():
+        return int(v)
+    return v
+
+@contextlib.contextmanager
+def _first_sheet_openpyxl(path: str | Path):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        # Manche Exporte liefern falsche Dimensionsangaben – sonst fehlen Zeilen/Spalten
+        ws.reset_dimensions()
+
+        def rows(min_row: int = 1, max_col: int | None = None):
+            return ws.iter_rows(min_row=min_row, max_col=max_col, values_only=True)
+
+        yield rows
+    finally:
+        wb.close()
+
+def _calamine_cell(v):
+    # wie openpyxl: leere Zelle → None, reines Datum → datetime (Zahlen kommen bei beiden als Zahl)
+    if isinstance(v, str):
+        return v if v else None
+    if type(v) is date:
+        return datetime(v.year, v.month, v.day)
+    return v
+
+@contextlib.contextmanager
+def _first_sheet_calamine(path: str | Path):
+    from python_calamine import CalamineWorkbook
+
+    wb = CalamineWorkbook.from_path(str(path))
+    try:
+        sheet = wb.get_sheet_by_index(0)
+        # iter_rows beginnt bei der ersten belegten Spalte, nicht bei Spalte A
+        lead = (None,) * (sheet.start[1] if sheet.start else 0)
+
+        def rows(min_row: int = 1, max_col: int | None = None):
+            for row in itertools.islice(sheet.iter_rows(), min_row - 1, None):
+                values = lead + tuple(map(_calamine_cell, row))
+                yield values if max_col is None else values[:max_col]
+
+        yield rows
+    finally:
+        wb.close()
+
+def _xml_local(tag: str) -> str:
+    # Namensraum weglassen (Transitional und Strict verwenden unterschiedliche)
+    return tag.rpartition("}")[2]
+
+def _xml_column(ref: str) -> int:
+    """'AB12' → 27 (0-basiert)."""
+    col = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        col = col * 26 + ord(ch.upper()) - 64
+    return col - 1
+
+def _xml_text(element) -> str:
+    # Text eines <si>/<is>: alle <t>, außer der Lautschrift (<rPh>)
+    parts = []
+    for child in element:
+        name = _xml_local(child.tag)
+        if name == "t":
+            parts.append(child.text or "")
+        elif name == "r":
+            parts.extend(t.text or "" for t in child if _xml_local(t.tag) == "t")
+    return "".join(parts)
+
+def _xml_workbook_info(zf) -> tuple[str, bool]:
+    """Pfad des ersten Tabellenblatts im Archiv und ob das Datumssystem 1904 gilt."""
+    import xml.etree.ElementTree as ET
+
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    date1904 = False
+    rel_id = None
+    for element in workbook.iter():
+        name = _xml_local(element.tag)
+        if name == "workbookPr":
+            date1904 = element.get("date1904") in ("1", "true")
+        elif name == "sheet" and rel_id is None:
+            rel_id = next(v for k, v in element.attrib.items() if _xml_local(k) == "id")
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    target = next(r.get("Target") for r in rels if r.get("Id") == rel_id)
+    path = target.lstrip("/") if target.startswith("/") else "xl/" + target
+    return path, date1904
+
+def _xml_shared_strings(zf) -> list[str]:
+    import xml.etree.ElementTree as ET
+
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings = []
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, element in ET.iterparse(f):
+            if _xml_local(element.tag) == "si":
+                strings.append(_xml_text(element))
+                element.clear()
+    return strings
+
+def _xml_date_styles(zf) -> tuple[set[int], set[int]]:
+    """Indizes der Zellformate (Attribut s) mit Datums- bzw. Zeitdauerformat."""
+    import xml.etree.ElementTree as ET
+    from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+
+    if "xl/styles.xml" not in zf.namelist():
+        return set(), set()
+    styles = ET.fromstring(zf.read("xl/styles.xml"))
+    formats = dict(BUILTIN_FORMATS)
+    cell_xfs = []
+    for element in styles:
+        name = _xml_local(element.tag)
+        if name == "numFmts":
+            formats.update((int(f.get("numFmtId")), f.get("formatCode", "")) for f in element)
+        elif name == "cellXfs":
+            cell_xfs = [int(xf.get("numFmtId", 0)) for xf in element]
+    dates, durations = set(), set()
+    for idx, fmt_id in enumerate(cell_xfs):
+        fmt = formats.get(fmt_id, "")
+        if is_date_format(fmt):
+            dates.add(idx)
+            if is_timedelta_format(fmt):
+                durations.add(idx)
+    return dates, durations
+
+@contextlib.contextmanager
+def _first_sheet_xml(path: str | Path):
+    """
+    Liest das Blatt-XML direkt (nur Standardbibliothek + Datumsformate aus openpyxl). Jede Zeile wird
+    nach dem Auswerten aus dem Baum entfernt – der Speicher bleibt auch bei sehr großen Blättern konstant.
+    """
+    import zipfile
+    import xml.etree.ElementTree as ET
+    from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel
+
+    zf = zipfile.ZipFile(path)
+    try:
+        sheet_path, date1904 = _xml_workbook_info(zf)
+        shared = _xml_shared_strings(zf)
+        dates, durations = _xml_date_styles(zf)
+        epoch = CALENDAR_MAC_1904 if date1904 else CALENDAR_WINDOWS_1900
+
+        def value(cell, v):
+            t = cell.get("t", "n")
+            if t == "inlineStr":
+                inline = next((c for c in cell if _xml_local(c.tag) == "is"), None)
+                return _xml_text(inline) if inline is not None else None
+            if v is None or v == "":
+                return None
+            if t == "n":
+                number = float(v) if any(c in v for c in ".eE") else int(v)
+                style = int(cell.get("s", 0))
+                if style in dates:
+                    return from_excel(number, epoch, timedelta=style in durations)
+                return number
+            if t == "s":
+                return shared[int(v)]
+            if t == "b":
+                return bool(int(v))
+            if t == "d":
+                return datetime.fromisoformat(v)
+            return v  # str, e
+
+        def parse_row(row):
+            values = []
+            col = -1
+            for cell in row:
+                if _xml_local(cell.tag) != "c":
+                    continue
+                ref = cell.get("r")
+                col = _xml_column(ref) if ref else col + 1
+                v = next((c.text for c in cell if _xml_local(c.tag) == "v"), None)
+                values.extend([None] * (col - len(values)))
+                values.append(value(cell, v))
+            return values
+
+        def rows(min_row: int = 1, max_col: int | None = None):
+            with zf.open(sheet_path) as f:
+                sheet_data = None
+                row_no = 0
+                for event, element in ET.iterparse(f, events=("start", "end")):
+                    name = _xml_local(element.tag)
+                    if event == "start":
+                        if name == "sheetData":
+                            sheet_data = element
+                        continue
+                    if name != "row":
+                        continue
+                    idx = int(element.get("r") or row_no + 1)
+                    values = parse_row(element)
+                    sheet_data.remove(element)
+                    # fehlende Zeilen wie openpyxl als leere Zeilen
+                    for row_no in range(row_no + 1, idx):
+                        if row_no >= min_row:
+                            yield ()
+                    row_no = idx
+                    if idx >= min_row:
+                        yield tuple(values if max_col is None else values[:max_col])
+
+        yield rows
+    finally:
+        zf.close()
+
+EXCEL_READERS = {
+    "calamine": _first_sheet_calamine,
+    "openpyxl": _first_sheet_openpyxl,
+    "xml": _first_sheet_xml,
+}
+
+def resolve_excel_reader(engine: str | None = None) -> str:
+    engine = engine or EXCEL_READER
+    if engine == "auto":
+        return "calamine" if importlib.util.find_spec("python_calamine") is not None else "openpyxl"
+    if engine not in EXCEL_READERS:
+        raise ValueError(f"Unbekannte Excel-Engine zum Lesen: {engine!r} (erlaubt: auto, {', '.join(EXCEL_READERS)})")
+    return engine
+
+def open_first_sheet(path: str | Path, engine: str | None = None):
+    """
+    Öffnet das erste Tabellenblatt (Kontextmanager). Liefert rows(min_row=1, max_col=None):
+    Zeilen als Tupel, leere Zellen als None, Datumszellen als datetime – unabhängig von der Engine.
+    """
+    return EXCEL_READERS[resolve_excel_reader(engine)](path)
+
+def _scan_for_header(rows, expected_headers: list[str]) -> tuple[int, list[str]] | None:
+    """Liest rows bis zur ersten Zeile mit allen expected_headers. Rückgabe: (Zeilenindex, Kopfzeile)."""
+    for idx, row in enumerate(rows):
+        normalized_row = [str(v).strip() if v is not None else "" for v in row]
+        if all(h in normalized_row for h in expected_headers):
+            return idx, normalized_row
+    return None
+
+def _iter_projected(rows, col_idx: list[int], columns: list, min_row: int = 1, chunk_rows: int | None = None):
+    """
+    Liest ab Zeile min_row (1-basiert) nur die Spalten col_idx (0-basiert). Spalten rechts davon
+    werden gar nicht erst ausgewertet, Zeilen ohne Wert in diesen Spalten entfallen.
+    Liefert DataFrames zu je chunk_rows Zeilen (None = alles in einem, auch wenn leer).
+    """
+    data = []
+    for row in rows(min_row=min_row, max_col=max(col_idx) + 1):
+        n = len(row)
+        values = [_excel_cell(row[i]) if i < n else None for i in col_idx]
+        if any(v is not None for v in values):
+            data.append(values)
+            if chunk_rows and len(data) >= chunk_rows:
+                yield pd.DataFrame(data, columns=columns)
+                data = []
+    if data or not chunk_rows:
+        yield pd.DataFrame(data, columns=columns)
+
+def find_header_row(path: str | Path, expected_headers: list[str], engine: str | None = None) -> int:
+    """0-basierter Index der Kopfzeile im ersten Tabellenblatt (nur die Suche, ohne Daten zu lesen)."""
+    with open_first_sheet(path, engine) as rows:
+        found = _scan_for_header(rows(), expected_headers)
+    if found is None:
+        raise ValueError("Konnte keine Kopfzeile mit den erwarteten Spaltenüberschriften finden.")
+    return found[0]
+
+def iter_excel_from_header(path: str | Path, expected_headers: list[str], columns: list[str],
+                           chunk_rows: int | None = None, engine: str | None = None):
+    """
+    Liest das erste Tabellenblatt zeilenweise ein (Engine siehe EXCEL_READER).
+    Die Suche nach der Kopfzeile endet bei der ersten Zeile, die alle expected_headers enthält;
+    danach werden nur noch die Spalten aus columns gelesen, komplett leere Zeilen entfallen.
+    Liefert DataFrames zu je chunk_rows Zeilen (None = ein DataFrame).
+    """
+    with open_first_sheet(path, engine) as rows:
+        with PROFILE.stage("header"):
+            found = _scan_for_header(rows(), expected_headers)
+        if found is None:
+            raise ValueError("Konnte keine Kopfzeile mit den erwarteten Spaltenüberschriften finden.")
+        header_idx, header_row = found
+        col_idx = [header_row.index(c) for c in columns]
+        yield from _iter_projected(rows, col_idx, columns, min_row=header_idx + 2, chunk_rows=chunk_rows)
+
+def read_excel_from_header(path: str | Path, expected_headers: list[str], columns: list[str],
+                           engine: str | None = None) -> pd.DataFrame:
+    """Wie iter_excel_from_header, aber als ein DataFrame."""
+    with contextlib.closing(iter_excel_from_header(path, expected_headers, columns, engine=engine)) as frames:
+        return next(frames)
+
+def iter_excel_columns(path: str | Path, col_idx: list[int], chunk_rows: int | None = None, engine: str | None = None):
+    """Liest nur die Spalten col_idx (0-basiert, ohne Kopfzeile); Spaltennamen = Positionen wie bei header=None."""
+    with open_first_sheet(path, engine) as rows:
+        yield from _iter_projected(rows, col_idx, col_idx, chunk_rows=chunk_rows)
+
+def read_excel_columns(path: str | Path, col_idx: list[int], engine: str | None = None) -> pd.DataFrame:
+    """Wie iter_excel_columns, aber als ein DataFrame."""
+    with contextlib.closing(iter_excel_columns(path, col_idx, engine=engine)) as frames:
+        return next(frames)
+
+import csv
+import mmap
+
+# Typen der NEF-Spalten; alle übrigen Spalten werden als Text gelesen
+NEF_SCHEMA = {"LG ID": "int", "Menge Kart.": "int"}
+# Große NEF-Dateien blockweise verarbeiten, damit nie die ganze Datei als Text im Speicher liegt
+NEF_CHUNK_ROWS = 100_000
+NEF_CHUNK_MIN_BYTES = 20 * 1024 * 1024
+
+def _sniff_csv(path: str | Path) -> tuple[str, str, list[str] | None, int]:
+    """
+    Erkennt Trenner, Encoding und Kopfzeile aus den ersten 4 KB (per mmap, ohne die Datei zu lesen).
+    Rückgabe: (Trenner, Encoding, Kopfzeile oder None, ungefähre Bytes pro Zeile)
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            sample = b""
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                sample = mm[:4096]
+                if len(mm) > len(sample) and b"\n" in sample:
+                    # nicht mitten in einem (UTF-8-)Zeichen abschneiden
+                    sample = sample[:sample.rindex(b"\n") + 1]
+
+    encoding = None
+    for enc in ("utf-8-sig", "cp1252", "latin1"):
+        try:
+            text = sample.decode(enc, errors="strict")
+            encoding = enc
+            break
+        except Exception:
+            pass
+    if encoding is None:
+        encoding = "latin1"
+        text = sample.decode(encoding, errors="ignore")
+
+    try:
+        dialect = csv.Sniffer().sniff(text, delimiters=";,|\t,")
+        sep = dialect.delimiter
+    except Exception:
+        sep = ";"
+
+    # Kopfzeile nur, wenn sie vollständig in der Probe steht
+    header = next(csv.reader(text.splitlines(), delimiter=sep), None) if "\n" in text else None
+    row_bytes = max(1, len(sample) // max(1, sample.count(b"\n")))
+    return sep, encoding, header, row_bytes
+
+def _arrow_csv_options(sep: str, encoding: str, header: list[str], schema: dict[str, str], block_size: int | None = None):
+    """Leseoptionen für pyarrow.csv: Spalten aus schema als int64, alle anderen als Text."""
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    read_options = pacsv.ReadOptions(encoding=encoding)
+    if block_size:
+        read_options.block_size = block_size
+    column_types = {name: pa.int64() if schema.get(name.strip()) == "int" else pa.string() for name in header}
+    # leere Zellen wie bei pandas als fehlend, nicht als ""
+    convert_options = pacsv.ConvertOptions(column_types=column_types, strings_can_be_null=True)
+    return read_options, pacsv.ParseOptions(delimiter=sep), convert_options
+
+def _arrow_to_pandas(table) -> pd.DataFrame:
+    import pyarrow as pa
+    # int64 mit Lücken bleibt ganzzahlig (Int64) statt float
+    return table.to_pandas(types_mapper={pa.int64(): pd.Int64Dtype()}.get)
+
+def _read_csv_arrow(path: str | Path, options) -> pd.DataFrame:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    read_options, parse_options, convert_options = options
+    table = pacsv.read_csv(pa.memory_map(str(path)), read_options=read_options,
+                           parse_options=parse_options, convert_options=convert_options)
+    return _arrow_to_pandas(table)
+
+def _iter_csv_chunks(path: str | Path, chunksize: int, sep: str, encoding: str, options=None):
+    """
+    Liest die CSV blockweise in einem Durchgang. Mit options (pyarrow) typisiert; scheitert ein Block an
+    den Ganzzahlspalten (z.B. "1.000"), geht es mit der C-Engine als Text weiter – ab dem ersten noch
+    nicht gelieferten Datensatz (gezählt nach Datensätzen, nicht nach Zeilen der Datei).
+    Die Datei wird fortlaufend gelesen statt gemappt – gemappte Seiten zählen sonst bis zum Ende zum Speicher.
+    """
+    done = 0
+    if options is not None:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+
+        read_options, parse_options, convert_options = options
+        try:
+            with pa.OSFile(str(path)) as source:
+                reader = pacsv.open_csv(source, read_options=read_options,
+                                        parse_options=parse_options, convert_options=convert_options)
+                for batch in reader:
+                    done += batch.num_rows
+                    yield _arrow_to_pandas(pa.Table.from_batches([batch]))
+            return
+        except pa.ArrowInvalid:
+            pass
+
+    with pd.read_csv(path, sep=sep, encoding=encoding, dtype=str, chunksize=chunksize) as reader:
+        for chunk in reader:
+            if done >= len(chunk):
+                done -= len(chunk)
+                continue
+            yield chunk.iloc[done:]
+            done = 0
+
+def read_csv_robust(path: str | Path, schema: dict[str, str] | None = None, chunksize: int | None = None):
+    """
+    Liest eine CSV mit erkanntem Trenner/Encoding. Rückgabe: (DataFrame, Trenner, Encoding).
+    Ist pyarrow installiert, werden die Spalten aus schema beim Lesen als Ganzzahl typisiert
+    (alle anderen als Text); mit chunksize kommt statt des DataFrames ein Iterator über Blöcke.
+    """
+    sep, encoding, header, row_bytes = _sniff_csv(path)
+
+    options = None
+    if schema and header and importlib.util.find_spec("pyarrow") is not None:
+        block_size = max(1 << 16, chunksize * row_bytes) if chunksize else None
+        options = _arrow_csv_options(sep, encoding, header, schema, block_size)
+
+    if chunksize:
+        return _iter_csv_chunks(path, chunksize, sep, encoding, options), sep, encoding
+
+    if options is not None:
+        import pyarrow as pa
+        try:
+            return _read_csv_arrow(path, options), sep, encoding
+        except pa.ArrowInvalid:
+            # z.B. "1.000" in einer Zahlenspalte → als Text lesen, die Aufbereitung parst selbst
+            pass
+
+    df = pd.read_csv(path, sep=sep, encoding=encoding, dtype=str, memory_map=True)
+    return df, sep, encoding
+
+# =====================================
+# Kunden (Profile)
+# =====================================
+# Jeder Kunde ist ein Profil: Einlesen, Spaltenzuordnung, Aufbereitung und Ausgabe.
+# Abweichungen und neue Kunden stehen im Abschnitt "kunden" von UnivImport.json (neben dem Skript),
+# z.B. {"kunden": {"ng": {"prefix": "NGX "}}} – Felder, die dort fehlen, kommen aus dem eingebauten Profil.
+# Die Tabellen der Normalisierer stehen in "lademittel" und "einheit" (siehe LADEMITTEL_MAPPING).
+KONFIG_DATEI = "UnivImport.json"
+
+AUSGABE_SPALTEN = [
+    "Nr.",
+    "Artikel-Nr.",
+    "Artikelbezeichnung",
+    "LG ID",
+    "Charge",
+    "Menge PS",
+    "Einheit",
+    "Lademittel",
+    "MHD",
+    "Gewicht kg",
+    "Lagerort",
+    "Sonstiger Text",
+]
+
+KUNDEN_PROFILE = {
+    "standard": {
+        "auswahl": "1",
+        "label": "MB",
+        "eingabe": INPUT_MB,
+        # Kopfzeile suchen, nur diese Spalten lesen (Überschrift → Zielspalte)
+        "leser": "excel_kopf",
+        "spalten": rename_map,
+        "artikel_muster": r"\d+",
+        "normalisierer": {"Einheit": "einheit", "Lademittel": "lademittel"},
+        "gruppieren": True,
+        "zfill": 6,
+        "prefix": "MB ",
+        "dateimuster": ["mappe*"],
+        "suffixe": [{"spalte": "Sonstiger Text", "wert": "verkaufsware", "anhang": " S"}],
+    },
+    "ng": {
+        "auswahl": "2",
+        "label": "NG",
+        "eingabe": INPUT_NG,
+        # ohne Kopfzeile: Spaltenposition (0-basiert) → Zielspalte
+        "leser": "excel_spalten",
+        "spalten": {"0": "Artikel-Nr.", "1": "Gewicht kg", "5": "MHD", "6": "Charge", "7": "LG ID"},
+        "vorgaben": {"Menge PS": 1, "Einheit": "BigBag", "Lademittel": ""},
+        "artikelstamm": "NG",
+        "artikel_muster": r"\d+(?:\.\d+)?",
+        "normalisierer": {"Einheit": "einheit", "Lademittel": "lademittel"},
+        "gruppieren": True,
+        "prefix": "NG ",
+        "dateimuster": ["ng*"],
+    },
+    "nef": {
+        "auswahl": "3",
+        "label": "NEF",
+        "eingabe": INPUT_NEF,
+        # CSV: alle Spalten lesen, nur die genannten umbenennen
+        "leser": "csv",
+        "schema": NEF_SCHEMA,
+        "spalten": {"Menge Kart.": "Menge PS", "Bruttogewicht kg": "Gewicht kg"},
+        "pflicht": ["LG ID", "Artikel-Nr.", "Artikelbezeichnung", "Menge PS", "MHD", "Charge"],
+        "vorgaben": {"Einheit": "UMK", "Gewicht kg": ""},
+        "mhd_roh_behalten": True,
+        "sonstiger_text": False,
+        "prefix": "NEF ",
+        "dateimuster": ["*nef*"],
+        "ausgabe": [c for c in AUSGABE_SPALTEN if c not in ("Lademittel", "Sonstiger Text")],
+    },
+}
+
+# Pflichtfelder eines Profils
+PROFIL_PFLICHT = {
+    "auswahl": "Nummer im Auswahlmenü",
+    "label": "Anzeigename",
+    "eingabe": "Standard-Eingabedatei",
+    "leser": "excel_kopf | excel_spalten | csv",
+    "spalten": "Quelle → Zielspalte",
+}
+
+# Optionale Profilfelder mit ihren Vorgaben
+PROFIL_FELDER = {
+    "schema": {},                 # csv: Quellspalten, die als Ganzzahl gelesen werden
+    "pflicht": [],                # Zielspalten, die nach dem Einlesen vorhanden sein müssen
+    "vorgaben": {},               # Werte für Zielspalten, die die Quelle nicht liefert
+    "artikelstamm": None,         # Kundenfilter für artikel.xlsx → Artikelbezeichnung
+    "artikel_muster": None,       # nur Zeilen mit passender Artikel-Nr. (regulärer Ausdruck)
+    "normalisierer": {},          # Zielspalte → Name aus NORMALISIERER
+    "mhd_roh_behalten": False,    # nicht erkennbare MHD wie geliefert übernehmen statt leeren
+    "gruppieren": False,          # je LG ID zusammenfassen
+    "zfill": 0,                   # Artikel-Nr. nach dem Gruppieren auf diese Breite auffüllen
+    "prefix": "",                 # vor jede Artikel-Nr.
+    "suffixe": [],                # [{"spalte", "wert", "anhang"}] – Anhang, wenn spalte == wert (ohne Groß/Klein)
+    "sonstiger_text": True,       # 'Sonstiger Text' abfragen/übernehmen
+    "ausgabe": AUSGABE_SPALTEN,   # Spalten der Import-Datei in dieser Reihenfolge
+    "dateimuster": [],            # Watch: Dateinamen dieses Kunden, z.B. ["ng*"] (ohne Groß/Klein)
+    "watch_vorgaben": {},         # Watch: {"lagerort", "sonstiger_text"} (--lagerort / --text haben Vorrang)
+}
+
+WATCH_VORGABE_FELDER = ("lagerort", "sonstiger_text")
+
+def _konfig_path() -> Path:
+    try:
+        return Path(__file__).resolve().parent / KONFIG_DATEI
+    except NameError:
+        return Path(KONFIG_DATEI)
+
+_KONFIG: dict | None = None
+_KONFIG_LOCK = threading.Lock()
+
+def load_konfig() -> dict:
+    """Inhalt von UnivImport.json (einmal je Prozess gelesen); ohne Datei leer."""
+    global _KONFIG
+    with _KONFIG_LOCK:
+        if _KONFIG is None:
+            path = _konfig_path()
+            try:
+                konfig = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+            except (OSError, ValueError) as e:
+                raise ValueError(f"Konfiguration {path.name} nicht lesbar: {e}") from e
+            if not isinstance(konfig, dict):
+                raise ValueError(f"Konfiguration {path.name}: erwartet ein Objekt mit Abschnitten wie \"kunden\"")
+            _KONFIG = konfig
+        return _KONFIG
+
+class KundenPlan:
+    """
+    Aus einem Profil übersetzter Ablauf. Alles, was je Zeile gleich bleibt (Leser, Muster,
+    Spaltenoperationen, Suffixregeln), wird hier einmal aufgelöst; normalize wendet die
+    Operationen danach in einem Durchgang auf die gefilterten Zeilen an.
+    """
+
+    def __init__(self, kunde: str, profil: dict):
+        unbekannt = sorted(set(profil) - set(PROFIL_PFLICHT) - set(PROFIL_FELDER))
+        if unbekannt:
+            raise ValueError(f"Kundenprofil {kunde!r}: unbekannte Felder {unbekannt}")
+        fehlend = [k for k in PROFIL_PFLICHT if profil.get(k) is None]
+        p = {**PROFIL_FELDER, **profil}
+        if fehlend:
+            raise ValueError(f"Kundenprofil {kunde!r}: Angaben fehlen: {fehlend}")
+
+        self.kunde = kunde
+        self.auswahl = str(p["auswahl"])
+        self.label = str(p["label"])
+        self.eingabe = str(p["eingabe"])
+        if p["leser"] not in KUNDEN_LESER:
+            raise ValueError(f"Kundenprofil {kunde!r}: Leser {p['leser']!r} unbekannt – erlaubt: {', '.join(KUNDEN_LESER)}")
+        self.leser = p["leser"]
+        self.lesen = KUNDEN_LESER[p["leser"]]
+        self.spalten = dict(p["spalten"])
+        if self.leser == "excel_spalten":
+            try:
+                self.positionen = [int(k) for k in self.spalten]
+            except ValueError:
+                raise ValueError(f"Kundenprofil {kunde!r}: excel_spalten erwartet Spaltenpositionen, nicht {list(self.spalten)}") from None
+        self.schema = dict(p["schema"])
+        self.pflicht = list(p["pflicht"])
+        self.vorgaben = dict(p["vorgaben"])
+        self.artikelstamm = p["artikelstamm"]
+        self.artikel_muster = re.compile(p["artikel_muster"]) if p["artikel_muster"] else None
+        self.gruppieren = bool(p["gruppieren"])
+        self.zfill = int(p["zfill"])
+        self.prefix = str(p["prefix"])
+        self.suffixe = [(r["spalte"], str(r["wert"]).lower(), r["anhang"]) for r in p["suffixe"]]
+        self.sonstiger_text = bool(p["sonstiger_text"])
+        self.ausgabe = list(p["ausgabe"])
+        if isinstance(p["dateimuster"], str) or not all(isinstance(m, str) for m in p["dateimuster"]):
+            raise ValueError(f"Kundenprofil {kunde!r}: dateimuster erwartet eine Liste von Texten")
+        self.dateimuster = [m.lower() for m in p["dateimuster"]]
+        unbekannt = sorted(set(p["watch_vorgaben"]) - set(WATCH_VORGABE_FELDER))
+        if unbekannt:
+            raise ValueError(f"Kundenprofil {kunde!r}: watch_vorgaben kennt nur {', '.join(WATCH_VORGABE_FELDER)}, nicht {unbekannt}")
+        self.watch_vorgaben = {k: str(v) for k, v in p["watch_vorgaben"].items()}
+        self.operationen = self._compile_operationen(p)
+
+    def _compile_operationen(self, p: dict) -> list[tuple[str, str, object]]:
+        """Je Zielspalte eine Funktion Series → Series, mit dem PROFILE-Abschnitt, unter dem sie läuft."""
+        ops = []
+        if p["mhd_roh_behalten"]:
+            ops.append(("mhd", "MHD", lambda s: format_mhd(s).fillna(s)))
+        else:
+            ops.append(("mhd", "MHD", format_mhd))
+
+        for col, name in p["normalisierer"].items():
+            if name not in NORMALISIERER:
+                raise ValueError(f"Kundenprofil {self.kunde!r}: Normalisierer {name!r} unbekannt – erlaubt: {', '.join(NORMALISIERER)}")
+            ops.append(("zuordnung", col, lambda s, func=NORMALISIERER[name]: map_unique(s, func)))
+
+        if self.gruppieren:
+            # Kompakte Typen für das groupby; gerundet und ganzzahlig wird erst nach dem Summieren
+            ops.append(("zahlen", "Menge PS", lambda s: _int_if_integral(parse_german_number(s))))
+            ops.append(("zahlen", "Gewicht kg", parse_german_number))
+            ops.append(("typen", "LG ID", lg_key))
+        else:
+            ops.append(("zahlen", "Menge PS", lambda s: parse_german_number(s).astype(int)))
+            ops.append(("zahlen", "Gewicht kg", lambda s: parse_german_number(s).round(2)))
+            ops.append(("typen", "LG ID", to_int))
+        return ops
+
+def kunden_profile() -> dict[str, dict]:
+    """Eingebaute Profile, feldweise ergänzt um die aus der Konfiguration (null schaltet einen Kunden ab)."""
+    profile = {kunde: dict(p) for kunde, p in KUNDEN_PROFILE.items()}
+    kunden = load_konfig().get("kunden", {})
+    if not isinstance(kunden, dict):
+        raise ValueError(f"Konfiguration {KONFIG_DATEI}: \"kunden\" muss ein Objekt Kunde → Profil sein")
+    for kunde, abweichung in kunden.items():
+        if abweichung is not None and not isinstance(abweichung, dict):
+            raise ValueError(f"Konfiguration {KONFIG_DATEI}: kunden[{kunde!r}] muss ein Objekt oder null sein")
+        if abweichung is None:
+            profile.pop(kunde, None)
+        else:
+            profile[kunde] = {**profile.get(kunde, {}), **abweichung}
+    return profile
+
+_PLAENE: dict[str, KundenPlan] | None = None
+_PLAENE_LOCK = threading.Lock()
+
+def kunden_plaene() -> dict[str, KundenPlan]:
+    """Alle Kundenpläne – einmal je Prozess aus den Profilen übersetzt (Reihenfolge = Auswahlnummer)."""
+    global _PLAENE
+    with _PLAENE_LOCK:
+        if _PLAENE is None:
+            plaene = [KundenPlan(kunde, p) for kunde, p in kunden_profile().items()]
+            plaene.sort(key=lambda plan: (len(plan.auswahl), plan.auswahl))
+            nummern = [plan.auswahl for plan in plaene]
+            doppelt = sorted({n for n in nummern if nummern.count(n) > 1} | ({"0"} & set(nummern)))
+            if doppelt:
+                raise ValueError(f"Kundenprofile: Auswahlnummer(n) {doppelt} mehrfach vergeben oder reserviert")
+            _PLAENE = {plan.kunde: plan for plan in plaene}
+        return _PLAENE
+
+def kunden_plan(kunde: str) -> KundenPlan:
+    try:
+        return kunden_plaene()[kunde]
+    except KeyError:
+        raise ValueError(f"Kein Kundenprofil für {kunde!r}.") from None
+
+def kunden_menue() -> dict[str, tuple[str, str | None]]:
+    """Auswahlnummer → (Anzeigename, Kundenschlüssel); '0' beendet."""
+    menue = {"0": ("BEENDEN", None)}
+    for plan in kunden_plaene().values():
+        menue[plan.auswahl] = (plan.label, plan.kunde)
+    return menue
+
+def resolve_kunde(text: str) -> str:
+    """Liefert den internen Kundenschlüssel zu Auswahlnummer, Kürzel oder Schlüssel (z.B. '2', 'NG', 'ng')."""
+    t = str(text).strip().lower()
+    for key, (label, kunde) in kunden_menue().items():
+        if kunde is None:
+            continue
+        if t in (key, label.lower(), kunde):
+            return kunde
+    erlaubt = ", ".join(plan.label for plan in kunden_plaene().values())
+    raise ValueError(f"Unbekannter Kunde: {text!r} – erlaubt sind {erlaubt}.")
+
+def default_input_file(kunde: str) -> str:
+    return kunden_plan(kunde).eingabe
+
+def kunden_prefix(kunde: str) -> str:
+    return kunden_plan(kunde).prefix
+
+# =====================================
+# Pipeline-Schritte
+# =====================================
+
+def _lese_excel_kopf(path: str | Path, plan: KundenPlan, chunk_rows: int | None = None):
+    """Kopfzeile suchen und nur die Spalten aus plan.spalten lesen (Überschrift → Zielspalte)."""
+    headers = list(plan.spalten)
+    engine = STREAM_EXCEL_READER if chunk_rows else None
+    for df in iter_excel_from_header(path, headers, headers, chunk_rows, engine):
+        df.columns = [plan.spalten[h] for h in headers]
+        yield df
+
+def _lese_excel_spalten(path: str | Path, plan: KundenPlan, chunk_rows: int | None = None):
+    """Ohne Kopfzeile: nur die Spaltenpositionen aus plan.spalten lesen."""
+    engine = STREAM_EXCEL_READER if chunk_rows else None
+    for df in iter_excel_columns(path, plan.positionen, chunk_rows, engine):
+        df.columns = list(plan.spalten.values())
+        yield df
+
+def _lese_csv(path: str | Path, plan: KundenPlan, chunk_rows: int | None = None):
+    """CSV mit erkanntem Trenner/Encoding; große Dateien blockweise. Spalten aus plan.spalten werden umbenannt."""
+    if chunk_rows is None and Path(path).stat().st_size >= NEF_CHUNK_MIN_BYTES:
+        chunk_rows = NEF_CHUNK_ROWS
+    data, sep, enc = read_csv_robust(path, schema=plan.schema or None, chunksize=chunk_rows)
+    print(Fore.CYAN + f"[{plan.label}] CSV gelesen (sep={sep!r}, encoding={enc!r})")
+    for df in (data if chunk_rows else [data]):
+        df.columns = [str(c).strip() for c in df.columns]
+        yield df.rename(columns=plan.spalten)
+
+# Einlesearten für KundenPlan.leser: (Pfad, Plan, chunk_rows) → DataFrames (ohne chunk_rows ggf. trotzdem mehrere)
+KUNDEN_LESER = {
+    "excel_kopf": _lese_excel_kopf,
+    "excel_spalten": _lese_excel_spalten,
+    "csv": _lese_csv,
+}
+
+def _prepare_input(df: pd.DataFrame, plan: KundenPlan, input_file: str | Path) -> tuple[pd.DataFrame, pd.DataFrame | None]:
+    """Pflichtspalten prüfen, Vorgaben ergänzen, ggf. Artikelbezeichnung setzen. Rückgabe: (df, Ersatztreffer)."""
+    missing_cols = [c for c in plan.pflicht if c not in df.columns]
+    if missing_cols:
+        raise ValueError(f"[{plan.label}] Fehlende Spalten in {Path(input_file).name}: {missing_cols}. Vorhanden: {list(df.columns)}")
+    vorgaben = {c: v for c, v in plan.vorgaben.items() if c not in df.columns}
+    if vorgaben:
+        df = df.assign(**vorgaben)
+
+    fallback = None
+    if plan.artikelstamm:
+        # Artikelstamm → Bezeichnung (ggf. läuft gerade noch das Update der artikel.xlsx)
+        df = df[df["Artikel-Nr."].notna()]
+        wait_for_update()
+        with PROFILE.stage("artikel"):
+            artikel_map = load_artikelmap_cached("artikel.xlsx", kunde_filter=plan.artikelstamm)
+            keys = extract_artikel_keys(df["Artikel-Nr."].astype(str).str.strip())
+            names, fallback = lookup_artikel(keys, artikel_map)
+            df = df.assign(**{"Artikel-Nr.": keys, "Artikelbezeichnung": names})
+    return df, fallback
+
+def read_input(input_file: str | Path, kunde: str) -> pd.DataFrame:
+    """
+    Liest die Eingabedatei nach dem Kundenprofil ein: Spalten tragen danach schon die Zielnamen,
+    fehlende Spalten sind mit den Vorgaben ergänzt, ggf. ist die Artikelbezeichnung aus dem Artikelstamm gesetzt.
+    """
+    if not Path(input_file).exists():
+        raise FileNotFoundError(f"Eingabedatei nicht gefunden: {input_file}")
+
+    plan = kunden_plan(kunde)
+    frames = list(plan.lesen(input_file, plan))
+    df = frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    df, fallback = _prepare_input(df, plan, input_file)
+    if fallback is not None:
+        print_artikel_fallback(fallback)
+    return df
+
+def iter_input(input_file: str | Path, kunde: str, chunk_rows: int):
+    """Wie read_input, aber blockweise zu chunk_rows Zeilen; Ersatztreffer im Artikelstamm werden am Ende gesammelt gemeldet."""
+    if not Path(input_file).exists():
+        raise FileNotFoundError(f"Eingabedatei nicht gefunden: {input_file}")
+
+    plan = kunden_plan(kunde)
+    reports = []
+    for chunk in plan.lesen(input_file, plan, chunk_rows):
+        chunk, fallback = _prepare_input(chunk, plan, input_file)
+        if fallback is not None and len(fallback):
+            reports.append(fallback)
+        yield chunk
+    if reports:
+        report = pd.concat(reports, ignore_index=True)
+        report = report.groupby(["Artikelnummer", "Zuordnung", "Bezeichnung"], as_index=False, sort=False)["Zeilen"].sum()
+        print_artikel_fallback(report)
+
+# Spalten mit wenigen, oft wiederholten Texten – als category je Wert nur einmal gespeichert
+# (LG ID nur als Gruppierschlüssel aus lg_key, ganzzahlig wird sie erst nach dem Zusammenfassen)
+CATEGORY_COLUMNS = ["LG ID", "Artikel-Nr.", "Artikelbezeichnung", "Einheit", "Lademittel", "MHD"]
+
+def map_unique(values: pd.Series, func) -> pd.Series:
+    """Wendet func einmal je unterschiedlichem Wert an (auch auf fehlende) und liefert eine category-Spalte."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    new_codes, categories = pd.factorize(pd.Series([func(v) for v in uniques], dtype=object))
+    return pd.Series(pd.Categorical.from_codes(new_codes[codes], categories=categories), index=values.index)
+
+def _lg_text(v) -> str:
+    """Eine LHM-Nr. als Schlüsseltext: Zahlen ohne ".0" (Excel liefert oft float), Texte ohne Leerzeichen außen."""
+    if isinstance(v, (int, float, np.integer, np.floating)) and not isinstance(v, bool) and float(v).is_integer():
+        return str(int(v))
+    return str(v).strip()
+
+def lg_key(values: pd.Series) -> pd.Series:
+    """
+    Gruppierschlüssel je Palette aus der rohen LHM-Nr. (category). Nicht-numerische Nummern wie
+    "PAL-1" bleiben eigene Paletten – als Zahl würden sie alle 0 und zusammengelegt.
+    """
+    return map_unique(values, lambda v: v if pd.isna(v) else _lg_text(v))
+
+def _int_if_integral(values: pd.Series) -> pd.Series:
+    """Mengen nur ganzzahlig (kleinstmöglicher Typ) speichern, wenn dabei nichts abgeschnitten wird."""
+    if (values % 1 == 0).all():
+        return pd.to_numeric(values.astype("int64"), downcast="integer")
+    return values
+
+def normalize(df: pd.DataFrame, kunde: str) -> pd.DataFrame:
+    """
+    Wendet den Kundenplan in einem Durchgang an: eine gemeinsame Zeilenmaske (Artikel-Nr.-Muster,
+    bei Gruppierung auch vorhandene LG ID), dann je Spalte die Operation aus dem Plan.
+    Bei Gruppierung werden wiederkehrende Texte zusätzlich als category gespeichert.
+    """
+    plan = kunden_plan(kunde)
+    columns = {}
+
+    mask = None
+    if plan.artikel_muster is not None:
+        art = df["Artikel-Nr."].astype(str).str.strip()
+        mask = art.str.fullmatch(plan.artikel_muster.pattern, na=False)
+        columns["Artikel-Nr."] = art
+    if plan.gruppieren:
+        # Zeilen ohne LG ID entfallen beim Gruppieren ohnehin
+        mask = df["LG ID"].notna() if mask is None else mask & df["LG ID"].notna()
+    if mask is not None:
+        df = df[mask]
+        columns = {c: v[mask] for c, v in columns.items()}
+
+    for stage, col, func in plan.operationen:
+        if col in df.columns:
+            with PROFILE.stage(stage):
+                columns[col] = func(df[col])
+
+    if plan.gruppieren:
+        with PROFILE.stage("typen"):
+            for col in CATEGORY_COLUMNS:
+                values = columns.get(col, df.get(col))
+                if values is not None and not isinstance(values.dtype, pd.CategoricalDtype):
+                    columns[col] = values.astype("category")
+
+    return df.assign(**columns)
+
+# Zusammenfassung je LG ID; Spalten, die ein Kunde nicht hat, entfallen
+GROUP_AGG = {
+    "Artikel-Nr.": "first",
+    "Artikelbezeichnung": "first",
+    "Charge": "first",
+    "Menge PS": "sum",
+    "Einheit": "first",
+    "Lademittel": "first",
+    "MHD": "first",
+    "Gewicht kg": "sum",
+}
+
+def _group_lg(df: pd.DataFrame) -> pd.DataFrame:
+    """groupby je LG ID nach GROUP_AGG; Reihenfolge = erstes Auftreten. Auch auf Teilergebnisse anwendbar."""
+    return df.groupby("LG ID", as_index=False, sort=False, observed=True).agg(
+        {col: how for col, how in GROUP_AGG.items() if col in df.columns})
+
+def _finish_groups(df: pd.DataFrame, plan: KundenPlan) -> pd.DataFrame:
+    """Zusammengefasste Zeilen in die Ausgabetypen bringen (Artikel-Nr. aufgefüllt, Mengen ganzzahlig, Gewicht gerundet)."""
+    df["Artikel-Nr."] = df["Artikel-Nr."].astype(str).str.strip()
+    if plan.zfill:
+        df["Artikel-Nr."] = df["Artikel-Nr."].str.zfill(plan.zfill)
+
+    df["LG ID"] = to_int(df["LG ID"])
+    df["Menge PS"] = df["Menge PS"].astype(int)
+    df["Charge"] = to_int(df["Charge"]).astype(str)
+
+    df["Gewicht kg"] = df["Gewicht kg"].round(2)
+
+    return df
+
+def group_by_lg(df: pd.DataFrame, kunde: str) -> pd.DataFrame:
+    """Fasst die normalisierten Zeilen je LG ID zusammen (Menge/Gewicht summiert), falls der Plan das vorsieht."""
+    plan = kunden_plan(kunde)
+    if not plan.gruppieren:
+        return df
+
+    # LG ID ist nach normalize der Schlüssel aus lg_key
+    return _finish_groups(_group_lg(df), plan)
+
+def aggregate(df: pd.DataFrame, kunde: str) -> pd.DataFrame:
+    """Filtert, normalisiert und fasst je LG ID zusammen – alles nach dem Kundenplan."""
+    with PROFILE.stage("normalize"):
+        df = normalize(df, kunde)
+    with PROFILE.stage("groupby"):
+        return group_by_lg(df, kunde)
+
+def apply_prefix(df: pd.DataFrame, kunde: str) -> pd.DataFrame:
+    """Hängt die Suffixe aus dem Profil an (MB-Verkaufsware: ' S') und setzt das Kunden-Prefix vor die Artikel-Nr."""
+    plan = kunden_plan(kunde)
+    # Artikelnummern immer behandeln
+    df["Artikel-Nr."] = df["Artikel-Nr."].astype(str)
+
+    for spalte, wert, anhang in plan.suffixe:
+        mask = df[spalte].astype(str).str.lower() == wert
+        df.loc[mask, "Artikel-Nr."] = df.loc[mask, "Artikel-Nr."] + anhang
+
+    df["Artikel-Nr."] = plan.prefix + df["Artikel-Nr."]
+    return df
+
+def finalize(df: pd.DataFrame, kunde: str) -> pd.DataFrame:
+    """Nummeriert die Zeilen, wählt die Ausgabespalten und bringt die Werte ins CSV-Format."""
+    df = df.reset_index(drop=True)
+    if "Nr." not in df.columns:
+        df.insert(0, "Nr.", df.index + 1)
+    else:
+        df["Nr."] = range(1, len(df) + 1)
+
+    df = df[kunden_plan(kunde).ausgabe]
+
+
+    # Gewicht in CSV wieder mit Komma
+    if "Gewicht kg" in df.columns:
+        df["Gewicht kg"] = format_decimal_comma(df["Gewicht kg"])
+
+    # LG ID sicher numerisch (verhindert führendes "'" in Excel)
+    if "LG ID" in df.columns:
+        df["LG ID"] = to_int(df["LG ID"])
+
+    return df
+
+def process_frame(df: pd.DataFrame, kunde: str, lagerort: str = "", sonstiger_text: str = "",
+                  regeln: list[dict] | None = None) -> pd.DataFrame:
+    """Aufbereitung ohne Rückfragen (Rohdaten aus read_input/read_inputs): Lagerort / Sonstiger Text gelten für alle Zeilen."""
+    return finish_rows(aggregate(df, kunde), kunde, lagerort, sonstiger_text, regeln)
+
+def finish_rows(df: pd.DataFrame, kunde: str, lagerort: str = "", sonstiger_text: str = "",
+                regeln: list[dict] | None = None) -> pd.DataFrame:
+    """
+    Aufbereitete Zeilen → Ausgabe: Lagerort / Sonstiger Text für alle Zeilen, danach für die Zeilen
+    der Regeln (siehe apply_regeln), Prefix, Nummerierung, Ausgabespalten.
+    """
+    df["Lagerort"] = lagerort
+    df["Sonstiger Text"] = sonstiger_text if kunden_plan(kunde).sonstiger_text else ""
+    if regeln:
+        df = apply_regeln(df, kunde, regeln)
+
+    df = apply_prefix(df, kunde)
+    return finalize(df, kunde)
+
+def transform(df: pd.DataFrame, kunde: str, options: dict | None = None) -> pd.DataFrame:
+    """
+    Reine Umwandlung für die Einbindung als Bibliothek: Rohdaten aus read_input → fertige Import-Tabelle.
+    Keine Rückfragen und keine Dateizugriffe; df bleibt unverändert.
+    options: {"lagerort": ..., "sonstiger_text": ..., "regeln": [{"auswahl", "lagerort", "text"}, ...]}
+    (fehlende Angaben = leer)
+    """
+    options = options or {}
+    return process_frame(df.copy(deep=False), kunde, options.get("lagerort", ""), options.get("sonstiger_text", ""),
+                         options.get("regeln"))
+
+def process_file(input_file: str | Path, kunde: str, lagerort: str = "", sonstiger_text: str = "",
+                 regeln: list[dict] | None = None) -> pd.DataFrame:
+    """Kompletter Durchlauf ohne Rückfragen für eine Eingabedatei."""
+    return process_frame(read_input(input_file, kunde), kunde, lagerort, sonstiger_text, regeln)
+
+# =====================================
+# Zeilenauswahl (Regeln für Lagerort / Sonstiger Text)
+# =====================================
+# Eine Auswahl besteht aus Bedingungen, getrennt durch ";" – alle müssen zutreffen. Mehrere Werte
+# einer Bedingung, getrennt durch ",", genügen einzeln:
+#   artikel=10*,2034?              Artikel-Nr. nach Muster (* und ?, ohne Groß/Klein)
+#   charge=L24*                    Charge nach Muster
+#   mhd=01.01.2026..31.03.2026     MHD von..bis (eine Seite darf fehlen: ..31.03.2026) oder ein Tag
+#   lg=1000-1999,2500              LG ID: Bereiche oder einzelne
+#   zeile=1-10,17                  Zeilennummern wie angezeigt (auch ohne "zeile=": 1-10, 17)
+# "!=" statt "=" kehrt eine Bedingung um (z.B. charge!=X*). Ausgewertet wird spaltenweise (eine Maske
+# je Bedingung), nie Zeile für Zeile.
+# Regeln (Auswahl + Lagerort + Sonstiger Text) werden im Dialog unter einem Namen in UnivImport_regeln.json
+# (neben dem Skript) gespeichert und im Batch-Modus mit --regeln NAME angewendet. Zeilennummern hängen
+# von der einzelnen Datei ab und werden deshalb nicht gespeichert.
+REGEL_DATEI = "UnivImport_regeln.json"
+AUSWAHL_SEITE = 20               # Zeilen je Seite in Liste und Vorschau
+
+# Feld → Zielspalte (None = Zeilennummer)
+AUSWAHL_FELDER = {
+    "artikel": "Artikel-Nr.",
+    "charge": "Charge",
+    "mhd": "MHD",
+    "lg": "LG ID",
+    "zeile": None,
+}
+
+_AUSWAHL_BEDINGUNG = re.compile(r"\s*(?:(\w+)\s*(!?=))?(.*)", re.DOTALL)
+
+def _auswahl_bereiche(feld: str, werte: list[str]) -> list[tuple[int, int]]:
+    bereiche = []
+    for w in werte:
+        von, _, bis = w.partition("-")
+        try:
+            bereiche.append((int(von), int(bis or von)))
+        except ValueError:
+            raise ValueError(f"{feld}: {w!r} ist keine Zahl und kein Bereich (z.B. 100-200)") from None
+    return bereiche
+
+def _auswahl_zeitraeume(werte: list[str]) -> list[tuple[datetime | None, datetime | None]]:
+    def datum(text):
+        try:
+            return datetime.strptime(text.strip(), "%d.%m.%Y") if text.strip() else None
+        except ValueError:
+            raise ValueError(f"mhd: {text.strip()!r} ist kein Datum (TT.MM.JJJJ)") from None
+
+    zeitraeume = []
+    for w in werte:
+        von, sep, bis = w.partition("..")
+        zeitraeume.append((datum(von), datum(bis)) if sep else (datum(von),) * 2)
+    return zeitraeume
+
+def parse_auswahl(text: str) -> list[tuple[str, bool, object]]:
+    """
+    Übersetzt einen Auswahltext in Bedingungen (Feld, umgekehrt, Prüfwerte). Fehler (unbekanntes Feld,
+    kein Wert, falsche Zahl/Datum) als ValueError – vor dem ersten Zugriff auf Daten.
+    """
+    bedingungen = []
+    for teil in text.split(";"):
+        if not teil.strip():
+            continue
+        feld, op, rest = _AUSWAHL_BEDINGUNG.fullmatch(teil).groups()
+        feld = (feld or "zeile").lower()
+        if feld not in AUSWAHL_FELDER:
+            raise ValueError(f"Unbekanntes Feld {feld!r} – erlaubt: {', '.join(AUSWAHL_FELDER)}")
+        werte = [w.strip() for w in rest.split(",") if w.strip()]
+        if not werte:
+            raise ValueError(f"Bedingung {teil.strip()!r} ohne Wert")
+        if feld in ("artikel", "charge"):
+            # nur * und ? – fnmatch.translate erzeugt Ausdrücke, die Arrow (RE2) nicht versteht
+            pruefung = "|".join("(?:" + "".join(".*" if c == "*" else "." if c == "?" else re.escape(c) for c in w) + ")"
+                                for w in werte)
+        elif feld == "mhd":
+            pruefung = _auswahl_zeitraeume(werte)
+        else:
+            pruefung = _auswahl_bereiche(feld, werte)
+        bedingungen.append((feld, op == "!=", pruefung))
+    if not bedingungen:
+        raise ValueError("Leere Auswahl")
+    return bedingungen
+
+def auswahl_maske(df: pd.DataFrame, bedingungen: list[tuple[str, bool, object]]) -> pd.Series:
+    """Boolesche Maske über df für die Bedingungen aus parse_auswahl (Zeilennummern ab 1 in df-Reihenfolge)."""
+    mask = pd.Series(True, index=df.index)
+    for feld, umgekehrt, pruefung in bedingungen:
+        spalte = AUSWAHL_FELDER[feld]
+        if spalte is None:
+            values = pd.Series(range(1, len(df) + 1), index=df.index)
+        elif spalte in df.columns:
+            values = df[spalte]
+        else:
+            raise ValueError(f"{feld}: Spalte {spalte!r} gibt es bei diesem Kunden nicht")
+
+        if feld in ("artikel", "charge"):
+            treffer = values.astype("string").str.fullmatch(pruefung, case=False, na=False)
+        elif feld == "mhd":
+            dates = pd.to_datetime(values.astype("string"), format="%d.%m.%Y", errors="coerce")
+            treffer = pd.Series(False, index=df.index)
+            for von, bis in pruefung:
+                treffer |= (dates >= von if von else dates.notna()) & (dates <= bis if bis else dates.notna())
+        else:
+            numbers = pd.to_numeric(values, errors="coerce")
+            treffer = pd.Series(False, index=df.index)
+            for von, bis in pruefung:
+                treffer |= numbers.between(von, bis)
+        mask &= ~treffer if umgekehrt else treffer
+    return mask
+
+def apply_regeln(df: pd.DataFrame, kunde: str, regeln: list[dict]) -> pd.DataFrame:
+    """Setzt Lagerort / Sonstiger Text je Regel auf den ausgewählten Zeilen; spätere Regeln überschreiben frühere."""
+    mit_text = kunden_plan(kunde).sonstiger_text
+    for regel in regeln:
+        mask = auswahl_maske(df, parse_auswahl(regel["auswahl"]))
+        if regel.get("lagerort"):
+            df.loc[mask, "Lagerort"] = regel["lagerort"]
+        if regel.get("text") and mit_text:
+            df.loc[mask, "Sonstiger Text"] = regel["text"]
+    return df
+
+def _regel_path() -> Path:
+    try:
+        return Path(__file__).resolve().parent / REGEL_DATEI
+    except NameError:
+        return Path(REGEL_DATEI)
+
+def load_regelsaetze() -> dict[str, list[dict]]:
+    """Alle gespeicherten Regelsätze (Name → Regeln); ohne Datei leer."""
+    path = _regel_path()
+    try:
+        return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    except (OSError, ValueError) as e:
+        raise ValueError(f"Regeln {path.name} nicht lesbar: {e}") from e
+
+def load_regeln(name: str) -> list[dict]:
+    """Gespeicherter Regelsatz; jede Auswahl wird dabei geprüft (ValueError bei Fehlern)."""
+    regelsaetze = load_regelsaetze()
+    if name not in regelsaetze:
+        vorhanden = ", ".join(regelsaetze) or "keine"
+        raise ValueError(f"Keine Regeln {name!r} in {REGEL_DATEI} (vorhanden: {vorhanden})")
+    regeln = regelsaetze[name]
+    if not isinstance(regeln, list) or not all(isinstance(r, dict) for r in regeln):
+        raise ValueError(f"Regeln {name!r}: erwartet eine Liste von {{\"auswahl\", \"lagerort\", \"text\"}}")
+    for regel in regeln:
+        if any(feld == "zeile" for feld, _, _ in parse_auswahl(regel.get("auswahl", ""))):
+            raise ValueError(f"Regeln {name!r}: {regel['auswahl']!r} enthält Zeilennummern")
+    return regeln
+
+def save_regeln(name: str, regeln: list[dict]):
+    """Speichert (oder ersetzt) einen Regelsatz unter name."""
+    regelsaetze = load_regelsaetze()
+    regelsaetze[name] = regeln
+    path = _regel_path()
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(regelsaetze, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+# =====================================
+# Mehrere Eingabedateien zusammenführen
+# =====================================
+# Doppelte LG IDs über Dateien hinweg: "letzte" = nur die zuletzt angegebene Datei zählt,
+# "summe" = alle Zeilen bleiben (MB/NG werden beim Gruppieren aufsummiert)
+DUPLIKATE_REGELN = ("letzte", "summe")
+
+def read_inputs(input_files: list[str | Path], kunde: str, duplikate: str = "letzte",
+                use_processes: bool = False, jobs: int | None = None) -> pd.DataFrame:
+    """
+    Liest mehrere Eingabedateien eines Kunden gleichzeitig (Threads, mit use_processes je Datei ein Prozess)
+    und hängt die Rohdaten in der angegebenen Reihenfolge aneinander. Doppelte LG IDs über Dateien
+    hinweg werden gemeldet und nach duplikate aufgelöst.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+    if duplikate not in DUPLIKATE_REGELN:
+        raise ValueError(f"Unbekannte Regel für doppelte LG IDs: {duplikate!r} – erlaubt: {', '.join(DUPLIKATE_REGELN)}")
+    if len(input_files) == 1:
+        return read_input(input_files[0], kunde)
+
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(input_files)))
+    executor = ProcessPoolExecutor(workers) if use_processes else ThreadPoolExecutor(workers, thread_name_prefix="UnivImport-Lesen")
+    with executor:
+        futures = [executor.submit(read_input, f, kunde) for f in input_files]
+        errors = [(f, fut.exception()) for f, fut in zip(input_files, futures)]
+    failed = [f"{f}: {e}" for f, e in errors if e is not None]
+    if failed:
+        raise ValueError("Eingabedateien konnten nicht gelesen werden:\n  " + "\n  ".join(failed))
+
+    frames = [fut.result() for fut in futures]
+    return combine_inputs(frames, [Path(f).name for f in input_files], kunde, duplikate)
+
+def combine_inputs(frames: list[pd.DataFrame], names: list[str], kunde: str, duplikate: str = "letzte") -> pd.DataFrame:
+    """Hängt die Rohdaten mehrerer Dateien aneinander; LG IDs aus mehreren Dateien werden gemeldet und aufgelöst."""
+    lg_col = "LG ID"
+    df = pd.concat(frames, ignore_index=True)
+    datei = np.repeat(np.arange(len(frames)), [len(f) for f in frames])
+
+    valid = df[lg_col].notna().to_numpy()
+    pairs = pd.DataFrame({"lg": to_int(df.loc[valid, lg_col]).to_numpy(), "datei": datei[valid]}).drop_duplicates()
+    per_lg = pairs.groupby("lg")["datei"]
+    shared = per_lg.nunique()
+    shared = shared[shared > 1]
+    if shared.empty:
+        return df
+
+    regel = "es gilt die zuletzt angegebene Datei" if duplikate == "letzte" else "Mengen werden addiert"
+    print(Fore.YELLOW + f"[Zusammenführen] {len(shared)} LG ID(s) in mehreren Dateien – {regel}:")
+    listing = pairs[pairs["lg"].isin(shared.index)].groupby("lg", sort=False)["datei"].agg(list)
+    for lg, dateien in listing.head(10).items():
+        print(Fore.YELLOW + f"  LG ID {lg}: {', '.join(names[i] for i in dateien)}")
+    if len(listing) > 10:
+        print(Fore.YELLOW + f"  ... und {len(listing) - 10} weitere")
+
+    if duplikate == "letzte":
+        last = per_lg.max()
+        owner = np.full(len(df), -1)
+        owner[valid] = pd.Series(to_int(df.loc[valid, lg_col]).to_numpy()).map(last).to_numpy()
+        df = df[~valid | (owner == datei)].reset_index(drop=True)
+    return df
+
+# =====================================
+# Ausgabe
+# =====================================
+
+# Wiederholungen beim Ablegen auf dem Netzlaufwerk (Wartezeit verdoppelt sich je Versuch)
+OUTPUT_RETRIES = 4
+OUTPUT_RETRY_DELAY = 0.5
+
+def publish_file(local_path: str | Path, target: str | Path,
+                 retries: int = OUTPUT_RETRIES, delay: float = OUTPUT_RETRY_DELAY):
+    """
+    Kopiert eine fertige lokale Datei als .tmp neben das Ziel und benennt sie dann atomar um.
+    Der Import auf der anderen Seite sieht so nie eine halb geschriebene Datei.
+    """
+    target = Path(target)
+    tmp_target = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    for attempt in range(1, retries + 1):
+        try:
+            shutil.copyfile(local_path, tmp_target)
+            os.replace(tmp_target, target)
+            return
+        except OSError as e:
+            try:
+                tmp_target.unlink()
+            except OSError:
+                pass
+            if attempt == retries:
+                raise
+            print(Fore.YELLOW + f"[Ausgabe] {target}: {e} – neuer Versuch in {delay:g}s ({attempt}/{retries})")
+            time.sleep(delay)
+            delay *= 2
+
+@contextlib.contextmanager
+def local_temp_output(path: str | Path):
+    """Lokale Temp-Datei für das Ziel path; nach fehlerfreiem Schreiben wird sie per publish_file abgelegt."""
+    fd, tmp_path = tempfile.mkstemp(prefix="univimport_", suffix=Path(path).suffix)
+    os.close(fd)
+    try:
+        yield tmp_path
+        publish_file(tmp_path, path)
+    finally:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+def _write_via_local_temp(path: str | Path, write_func):
+    """Erzeugt die Datei zuerst lokal (write_func(tmp_path)) und legt sie dann per publish_file ab."""
+    with local_temp_output(path) as tmp_path:
+        write_func(tmp_path)
+
+CSV_SEP = ";"
+CSV_ENCODING = "utf-8-sig"
+
+def csv_bytes(df: pd.DataFrame) -> bytes:
+    """Import-CSV als Bytes (gleiches Format wie write_csv), z.B. als Antwort des Import-Dienstes."""
+    return df.to_csv(index=False, sep=CSV_SEP).encode(CSV_ENCODING)
+
+def write_csv(df: pd.DataFrame, path: str | Path):
+    with PROFILE.stage("csv"):
+        _write_via_local_temp(path, lambda tmp: df.to_csv(tmp, index=False, sep=CSV_SEP, encoding=CSV_ENCODING))
+    print(Fore.GREEN + f"CSV geschrieben nach: {path}")
+
+# Excel-Ausgabe: "auto" = xlsxwriter falls installiert, sonst openpyxl (write-only)
+XLSX_ENGINE = "auto"
+XLSX_SHEET_NAME = "Ruecktour"
+XLSX_MAX_COL_WIDTH = 25
+
+def xlsx_column_widths(df: pd.DataFrame, extra_excel_line: str = "") -> list[int]:
+    """Spaltenbreiten aus dem DataFrame (längster Text je Spalte inkl. Überschrift, +2, max. 25)."""
+    widths = []
+    for col_idx, col in enumerate(df.columns):
+        values = df[col]
+        max_length = len(str(col))
+        if pd.api.types.is_integer_dtype(values) and len(values):
+            max_length = max(max_length, len(str(values.max())), len(str(values.min())))
+        else:
+            lengths = values.dropna().astype(str).str.len()
+            if len(lengths):
+                max_length = max(max_length, int(lengths.max()))
+        if col_idx == 0 and extra_excel_line:
+            max_length = max(max_length, len(extra_excel_line))
+        widths.append(min(max_length + 2, XLSX_MAX_COL_WIDTH))
+    return widths
+
+def _xlsx_rows(df: pd.DataFrame):
+    # fehlende Werte als leere Zellen, numpy-Typen als Python-Werte
+    return df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+
+def _write_xlsx_openpyxl(blocks, path: str | Path, extra_excel_line: str, widths: list[int] | None):
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.properties import PageSetupProperties
+
+    blocks = iter(blocks)
+    first = next(blocks)
+    columns = first.columns
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=XLSX_SHEET_NAME)
+
+    start_row = 2 if extra_excel_line else 0
+    last_col_letter = get_column_letter(max(len(columns), 1))
+
+    # Breiten müssen im write-only-Modus vor den Zeilen stehen – blockweise zählt der erste Block
+    if widths is None:
+        widths = xlsx_column_widths(first, extra_excel_line)
+    for col_idx, width in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = width
+
+    ws.page_setup.orientation = "landscape"
+    ws.page_setup.fitToWidth = 1
+    ws.page_setup.fitToHeight = 1
+    ws.sheet_properties.pageSetUpPr = PageSetupProperties(fitToPage=True)
+
+    ws.page_margins.left = 0.3
+    ws.page_margins.right = 0.3
+    ws.page_margins.top = 0.5
+    ws.page_margins.bottom = 0.5
+
+    if extra_excel_line:
+        ws.append([extra_excel_line])
+        ws.append([])
+
+    # Kopfzeile wie bei DataFrame.to_excel
+    thin = Side(style="thin")
+    header = []
+    for name in columns:
+        cell = WriteOnlyCell(ws, value=str(name))
+        cell.font = Font(bold=True)
+        cell.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        cell.alignment = Alignment(horizontal="center", vertical="top")
+        header.append(cell)
+    ws.append(header)
+
+    rows = 0
+    for df in itertools.chain([first], blocks):
+        for values in _xlsx_rows(df):
+            ws.append(values)
+        rows += len(df)
+
+    ws.print_area = f"A1:{last_col_letter}{start_row + 1 + rows}"
+    wb.save(path)
+
+def _write_xlsx_xlsxwriter(blocks, path: str | Path, extra_excel_line: str, widths: list[int] | None):
+    import xlsxwriter
+
+    blocks = iter(blocks)
+    first = next(blocks)
+    columns = first.columns
+
+    wb = xlsxwriter.Workbook(str(path), {
+        "constant_memory": True,
+        "strings_to_numbers": False,
+        "strings_to_formulas": False,
+        "strings_to_urls": False,
+    })
+    try:
+        ws = wb.add_worksheet(XLSX_SHEET_NAME)
+
+        start_row = 2 if extra_excel_line else 0
+
+        ws.set_landscape()
+        ws.fit_to_pages(1, 1)
+        ws.set_margins(left=0.3, right=0.3, top=0.5, bottom=0.5)
+
+        if extra_excel_line:
+            ws.write_string(0, 0, extra_excel_line)
+
+        header_format = wb.add_format({"bold": True, "border": 1, "align": "center", "valign": "top"})
+        ws.write_row(start_row, 0, [str(c) for c in columns], header_format)
+
+        # constant_memory: Zeilen strikt der Reihe nach schreiben; Breiten und Druckbereich dürfen danach kommen
+        track_widths = widths is None
+        row_idx = start_row
+        for df in itertools.chain([first], blocks):
+            for row_idx, values in enumerate(_xlsx_rows(df), start=row_idx + 1):
+                ws.write_row(row_idx, 0, values)
+            if track_widths:
+                block_widths = xlsx_column_widths(df, extra_excel_line)
+                widths = block_widths if widths is None else list(map(max, widths, block_widths))
+
+        for col_idx, width in enumerate(widths):
+            ws.set_column(col_idx, col_idx, width)
+        ws.print_area(0, 0, row_idx, max(len(columns), 1) - 1)
+    finally:
+        wb.close()
+
+# Engines: (Blöcke als DataFrames, Pfad, Zusatzzeile, Spaltenbreiten oder None = aus den Blöcken)
+XLSX_ENGINES = {
+    "openpyxl": _write_xlsx_openpyxl,
+    "xlsxwriter": _write_xlsx_xlsxwriter,
+}
+
+def resolve_xlsx_engine(engine: str | None = None) -> str:
+    engine = engine or XLSX_ENGINE
+    if engine == "auto":
+        return "xlsxwriter" if importlib.util.find_spec("xlsxwriter") is not None else "openpyxl"
+    if engine not in XLSX_ENGINES:
+        raise ValueError(f"Unbekannte Excel-Engine: {engine!r} (erlaubt: auto, {', '.join(XLSX_ENGINES)})")
+    return engine
+
+def write_xlsx(df: pd.DataFrame, path: str | Path, extra_excel_line: str = "", engine: str | None = None):
+    """
+    Schreibt die Import-Tabelle als Excel (Blatt 'Ruecktour', Querformat auf eine Seite, optionale Kopfzeile).
+    Die Zeilen werden gestreamt; die Spaltenbreiten kommen vorab aus dem DataFrame.
+    """
+    writer = XLSX_ENGINES[resolve_xlsx_engine(engine)]
+    with PROFILE.stage("xlsx"):
+        widths = xlsx_column_widths(df, extra_excel_line)
+        _write_via_local_temp(path, lambda tmp: writer([df], tmp, extra_excel_line, widths))
+    print(Fore.GREEN + f"Excel-Datei geschrieben nach: {path}")
+
+def write_outputs(df: pd.DataFrame, csv_path: str | Path, xlsx_path: str | Path, extra_excel_line: str = ""):
+    """Schreibt CSV und Excel gleichzeitig – die Gesamtdauer ist die des langsameren Teils."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="UnivImport-Ausgabe") as pool:
+        futures = [
+            pool.submit(write_csv, df, csv_path),
+            pool.submit(write_xlsx, df, xlsx_path, extra_excel_line),
+        ]
+        # beide abwarten, danach den ersten Fehler weiterreichen
+        errors = [f.exception() for f in futures]
+    for e in errors:
+        if e is not None:
+            raise e
+
+# =====================================
+# Inkrementeller Export (nur neue/geänderte Paletten)
+# =====================================
+# Bereits exportierte LG IDs je Kunde mit Prüfsumme der Ausgabezeile, neben dem Script
+STATE_DB = "UnivImport.state.sqlite"
+
+def _state_db_path() -> Path:
+    try:
+        return Path(__file__).resolve().parent / STATE_DB
+    except NameError:
+        return Path(STATE_DB)
+
+def open_state_db() -> sqlite3.Connection:
+    con = sqlite3.connect(_state_db_path(), timeout=30)
+    con.execute("""
+        CREATE TABLE IF NOT EXISTS exportiert (
+            kunde TEXT NOT NULL,
+            lg_id INTEGER NOT NULL,
+            hash INTEGER NOT NULL,
+            exportiert_am TEXT NOT NULL,
+            PRIMARY KEY (kunde, lg_id)
+        )""")
+    return con
+
+def row_hashes(df: pd.DataFrame) -> pd.Series:
+    """Prüfsumme je LG ID über alle Ausgabespalten außer Nr. (mehrere Zeilen einer LG ID zusammengefasst)."""
+    columns = [c for c in df.columns if c != "Nr."]
+    hashes = pd.util.hash_pandas_object(df[columns].astype(str), index=False)
+    # uint64-Summe läuft über – gewollt, es zählt nur die Prüfsumme
+    hashes = hashes.groupby(df["LG ID"].to_numpy(), sort=False).transform("sum")
+    return hashes.astype("int64")  # SQLite speichert nur vorzeichenbehaftete 64 Bit
+
+def filter_incremental(df: pd.DataFrame, kunde: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Behält nur LG IDs, die noch nicht oder mit anderem Inhalt exportiert wurden (Nr. wird neu vergeben).
+    Rückgabe: (gefilterte Tabelle, LG ID + Prüfsumme für record_exported nach dem Schreiben)
+    """
+    hashes = row_hashes(df)
+    ids = df["LG ID"].astype("int64")
+    with contextlib.closing(open_state_db()) as con:
+        con.execute("CREATE TEMP TABLE aktuell (lg_id INTEGER PRIMARY KEY)")
+        con.executemany("INSERT OR IGNORE INTO aktuell VALUES (?)", ((i,) for i in ids.unique().tolist()))
+        stored = con.execute(
+            "SELECT e.lg_id, e.hash FROM exportiert e JOIN aktuell a ON a.lg_id = e.lg_id WHERE e.kunde = ?",
+            (kunde,),
+        ).fetchall()
+
+    old = ids.map(pd.Series(dict(stored), dtype="Int64")) if stored else pd.Series(pd.NA, index=df.index, dtype="Int64")
+    is_new = old.isna().to_numpy()
+    changed = ~is_new & (old.fillna(0).astype("int64") != hashes).to_numpy()
+    keep = is_new | changed
+
+    n_new = ids[is_new].nunique()
+    n_changed = ids[changed].nunique()
+    print(Fore.CYAN + f"[Inkrementell] {ids.nunique()} Paletten: {n_new} neu, {n_changed} geändert, "
+                      f"{ids.nunique() - n_new - n_changed} bereits exportiert")
+
+    result = df[keep].reset_index(drop=True)
+    if "Nr." in result.columns:
+        result["Nr."] = range(1, len(result) + 1)
+    pending = pd.DataFrame({"lg_id": ids[keep], "hash": hashes[keep]}).drop_duplicates("lg_id")
+    return result, pending
+
+def record_exported(kunde: str, pending: pd.DataFrame):
+    """Merkt sich die geschriebenen LG IDs (erst nach erfolgreichem Schreiben aufrufen)."""
+    stamp = datetime.now().isoformat(timespec="seconds")
+    with contextlib.closing(open_state_db()) as con, con:
+        con.executemany(
+            "INSERT OR REPLACE INTO exportiert (kunde, lg_id, hash, exportiert_am) VALUES (?, ?, ?, ?)",
+            ((kunde, lg_id, h, stamp) for lg_id, h in zip(pending["lg_id"].tolist(), pending["hash"].tolist())),
+        )
+
+def write_outputs_incremental(df: pd.DataFrame, kunde: str, csv_path: str | Path, xlsx_path: str | Path,
+                              extra_excel_line: str = "") -> int:
+    """
+    Wie write_outputs, aber nur mit neuen/geänderten Paletten. Ohne solche bleiben die Ausgabedateien
+    unangetastet. Rückgabe: Anzahl geschriebener Zeilen.
+    """
+    df, pending = filter_incremental(df, kunde)
+    if df.empty:
+        print(Fore.GREEN + f"[Inkrementell] Nichts Neues – {csv_path} bleibt unverändert.")
+        return 0
+    write_outputs(df, csv_path, xlsx_path, extra_excel_line)
+    record_exported(kunde, pending)
+    return len(df)
+
+# =====================================
+# Vorab-Einlesen (während der Kundenauswahl)
+# =====================================
+# Die Eingabedateien aller Kunden schon während der Kundenauswahl im Hintergrund lesen und aufbereiten
+PREFETCH = True
+
+def _file_signature(path: str | Path) -> tuple[int, int]:
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+def _prefetch_input(path: str, kunde: str) -> tuple[tuple[int, int], pd.DataFrame]:
+    signature = _file_signature(path)
+    return signature, aggregate(read_input(path, kunde), kunde)
+
+def start_prefetch(input_files: list[str] | None = None) -> dict[str, BackgroundTask]:
+    """
+    Startet je Kunde mit vorhandener Eingabedatei das Einlesen + Aufbereiten im Hintergrund.
+    Bei ausdrücklich angegebenen Dateien wird nur die Artikelzuordnung vorgeladen.
+    """
+    tasks = {}
+    if not PREFETCH:
+        return tasks
+    plaene = kunden_plaene().values()
+    if not input_files:
+        for plan in plaene:
+            if Path(plan.eingabe).exists():
+                tasks[plan.kunde] = BackgroundTask(f"Vorab-{plan.label}", _prefetch_input, plan.eingabe, plan.kunde)
+    # Kunden mit Artikelstamm laden die Zuordnung selbst – sonst hier, damit sie bei Bedarf im Cache liegt
+    filters = sorted({plan.artikelstamm for plan in plaene if plan.artikelstamm and plan.kunde not in tasks})
+    if filters and Path("artikel.xlsx").exists():
+        tasks["artikel"] = BackgroundTask("Vorab-Artikel", _prefetch_artikel, filters)
+    return tasks
+
+def _prefetch_artikel(filters: list[str]):
+    wait_for_update()
+    for kunde_filter in filters:
+        load_artikelmap_cached("artikel.xlsx", kunde_filter=kunde_filter)
+
+def read_prefetched(tasks: dict[str, BackgroundTask], kunde: str) -> pd.DataFrame:
+    """Aufbereitete Daten des Kunden – aus dem Vorab-Einlesen, falls die Datei seitdem unverändert ist."""
+    path = default_input_file(kunde)
+    task = tasks.get(kunde)
+    if task is not None:
+        try:
+            signature, df = task.result()
+        except Exception as e:
+            print(Fore.YELLOW + f"[Vorab] Einlesen im Hintergrund fehlgeschlagen ({e}) – {path} wird neu eingelesen.")
+        else:
+            if Path(path).exists() and _file_signature(path) == signature:
+                return df
+            print(Fore.YELLOW + f"[Vorab] {path} wurde inzwischen geändert – wird neu eingelesen.")
+    return aggregate(read_input(path, kunde), kunde)
+
+def main(incremental: bool = False, input_files: list[str] | None = None, duplikate: str = "letzte"):
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Eingaben lesen, während die Kundenauswahl noch offen ist
+    prefetch = start_prefetch(input_files)
+
+    # =====================================
+    # Kundenauswahl
+    # =====================================
+    menue = kunden_menue()
+    print("\nKunde auswählen:")
+    for key, (label, _) in menue.items():
+        print(f"  {key} = {label}")
+
+    with PROFILE.stage("kundenauswahl"):
+        while True:
+            choice = input(f"Auswahl ({'/'.join(menue)}): ").strip()
+            if choice in menue:
+                break
+            print(Fore.RED + f"Ungültige Auswahl – bitte {', '.join(menue)} eingeben.")
+
+    label, kunde = menue[choice]
+    if kunde is None:
+        print(Fore.YELLOW + "Vorgang abgebrochen.")
+        return   # main() sauber beenden
+
+    print(f"→ Gewählt: {label}\n")
+    # Vorab-Einlesen der anderen Kunden läuft weiter, zählt aber nicht zur Laufzeit dieses Imports
+    for key, task in prefetch.items():
+        if key not in (kunde, "artikel"):
+            PROFILE.ignore_thread(task.thread_name)
+
+    # =====================================
+    # Einlesen & Aufbereitung (abhängig vom Kunden)
+    # =====================================
+    with PROFILE.stage("read"):
+        if input_files:
+            print(Fore.CYAN + f"[Zusammenführen] {len(input_files)} Datei(en): {', '.join(Path(f).name for f in input_files)}")
+            df = aggregate(read_inputs(input_files, kunde, duplikate), kunde)
+        else:
+            df = read_prefetched(prefetch, kunde)
+
+    # Zusatzspalten
+    df["Lagerort"] = ""
+    df["Sonstiger Text"] = ""
+
+    with PROFILE.stage("dialog"):
+        df = ask_lagerort_text(df, kunde)
+
+    # =====================================
+    # Index & Spaltenreihenfolge
+    # =====================================
+    with PROFILE.stage("finalize"):
+        df = finalize(df, kunde)
+
+    pending = None
+    if incremental:
+        df, pending = filter_incremental(df, kunde)
+        if df.empty:
+            print(Fore.GREEN + f"[Inkrementell] Nichts Neues – {OUTPUT_CSV} bleibt unverändert.")
+            return
+
+    # =====================================
+    # CSV & Excel speichern
+    # =====================================
+    # Die CSV hängt nicht von der Excel-Zusatzzeile ab – sie wird schon geschrieben, während die Frage offen ist
+    csv_task = BackgroundTask("CSV", write_csv, df, OUTPUT_CSV)
+    with PROFILE.stage("dialog"):
+        extra_excel_line = ask_extra_excel_line()
+    try:
+        write_xlsx(df, OUTPUT_XLSX, extra_excel_line)
+    finally:
+        csv_task.result()
+    if pending is not None:
+        record_exported(kunde, pending)
+
+def ask_lagerort_text(df: pd.DataFrame, kunde: str) -> pd.DataFrame:
+    """Interaktive Abfrage für Lagerort & Sonstiger Text (j/n/a/h), danach Kunden-Prefix."""
+    try:
+        main_help = f"""
+    {Fore.CYAN}HILFE – Lagerort / Sonstiger Text{Style.RESET_ALL}
+
+      {Fore.GREEN}j{Style.RESET_ALL} = Eingaben gelten für {Fore.YELLOW}alle{Style.RESET_ALL} Zeilen
+      {Fore.RED}n{Style.RESET_ALL} = keine Änderungen
+      {Fore.CYAN}a{Style.RESET_ALL} = Auswahl nach Zeilen, Artikel-Nr., Charge, MHD oder LG ID
+      {Fore.CYAN}h{Style.RESET_ALL} = diese Hilfe anzeigen
+
+    Auswahl ({Fore.CYAN}a{Style.RESET_ALL}):
+      - Zeilen / Bereiche:  {Fore.YELLOW}1-5, 8, 12-15{Style.RESET_ALL}
+      - Nach Spalten:       {Fore.YELLOW}artikel=10*; mhd=..31.12.2026{Style.RESET_ALL}
+      - Leere Eingabe beendet die Auswahl, {Fore.CYAN}h{Style.RESET_ALL} zeigt alle Möglichkeiten
+    """
+
+        plan = kunden_plan(kunde)
+
+        # ============================
+        # Ohne 'Sonstiger Text' (NEF): nur Lagerort abfragen
+        # ============================
+        if not plan.sonstiger_text:
+            lagerort = input(
+                f"{Fore.YELLOW}Lagerort ({plan.label}) – leer = keine Änderung:{Style.RESET_ALL} "
+            ).strip()
+            if lagerort:
+                df["Lagerort"] = lagerort
+
+        # ============================
+        # MB/NG: alter Dialog
+        # ============================
+        else:
+            while True:
+                prompt = (
+                    f"Möchten Sie '{Fore.YELLOW}Lagerort{Style.RESET_ALL}' und "
+                    f"'{Fore.YELLOW}Sonstiger Text{Style.RESET_ALL}' setzen? "
+                    f"({Fore.GREEN}j{Style.RESET_ALL}=alle / "
+                    f"{Fore.RED}n{Style.RESET_ALL}=keine / "
+                    f"{Fore.CYAN}a{Style.RESET_ALL}=Auswahl / "
+                    f"{Fore.CYAN}h{Style.RESET_ALL}=Help): "
+                )
+                answer = input(prompt).strip().lower()
+
+                if answer == "h":
+                    print(main_help)
+                    continue
+                if answer in ("j", "n", "a"):
+                    break
+                print(f"{Fore.RED}Ungültige Eingabe – 'h' für Hilfe.{Style.RESET_ALL}")
+
+            if answer == "j":
+                lagerort = input(f"{Fore.YELLOW}Lagerort (leer = keine Änderung):{Style.RESET_ALL} ").strip()
+                sonstiger_text = input(f"{Fore.YELLOW}'Sonstiger Text' (leer = keine Änderung):{Style.RESET_ALL} ").strip()
+                if lagerort:
+                    df["Lagerort"] = lagerort
+                if sonstiger_text:
+                    df["Sonstiger Text"] = sonstiger_text
+
+            elif answer == "a":
+                df = ask_auswahl(df, kunde)
+
+            elif answer == "n":
+                print(f"{Fore.GREEN}Keine Änderungen an Lagerort / Sonstiger Text.{Style.RESET_ALL}")
+
+        df = apply_prefix(df, kunde)
+
+        # DEBUG # print("DEBUG Artikel-Nr.:", df["Artikel-Nr."].head().tolist())
+
+    except EOFError:
+        df["Artikel-Nr."] = kunden_prefix(kunde) + df["Artikel-Nr."].astype(str)
+
+    return df
+
+AUSWAHL_HILFE = f"""
+    {Fore.CYAN}HILFE – Zeilenauswahl{Style.RESET_ALL}
+
+    Bedingungen mit {Fore.YELLOW};{Style.RESET_ALL} trennen (alle müssen passen), Werte mit {Fore.YELLOW},{Style.RESET_ALL} (einer genügt):
+      1-10, 17                    → Zeilen (wie angezeigt, 1-basiert)
+      artikel=10*,2034?           → Artikel-Nr. nach Muster (* beliebig, ? ein Zeichen)
+      charge=L24*                 → Charge nach Muster
+      mhd=01.01.2026..31.03.2026  → MHD von..bis (auch ..31.03.2026 oder ein Tag)
+      lg=1000-1999, 2500          → LG ID
+      artikel=10*; charge!=X*     → != kehrt eine Bedingung um
+
+    Befehle:
+      {Fore.CYAN}l{Style.RESET_ALL}         → alle Zeilen seitenweise anzeigen
+      {Fore.CYAN}l AUSWAHL{Style.RESET_ALL} → nur die Zeilen einer Auswahl seitenweise anzeigen (ohne etwas zu setzen)
+      {Fore.CYAN}s NAME{Style.RESET_ALL}    → bisher gesetzte Regeln unter NAME speichern (Batch: --regeln NAME)
+      {Fore.CYAN}r NAME{Style.RESET_ALL}    → gespeicherte Regeln NAME anwenden
+      Leere Eingabe beendet die Auswahl
+    """
+
+def _auswahl_tabelle(df: pd.DataFrame) -> pd.DataFrame:
+    spalten = [c for c in ("LG ID", "Artikel-Nr.", "Artikelbezeichnung", "Charge", "MHD") if c in df.columns]
+    tmp = df[spalten].reset_index(drop=True)
+    tmp.insert(0, "Zeile", range(1, len(tmp) + 1))
+    return tmp
+
+def zeige_seiten(tabelle: pd.DataFrame, blaettern: bool = True, mehr: str = "l zeigt alle seitenweise"):
+    """Zeigt eine Tabelle seitenweise (AUSWAHL_SEITE Zeilen); ohne blaettern nur die erste Seite und den Hinweis mehr."""
+    seiten = max(1, -(-len(tabelle) // AUSWAHL_SEITE))
+    for seite in range(seiten):
+        print(tabelle.iloc[seite * AUSWAHL_SEITE:(seite + 1) * AUSWAHL_SEITE].to_string(index=False))
+        if seite + 1 == seiten:
+            return
+        if not blaettern:
+            befehl, _, rest = mehr.partition(" ")
+            print(f"… {len(tabelle) - AUSWAHL_SEITE} weitere Zeile(n) – {Fore.CYAN}{befehl}{Style.RESET_ALL} {rest}")
+            return
+        weiter = input(f"{Fore.CYAN}Seite {seite + 1}/{seiten} – Enter=nächste Seite, q=Ende:{Style.RESET_ALL} ")
+        if weiter.strip().lower() == "q":
+            return
+
+def ask_auswahl(df: pd.DataFrame, kunde: str) -> pd.DataFrame:
+    """Dialog 'a': Zeilen per Auswahl (siehe parse_auswahl) bestimmen und Lagerort / Sonstiger Text setzen."""
+    tabelle = _auswahl_tabelle(df)
+    print(f"\nVerfügbare Zeilen ({len(df)}):")
+    zeige_seiten(tabelle, blaettern=False)
+    regeln = []
+
+    while True:
+        auswahl = input(
+            f"{Fore.CYAN}Auswahl (z.B. 1-10, 17 | artikel=10*; mhd=..31.12.2026 | l=Liste | h=Help | Enter=fertig):"
+            f"{Style.RESET_ALL} "
+        ).strip()
+        befehl, _, name = auswahl.partition(" ")
+        befehl = befehl.lower()
+        name = name.strip()
+
+        if auswahl == "":
+            print(f"{Fore.GREEN}Auswahl beendet.{Style.RESET_ALL}")
+            return df
+        if befehl == "h":
+            print(AUSWAHL_HILFE)
+            continue
+        if befehl == "l":
+            if name:
+                # Vorschau einer Auswahl seitenweise, ohne etwas zu setzen
+                try:
+                    mask = auswahl_maske(df, parse_auswahl(name))
+                except ValueError as e:
+                    print(f"{Fore.RED}{e} – 'h' für Hilfe.{Style.RESET_ALL}")
+                    continue
+                print(f"{int(mask.sum())} Zeile(n) ausgewählt:")
+                zeige_seiten(tabelle[mask.to_numpy()])
+            else:
+                zeige_seiten(tabelle)
+            continue
+        if befehl == "s" and name:
+            speicherbar = [r for r in regeln if all(feld != "zeile" for feld, _, _ in parse_auswahl(r["auswahl"]))]
+            if len(speicherbar) < len(regeln):
+                print(f"{Fore.YELLOW}Auswahlen mit Zeilennummern werden nicht gespeichert.{Style.RESET_ALL}")
+            if not speicherbar:
+                print(f"{Fore.RED}Keine speicherbaren Regeln.{Style.RESET_ALL}")
+                continue
+            try:
+                save_regeln(name, speicherbar)
+            except (OSError, ValueError) as e:
+                print(f"{Fore.RED}Regeln nicht gespeichert: {e}{Style.RESET_ALL}")
+                continue
+            print(f"{Fore.GREEN}{len(speicherbar)} Regel(n) als {name!r} gespeichert (Batch: --regeln {name}).{Style.RESET_ALL}")
+            continue
+        if befehl == "r" and name:
+            try:
+                geladen = load_regeln(name)
+                for regel in geladen:
+                    print(f"  {regel['auswahl']}: {int(auswahl_maske(df, parse_auswahl(regel['auswahl'])).sum())} Zeile(n)")
+                df = apply_regeln(df, kunde, geladen)
+            except ValueError as e:
+                print(f"{Fore.RED}{e}{Style.RESET_ALL}")
+                continue
+            regeln.extend(geladen)
+            print(f"{Fore.GREEN}Regeln {name!r} angewendet.{Style.RESET_ALL}")
+            continue
+
+        try:
+            mask = auswahl_maske(df, parse_auswahl(auswahl))
+        except ValueError as e:
+            print(f"{Fore.RED}{e} – 'h' für Hilfe.{Style.RESET_ALL}")
+            continue
+        treffer = int(mask.sum())
+        if not treffer:
+            print(f"{Fore.RED}Keine Zeilen ausgewählt.{Style.RESET_ALL}")
+            continue
+        print(f"{treffer} Zeile(n) ausgewählt:")
+        # nur die erste Seite – die Zahl der Rückfragen hängt so nie von der Größe der Auswahl ab
+        zeige_seiten(tabelle[mask.to_numpy()], blaettern=False, mehr="l AUSWAHL blättert die Auswahl durch")
+
+        lagerort = input(f"{Fore.YELLOW}Lagerort für diese Auswahl (leer = keine Änderung):{Style.RESET_ALL} ").strip()
+        sonstiger_text = input(f"{Fore.YELLOW}'Sonstiger Text' für diese Auswahl (leer = keine Änderung):{Style.RESET_ALL} ").strip()
+        if not lagerort and not sonstiger_text:
+            print(f"{Fore.RED}Keine Änderungen eingegeben – Auswahl übersprungen.{Style.RESET_ALL}")
+            continue
+
+        regel = {"auswahl": auswahl, "lagerort": lagerort, "text": sonstiger_text}
+        df = apply_regeln(df, kunde, [regel])
+        regeln.append(regel)
+
+def ask_extra_excel_line() -> str:
+    """Zusatzzeile für Excel"""
+    try:
+        ans_extra = input("Möchten Sie eine zusätzliche Zeile in der Excel-Datei hinterlegen? (j/n): ").strip().lower()
+        if ans_extra == "j":
+            return input("Bitte geben Sie den gewünschten Text für die Excel-Kopfzeile ein: ").strip()
+    except EOFError:
+        pass
+    return ""
+
+# =====================================
+# Streaming (große Eingaben mit begrenztem Speicher)
+# =====================================
+# Blockweise lesen → je Block normalisieren → je LG ID fortlaufend zusammenfassen → Ausgaben fortlaufend schreiben.
+# Es liegt nie die ganze Eingabe im Speicher, nur der aktuelle Block und eine Zeile je LG ID.
+
+STREAM_MAX_MB = 256              # Vorgabe für --speicher
+STREAM_MIN_MB = 32               # darunter nicht einhaltbar: Interpreter-Heap, Arrow-Vorauslesen, Zusammenfassung
+STREAM_BLOCK_ANTEIL = 0.5        # Anteil von --speicher für den aktuellen Block (Rest: Zusammenfassung, Ausgabe)
+STREAM_BYTES_JE_ZELLE = 600      # Spitze je gelesener Zelle beim Aufbereiten eines Blocks (gemessen: bench stream)
+STREAM_MIN_ROWS = 1_000
+STREAM_MIN_MERGE = 50_000        # Teilergebnisse erst ab so vielen Zeilen zusammenlegen
+# calamine lädt immer das ganze Blatt, openpyxl (read-only) behält je gelesener Zeile ein leeres Element –
+# blockweise daher der eigene XML-Leser
+STREAM_EXCEL_READER = "xml"
+XLSX_MAX_ROWS = 1_048_576        # Zeilen je Tabellenblatt in Excel
+
+def stream_chunk_rows(input_file: str | Path, kunde: str, max_mb: float) -> int:
+    """Zeilen je Block, sodass ein Block beim Aufbereiten etwa STREAM_BLOCK_ANTEIL von max_mb belegt."""
+    plan = kunden_plan(kunde)
+    if plan.leser == "csv":
+        header = _sniff_csv(input_file)[2]
+        cells = len(header) if header else len(plan.pflicht) or 1
+    else:
+        cells = len(plan.spalten)
+    cells += len(plan.vorgaben)
+    rows = int(max_mb * 2**20 * STREAM_BLOCK_ANTEIL / (cells * STREAM_BYTES_JE_ZELLE))
+    return max(STREAM_MIN_ROWS, rows)
+
+class LGAkkumulator:
+    """
+    Fasst normalisierte Blöcke fortlaufend je LG ID zusammen (wie group_by_lg: Summe bzw. erster Wert).
+    Gehalten wird nur eine Zeile je LG ID: Teilergebnisse der Blöcke werden gesammelt und mit dem
+    bisherigen Stand zusammengelegt, sobald sie zusammen so groß sind wie dieser.
+    """
+
+    def __init__(self):
+        self.stand: pd.DataFrame | None = None
+        self.offen: list[pd.DataFrame] = []
+        self.offen_zeilen = 0
+
+    def add(self, df: pd.DataFrame):
+        teil = _group_lg(df)
+        self.offen.append(teil)
+        self.offen_zeilen += len(teil)
+        stand_zeilen = 0 if self.stand is None else len(self.stand)
+        if self.offen_zeilen >= max(stand_zeilen, STREAM_MIN_MERGE):
+            self._zusammenlegen()
+
+    def _zusammenlegen(self):
+        frames = ([] if self.stand is None else [self.stand]) + self.offen
+        if not frames:
+            return
+        if len(frames) > 1:
+            # Blöcke haben eigene Kategorien – concat würde Strings daraus machen, "first" auf Strings
+            # braucht ein Vielfaches des Stands. Kategorien vereinigen, dann wird über Codes gruppiert.
+            df = pd.concat(frames, ignore_index=True)
+            # (Kategorien einheitlich als object – union_categoricals macht aus Texten sonst mal str, mal object)
+            df = df.assign(**{c: pd.api.types.union_categoricals(
+                                  [f[c].cat.set_categories(f[c].cat.categories.astype(object)) for f in frames])
+                              for c in CATEGORY_COLUMNS
+                              if c in df.columns and all(isinstance(f[c].dtype, pd.CategoricalDtype) for f in frames)})
+            # erster Wert / Summe sind über Teilergebnisse hinweg dieselben wie über alle Zeilen
+            df = _group_lg(df)
+        else:
+            df = frames[0]
+        self.stand = df.assign(**{c: df[c].astype("category") for c in CATEGORY_COLUMNS
+                                  if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype)})
+        self.offen = []
+        self.offen_zeilen = 0
+
+    def memory_mb(self) -> float:
+        frames = ([] if self.stand is None else [self.stand]) + self.offen
+        return sum(f.memory_usage(deep=True).sum() for f in frames) / 2**20
+
+    def result(self) -> pd.DataFrame | None:
+        """Zusammengefasste Zeilen (None, wenn kein Block kam)."""
+        self._zusammenlegen()
+        return self.stand
+
+def _stream_output_blocks(input_file: str | Path, kunde: str, chunk_rows: int, max_mb: float,
+                          lagerort: str, sonstiger_text: str, regeln: list[dict] | None = None):
+    """Fertige Ausgabeblöcke (wie process_file, Nr. fortlaufend) – bei Gruppierung erst nach dem letzten Eingabeblock."""
+    plan = kunden_plan(kunde)
+    chunks = (normalize(chunk, kunde) for chunk in iter_input(input_file, kunde, chunk_rows))
+
+    if plan.gruppieren:
+        acc = LGAkkumulator()
+        warned = False
+        for chunk in chunks:
+            acc.add(chunk)
+            if not warned and acc.memory_mb() > max_mb * (1 - STREAM_BLOCK_ANTEIL):
+                print(Fore.YELLOW + f"[Stream] Zusammenfassung je LG ID belegt schon {acc.memory_mb():.0f} MB "
+                                    f"(mehr als vorgesehen bei --speicher {max_mb:g}).")
+                warned = True
+        grouped = acc.result()
+        if grouped is None:
+            return
+        # auch die Ausgabe blockweise – fertige Textspalten nie für alle Paletten auf einmal
+        chunks = (_finish_groups(grouped.iloc[start:start + chunk_rows], plan)
+                  for start in range(0, max(len(grouped), 1), chunk_rows))
+
+    offset = 0
+    for chunk in chunks:
+        out = finish_rows(chunk, kunde, lagerort, sonstiger_text, regeln)
+        out["Nr."] += offset
+        offset += len(out)
+        yield out
+
+def write_outputs_streaming(blocks, columns: list[str], csv_path: str | Path, xlsx_path: str | Path,
+                            extra_excel_line: str = "", engine: str | None = None) -> int:
+    """
+    Schreibt Ausgabeblöcke nacheinander in CSV und Excel (beide lokal, danach per publish_file abgelegt).
+    Mehr Zeilen, als ein Excel-Blatt fasst, stehen nur in der CSV. Rückgabe: Anzahl Zeilen.
+    """
+    writer = XLSX_ENGINES[resolve_xlsx_engine(engine)]
+    xlsx_rows = XLSX_MAX_ROWS - (3 if extra_excel_line else 1)
+    rows = 0
+    header = True
+
+    def write_block(f, block: pd.DataFrame):
+        nonlocal rows, header
+        with PROFILE.stage("csv"):
+            block.to_csv(f, index=False, sep=CSV_SEP, header=header)
+        header = False
+        start = rows
+        rows += len(block)
+        if start < xlsx_rows:
+            if rows > xlsx_rows:
+                print(Fore.YELLOW + f"[Stream] Excel fasst {xlsx_rows} Datenzeilen – der Rest steht nur in der CSV.")
+            yield block.iloc[:xlsx_rows - start]
+
+    def tee(f):
+        # jeder Block geht zuerst in die CSV, dann an den Excel-Writer
+        empty = True
+        for block in blocks:
+            empty = False
+            yield from write_block(f, block)
+        if empty:
+            yield from write_block(f, pd.DataFrame(columns=columns))
+
+    with local_temp_output(csv_path) as csv_tmp, local_temp_output(xlsx_path) as xlsx_tmp:
+        with open(csv_tmp, "w", encoding=CSV_ENCODING, newline="") as f:
+            writer(tee(f), xlsx_tmp, extra_excel_line, None)
+    print(Fore.GREEN + f"CSV geschrieben nach: {csv_path}")
+    print(Fore.GREEN + f"Excel-Datei geschrieben nach: {xlsx_path}")
+    return rows
+
+def process_file_streaming(input_file: str | Path, kunde: str, csv_path: str | Path, xlsx_path: str | Path,
+                           lagerort: str = "", sonstiger_text: str = "", extra_excel_line: str = "",
+                           max_mb: float | None = None, regeln: list[dict] | None = None) -> int:
+    """
+    Wie process_file + write_outputs, aber blockweise mit begrenztem Speicher (max_mb, Vorgabe STREAM_MAX_MB).
+    Ergebnis und Ausgabedateien sind dieselben. Rückgabe: Anzahl Zeilen der Import-Datei.
+    """
+    max_mb = max_mb or STREAM_MAX_MB
+    if max_mb < STREAM_MIN_MB:
+        print(Fore.YELLOW + f"[Stream] --speicher {max_mb:g} MB ist zu knapp – verwende {STREAM_MIN_MB} MB.")
+        max_mb = STREAM_MIN_MB
+    chunk_rows = stream_chunk_rows(input_file, kunde, max_mb)
+    print(Fore.CYAN + f"[Stream] {Path(input_file).name}: Blöcke zu {chunk_rows} Zeilen (Speicher max. {max_mb:g} MB)")
+    blocks = _stream_output_blocks(input_file, kunde, chunk_rows, max_mb, lagerort, sonstiger_text, regeln)
+    return write_outputs_streaming(blocks, kunden_plan(kunde).ausgabe, csv_path, xlsx_path, extra_excel_line)
+
+# =====================================
+# Batch-Modus (ohne Rückfragen)
+# =====================================
+
+def expand_input_patterns(patterns: list[str]) -> list[str]:
+    """Löst Dateimuster selbst auf (die Windows-Konsole expandiert keine Wildcards)."""
+    files = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for m in matches:
+            if m not in files:
+                files.append(m)
+    return files
+
+def _batch_process_and_write(input_file: str, kunde: str, lagerort: str, sonstiger_text: str,
+                             extra_excel_line: str, out_dir: str | None,
+                             stream_mb: float | None = None, regeln: list[dict] | None = None) -> tuple[int, str, str]:
+    target_dir = Path(out_dir) if out_dir else Path(input_file).resolve().parent
+    target_dir.mkdir(parents=True, exist_ok=True)
+    stem = Path(input_file).stem
+    csv_path = target_dir / f"{stem}_import.csv"
+    xlsx_path = target_dir / f"{stem}_import.xlsx"
+
+    if stream_mb:
+        rows = process_file_streaming(input_file, kunde, csv_path, xlsx_path, lagerort, sonstiger_text,
+                                      extra_excel_line, stream_mb, regeln)
+        return rows, str(csv_path), str(xlsx_path)
+
+    df = process_file(input_file, kunde, lagerort, sonstiger_text, regeln)
+    write_outputs(df, csv_path, xlsx_path, extra_excel_line)
+    return len(df), str(csv_path), str(xlsx_path)
+
+def run_batch(args) -> int:
+    """Verarbeitet alle Eingabedateien parallel in einem Prozess-Pool. Rückgabe: Exit-Code."""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    if not args.kunde:
+        print(Fore.RED + "[Batch] Bitte den Kunden mit --kunde angeben (MB, NG oder NEF).")
+        return 2
+    if args.incremental and not args.merge:
+        # sonst schreiben mehrere Prozesse gleichzeitig denselben Zustand fort
+        print(Fore.RED + "[Batch] --incremental geht im Batch-Modus nur zusammen mit --merge.")
+        return 2
+    if args.stream and (args.merge or args.incremental):
+        print(Fore.RED + "[Batch] --stream verarbeitet jede Datei für sich – nicht zusammen mit --merge/--incremental.")
+        return 2
+    try:
+        kunde = resolve_kunde(args.kunde)
+        regeln = load_regeln(args.regeln) if args.regeln else None
+    except ValueError as e:
+        print(Fore.RED + f"[Batch] {e}")
+        return 2
+
+    files = expand_input_patterns(args.dateien)
+    missing = [f for f in files if not Path(f).exists()]
+    for f in missing:
+        print(Fore.RED + f"[Batch] Eingabedatei nicht gefunden: {f}")
+    files = [f for f in files if f not in missing]
+    if not files:
+        print(Fore.RED + "[Batch] Keine Eingabedateien gefunden.")
+        return 1
+
+    # --speicher gilt je Prozess – im Stream-Modus daher ohne -j nur einer
+    default_jobs = 1 if args.stream else os.cpu_count() or 1
+    jobs = max(1, min(args.jobs or default_jobs, len(files)))
+    print(Fore.CYAN + f"[Batch] {len(files)} Datei(en), Kunde {kunde}, {jobs} Prozess(e)")
+    if PROFILE.enabled:
+        print(Fore.CYAN + "[Profil] Gemessen wird nur der Hauptprozess – was in den Worker-Prozessen läuft, fehlt in der Tabelle.")
+
+    if args.merge:
+        # Rohdaten aller Dateien zusammen aufbereiten – LG IDs werden nur einmal gruppiert
+        try:
+            df = read_inputs(files, kunde, args.duplikate, use_processes=True, jobs=jobs)
+            df = process_frame(df, kunde, args.lagerort, args.sonstiger_text, regeln)
+            if args.incremental:
+                rows = write_outputs_incremental(df, kunde, OUTPUT_CSV, OUTPUT_XLSX, args.zusatzzeile)
+            else:
+                rows = len(df)
+                write_outputs(df, OUTPUT_CSV, OUTPUT_XLSX, args.zusatzzeile)
+        except Exception as e:
+            print(Fore.RED + f"[Batch] {e}")
+            return 1
+        print(Fore.GREEN + f"[Batch] {len(files)} Datei(en) zusammengeführt: {rows} Zeilen")
+        return 0
+
+    results = {}
+    failed = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(_batch_process_and_write, f, kunde, args.lagerort, args.sonstiger_text,
+                        args.zusatzzeile, args.ausgabe_ordner, args.speicher if args.stream else None, regeln): f
+            for f in files
+        }
+
+        for fut in as_completed(futures):
+            input_file = futures[fut]
+            try:
+                results[input_file] = fut.result()
+            except Exception as e:
+                failed.append(input_file)
+                print(Fore.RED + f"[Batch] {input_file}: {e}")
+                continue
+            rows, csv_path, _ = results[input_file]
+            print(Fore.GREEN + f"[Batch] {input_file}: {rows} Zeilen → {csv_path}")
+
+    if failed:
+        print(Fore.RED + f"[Batch] {len(failed)} Datei(en) fehlgeschlagen.")
+        return 1
+    return 0
+
+# =====================================
+# Watch-Modus (Eingangsordner überwachen)
+# =====================================
+
+# Kunde und Vorgaben für Lagerort / Sonstiger Text kommen aus den Profilen (dateimuster, watch_vorgaben)
+
+# Excel-Sperrdateien und halbe Kopien nicht anfassen
+WATCH_IGNORIEREN = ["~$*", "*.tmp", "*.part", ".*"]
+
+def detect_kunde(path: str | Path) -> str | None:
+    """
+    Kunde zur Eingabedatei: erst nach den Dateimustern der Profile (Reihenfolge = Auswahlnummer),
+    dann nach Inhalt – CSV → erster CSV-Kunde, Excel → erster Kunde, dessen Kopfzeile sich findet,
+    sonst der erste Kunde ohne Kopfzeile.
+    """
+    plaene = list(kunden_plaene().values())
+    name = Path(path).name.lower()
+    for plan in plaene:
+        if any(fnmatch.fnmatch(name, muster) for muster in plan.dateimuster):
+            return plan.kunde
+
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return next((plan.kunde for plan in plaene if plan.leser == "csv"), None)
+    if suffix in (".xlsx", ".xlsm"):
+        for plan in plaene:
+            if plan.leser != "excel_kopf":
+                continue
+            try:
+                find_header_row(path, list(plan.spalten))
+                return plan.kunde
+            except ValueError:
+                pass
+        return next((plan.kunde for plan in plaene if plan.leser == "excel_spalten"), None)
+    return None
+
+def _archive_name(archive_dir: Path, name: str) -> Path:
+    """Archivname mit Zeitstempel; gibt es ihn schon (gleiche Datei in derselben Sekunde), mit _2, _3, ..."""
+    stamp = f"{datetime.now():%Y%m%d-%H%M%S}"
+    target = archive_dir / f"{stamp}_{name}"
+    zaehler = 2
+    while target.exists():
+        target = archive_dir / f"{stamp}_{zaehler}_{name}"
+        zaehler += 1
+    return target
+
+def process_watched_file(path: Path, archive_dir: Path, error_dir: Path, args, kunde: str | None = None) -> bool:
+    """
+    Verarbeitet eine Datei aus dem Eingang; Eingabe + Ergebnis landen im Archiv, Fehler im Fehlerordner.
+    kunde ist der schon geprüfte Schlüssel aus --kunde, sonst wird er je Datei erkannt.
+    """
+    t0 = time.perf_counter()
+    try:
+        if kunde is None:
+            kunde = detect_kunde(path)
+        if kunde is None:
+            raise ValueError("Kunde nicht erkennbar")
+
+        vorgabe = kunden_plan(kunde).watch_vorgaben
+        lagerort = args.lagerort or vorgabe.get("lagerort", "")
+        sonstiger_text = args.sonstiger_text or vorgabe.get("sonstiger_text", "")
+
+        df = process_file(path, kunde, lagerort, sonstiger_text)
+        archived_input = _archive_name(archive_dir, path.name)
+        xlsx_path = archived_input.with_name(archived_input.stem + "_import.xlsx")
+        if args.incremental:
+            rows = write_outputs_incremental(df, kunde, OUTPUT_CSV, xlsx_path, args.zusatzzeile)
+        else:
+            rows = len(df)
+            write_outputs(df, OUTPUT_CSV, xlsx_path, args.zusatzzeile)
+        if rows:
+            shutil.copyfile(OUTPUT_CSV, archived_input.with_name(archived_input.stem + "_import.csv"))
+        shutil.move(str(path), str(archived_input))
+    except Exception as e:
+        print(Fore.RED + f"[Watch] {path.name}: {e}")
+        target = _archive_name(error_dir, path.name)
+        try:
+            shutil.move(str(path), str(target))
+            target.with_name(target.name + ".fehler.txt").write_text(f"{type(e).__name__}: {e}\n", encoding="utf-8")
+        except OSError as move_err:
+            print(Fore.RED + f"[Watch] {path.name} konnte nicht in den Fehlerordner verschoben werden: {move_err}")
+        return False
+
+    print(Fore.GREEN + f"[Watch] {path.name} ({kunde}): {rows} Zeilen in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    return True
+
+def warm_up(tag: str):
+    """Lädt pandas, die Excel-Engine und die Artikelzuordnung vorab (für dauerhaft laufende Modi)."""
+    pd.DataFrame()
+    importlib.import_module("python_calamine" if resolve_excel_reader() == "calamine" else "openpyxl")
+    filters = sorted({plan.artikelstamm for plan in kunden_plaene().values() if plan.artikelstamm})
+    if filters and Path("artikel.xlsx").exists():
+        wait_for_update()
+        try:
+            for kunde_filter in filters:
+                load_artikelmap_cached("artikel.xlsx", kunde_filter=kunde_filter)
+        except Exception as e:
+            print(Fore.YELLOW + f"[{tag}] artikel.xlsx konnte nicht vorgeladen werden: {e}")
+
+def run_watch(args) -> int:
+    """Überwacht einen Eingangsordner und verarbeitet neue Dateien, bis Strg+C gedrückt wird."""
+    inbox = Path(args.watch)
+    if not inbox.is_dir():
+        print(Fore.RED + f"[Watch] Eingangsordner nicht gefunden: {inbox}")
+        return 2
+    try:
+        kunde = resolve_kunde(args.kunde) if args.kunde else None
+    except ValueError as e:
+        print(Fore.RED + f"[Watch] {e}")
+        return 2
+    archive_dir = Path(args.archiv) if args.archiv else inbox / "archiv"
+    error_dir = archive_dir / "fehler"
+    error_dir.mkdir(parents=True, exist_ok=True)
+
+    # Module und Artikelzuordnung vorab laden, damit die erste Datei nicht darauf wartet
+    warm_up("Watch")
+
+    print(Fore.CYAN + f"[Watch] Überwache {inbox.resolve()} (alle {args.intervall:g}s, Strg+C beendet)")
+
+    # Eine Datei gilt als fertig kopiert, wenn Größe und Änderungszeit zwei Runden gleich bleiben
+    last_seen: dict[Path, tuple[int, int]] = {}
+    # Fehlgeschlagen und nicht verschiebbar (z.B. gesperrt): erst wieder versuchen, wenn sich die Datei ändert
+    liegen_geblieben: dict[Path, tuple[int, int]] = {}
+    try:
+        while True:
+            current = {}
+            for entry in os.scandir(inbox):
+                if not entry.is_file():
+                    continue
+                if any(fnmatch.fnmatch(entry.name, p) for p in WATCH_IGNORIEREN):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                current[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+
+            for path, signature in sorted(current.items()):
+                if last_seen.get(path) == signature and liegen_geblieben.get(path) != signature:
+                    if not process_watched_file(path, archive_dir, error_dir, args, kunde) and path.exists():
+                        liegen_geblieben[path] = signature
+            liegen_geblieben = {p: sig for p, sig in liegen_geblieben.items() if p in current}
+            last_seen = {p: sig for p, sig in current.items() if p.exists()}
+            time.sleep(args.intervall)
+    except KeyboardInterrupt:
+        print(Fore.YELLOW + "\n[Watch] Beendet.")
+    return 0
+
+# =====================================
+# Import-Dienst (lokaler HTTP-Server)
+# =====================================
+# POST /import?kunde=MB&lagerort=...&text=...&datei=Mappe1.xlsx  (Dateiinhalt als Body) → Import-CSV
+# GET  /status → Version und Anzahl bearbeiteter Anfragen (JSON)
+SERVER_PORT = 8765
+SERVER_MAX_BYTES = 200 * 1024 * 1024
+SERVER_ENDUNGEN = (".xlsx", ".xlsm", ".csv")
+
+def convert_file(path: str | Path, kunde: str | None = None, options: dict | None = None) -> tuple[str, pd.DataFrame]:
+    """Liest eine Eingabedatei und liefert (Kunde, fertige Import-Tabelle); ohne kunde wird er erkannt."""
+    kunde = resolve_kunde(kunde) if kunde else detect_kunde(path)
+    if kunde is None:
+        raise ValueError(f"Kunde für {Path(path).name} nicht erkennbar – bitte 'kunde' angeben (MB, NG oder NEF).")
+    return kunde, transform(read_input(path, kunde), kunde, options)
+
+def _make_import_handler():
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import parse_qs, urlparse
+
+    stats = {"anfragen": 0, "fehler": 0}
+    stats_lock = threading.Lock()
+
+    class ImportHandler(BaseHTTPRequestHandler):
+        server_version = f"UnivImport/{VERSION}"
+
+        def _reply(self, status: int, body: bytes, content_type: str, headers: dict | None = None):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, status: int, message: str):
+            with stats_lock:
+                stats["fehler"] += 1
+            self._reply(status, (message + "\n").encode("utf-8"), "text/plain; charset=utf-8")
+
+        def do_GET(self):
+            if urlparse(self.path).path != "/status":
+                return self._error(404, "Unbekannter Pfad – erlaubt: POST /import, GET /status")
+            with stats_lock:
+                body = json.dumps({"version": VERSION, **stats}).encode("utf-8")
+            self._reply(200, body, "application/json")
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != "/import":
+                return self._error(404, "Unbekannter Pfad – erlaubt: POST /import, GET /status")
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            name = Path(params.get("datei", "upload.xlsx")).name
+            if Path(name).suffix.lower() not in SERVER_ENDUNGEN:
+                return self._error(400, f"Dateityp nicht unterstützt: {name} (erlaubt: {', '.join(SERVER_ENDUNGEN)})")
+            length = int(self.headers.get("Content-Length") or 0)
+            if not 0 < length <= SERVER_MAX_BYTES:
+                return self._error(400 if length <= 0 else 413, "Dateiinhalt fehlt oder ist zu groß.")
+
+            t0 = time.perf_counter()
+            options = {"lagerort": params.get("lagerort", ""), "sonstiger_text": params.get("text", "")}
+            try:
+                with tempfile.TemporaryDirectory(prefix="univimport-") as tmp:
+                    path = Path(tmp) / name
+                    path.write_bytes(self.rfile.read(length))
+                    kunde, df = convert_file(path, params.get("kunde"), options)
+                body = csv_bytes(df)
+            except (ValueError, KeyError) as e:
+                return self._error(400, f"{type(e).__name__}: {e}")
+            except Exception as e:
+                return self._error(500, f"{type(e).__name__}: {e}")
+
+            with stats_lock:
+                stats["anfragen"] += 1
+            ms = (time.perf_counter() - t0) * 1000
+            # Body mit BOM wie die Datei – als Zeichensatz aber der registrierte Name "utf-8"
+            self._reply(200, body, "text/csv; charset=utf-8",
+                        {"X-Kunde": kunde, "X-Zeilen": str(len(df)), "X-Dauer-ms": f"{ms:.1f}"})
+
+        def log_message(self, format, *args):
+            print(Fore.CYAN + f"[Dienst] {self.address_string()} {format % args}")
+
+    return ImportHandler
+
+def run_server(args) -> int:
+    """Import-Dienst auf 127.0.0.1 – ein warmer Prozess, mehrere Anfragen gleichzeitig (je Anfrage ein Thread)."""
+    from http.server import ThreadingHTTPServer
+
+    warm_up("Dienst")
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", args.port), _make_import_handler())
+    except OSError as e:
+        print(Fore.RED + f"[Dienst] Port {args.port} nicht verfügbar: {e}")
+        return 2
+    server.daemon_threads = True
+    print(Fore.CYAN + f"[Dienst] Bereit auf http://127.0.0.1:{args.port} (POST /import, GET /status, Strg+C beendet)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(Fore.YELLOW + "\n[Dienst] Beendet.")
+    finally:
+        server.server_close()
+    return 0
+
+def parse_args(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="UnivImport",
+        description="Ohne Eingabedateien: interaktiver Dialog. Mit Eingabedateien und --kunde: Batch-Modus ohne "
+                    "Rückfragen. Mit Eingabedateien ohne --kunde: Dialog, alle Dateien werden zu einem Import zusammengeführt.",
+    )
+    parser.add_argument("dateien", nargs="*",
+                        help="Eingabedateien oder Muster, z.B. \"Mappe*.xlsx\" (mit --kunde: Batch-Modus, "
+                             "sonst im Dialog zusammenführen)")
+    parser.add_argument("-k", "--kunde", help="Kunde für Batch- und Watch-Modus: MB, NG oder NEF (Watch: sonst automatisch)")
+    parser.add_argument("--lagerort", default="", help="Lagerort für alle Zeilen")
+    parser.add_argument("--text", dest="sonstiger_text", default="",
+                        help="'Sonstiger Text' für alle Zeilen (MB/NG)")
+    parser.add_argument("--regeln", metavar="NAME",
+                        help=f"Batch: gespeicherte Auswahlregeln für Lagerort / Sonstiger Text anwenden (aus {REGEL_DATEI})")
+    parser.add_argument("--zusatzzeile", default="", help="Zusätzliche Kopfzeile in der Excel-Datei")
+    parser.add_argument("--merge", action="store_true",
+                        help=f"Batch: alle Dateien zu einer Ausgabe ({OUTPUT_XLSX} + Import-CSV) zusammenführen")
+    parser.add_argument("--duplikate", choices=DUPLIKATE_REGELN, default="letzte",
+                        help="LG IDs in mehreren Eingabedateien: letzte = zuletzt angegebene Datei gilt (Standard), "
+                             "summe = Mengen addieren")
+    parser.add_argument("--ausgabe-ordner", default=None,
+                        help="Zielordner für die Ausgaben je Datei (Standard: Ordner der Eingabedatei)")
+    parser.add_argument("-j", "--jobs", type=int, default=None,
+                        help="Anzahl paralleler Prozesse (Standard: Anzahl CPU-Kerne)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Batch: große Dateien blockweise mit begrenztem Speicher verarbeiten (siehe --speicher)")
+    parser.add_argument("--speicher", type=float, default=STREAM_MAX_MB, metavar="MB",
+                        help=f"Speichergrenze je Prozess für --stream in MB (Standard: {STREAM_MAX_MB}, mindestens {STREAM_MIN_MB})")
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"Nur neue oder geänderte Paletten ausgeben (Zustand in {STATE_DB} neben dem Script)")
+    parser.add_argument("--watch", metavar="ORDNER",
+                        help="Eingangsordner dauerhaft überwachen und neue Dateien automatisch verarbeiten")
+    parser.add_argument("--archiv", metavar="ORDNER",
+                        help="Archiv für verarbeitete Dateien im Watch-Modus (Standard: ORDNER/archiv)")
+    parser.add_argument("--intervall", type=float, default=2.0,
+                        help="Prüfintervall im Watch-Modus in Sekunden (Standard: 2)")
+    parser.add_argument("--server", action="store_true",
+                        help="Import-Dienst auf 127.0.0.1 starten (POST /import mit der Datei als Body → Import-CSV)")
+    parser.add_argument("--port", type=int, default=SERVER_PORT,
+                        help=f"Port für --server (Standard: {SERVER_PORT})")
+    parser.add_argument("--profile", action="store_true",
+                        help="Laufzeiten je Abschnitt am Ende als Tabelle ausgeben "
+                             "(im Batch-Modus nur der Hauptprozess, nicht die Worker-Prozesse je Datei)")
+    parser.add_argument("--profile-pstats", metavar="DATEI",
+                        help="zusätzlich cProfile-Daten (pstats) in DATEI schreiben")
+    parser.add_argument("--profile-trace", metavar="DATEI",
+                        help="zusätzlich JSON-Trace der Abschnitte in DATEI schreiben")
+    return parser.parse_args(argv)
+
+def run_profiled(args, func) -> int | None:
+    """Führt func() aus; mit --profile* werden danach Tabelle, pstats und Trace ausgegeben."""
+    profile = args.profile or args.profile_pstats or args.profile_trace
+    if not profile:
+        return func()
+
+    profiler = None
+    if args.profile_pstats:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        return func()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_pstats)
+            print(Fore.CYAN + f"[Profil] cProfile-Daten geschrieben nach: {args.profile_pstats} "
+                              f"(Auswertung: python -m pstats {args.profile_pstats})")
+        PROFILE.report()
+        if args.profile_trace:
+            PROFILE.write_trace(args.profile_trace)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.profile or args.profile_pstats or args.profile_trace:
+        PROFILE.enable()
+    print(Fore.GREEN + START_BANNER)
+    print(Fore.YELLOW + f"UnivImport Version {VERSION} mlu")
+    ensure_latest_version()
+    if args.server:
+        sys.exit(run_server(args))
+    if args.watch:
+        sys.exit(run_watch(args))
+    if args.dateien and args.kunde:
+        sys.exit(run_profiled(args, lambda: run_batch(args)))
+    input_files = expand_input_patterns(args.dateien) if args.dateien else None
+    run_profiled(args, lambda: main(incremental=args.incremental, input_files=input_files, duplikate=args.duplikate))
@@ -0,0 +1,850 @@
+"""
+Benchmarks für UnivImport.py (nur für die Entwicklung – wird nicht mit auf das Netzlaufwerk kopiert).
+
+Aufruf:
+    python bench_univimport.py mhd [--rows 200000] [--repeat 5]
+    python bench_univimport.py xlsx [--rows 50000] [--repeat 3]
+    python bench_univimport.py importtime [--top 15] [--repeat 5]
+    python bench_univimport.py excel [--rows 10k] [--kunden mb,ng] [--repeat 3]
+    python bench_univimport.py groupby [--rows 100k] [--kunde mb] [--repeat 3]
+    python bench_univimport.py stream [--rows 1m] [--kunden nef,mb] [--speicher 64,256]
+    python bench_univimport.py generate [--sizes 1k,10k,100k,1m] [--kunden mb,ng,nef]
+    python bench_univimport.py suite [--sizes 1k,10k] [--kunden mb,ng,nef] [--json ergebnis.json] [--baseline alt.json]
+
+Testdaten landen in bench_data/ und werden wiederverwendet (--neu erzeugt sie neu).
+"""
+import io
+import os
+import sys
+import json
+import time
+import contextlib
+import tracemalloc
+import argparse
+import random
+import tempfile
+import subprocess
+import importlib.util
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import UnivImport as ui
+
+
+def best_of(func, repeat: int) -> tuple[float, object]:
+    """Führt func repeat-mal aus und liefert die schnellste Laufzeit (Sekunden) und das letzte Ergebnis."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def print_table(rows: list[tuple], headers: tuple):
+    widths = [max(len(str(r[i])) for r in rows + [headers]) for i in range(len(headers))]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for r in rows:
+        print("  ".join(str(v).ljust(w) for v, w in zip(r, widths)))
+
+
+# =====================================
+# MHD
+# =====================================
+
+def make_mhd_column(rows: int, distinct: int = 60, seed: int = 1) -> pd.Series:
+    """MHD-Spalte wie aus Mappe1/NG: datetime, Excel-Seriennummer, Ziffern-Text und TT.MM.JJJJ gemischt."""
+    rnd = random.Random(seed)
+    base = datetime(2026, 1, 1)
+    pool = []
+    for i in range(distinct):
+        d = base + timedelta(days=7 * i)
+        serial = (d - datetime(1899, 12, 30)).days
+        pool.append(rnd.choice([d, serial, float(serial), str(serial), d.strftime("%d.%m.%Y")]))
+    pool.append(None)
+    return pd.Series([rnd.choice(pool) for _ in range(rows)], dtype=object)
+
+
+def legacy_mhd(mhd_raw: pd.Series) -> pd.Series:
+    """Bisheriger Weg aus main() (Version 2.2.7) – nur zum Vergleich."""
+    mhd_parsed = pd.to_datetime(mhd_raw, errors="coerce", dayfirst=True)
+
+    mask_num = mhd_raw.notna() & mhd_raw.apply(lambda x: isinstance(x, (int, float)))
+    if mask_num.any():
+        mhd_parsed.loc[mask_num] = pd.to_datetime(mhd_raw[mask_num].astype(float), unit="D", origin="1899-12-30")
+
+    mask_digit_str = mhd_raw.notna() & ~mask_num & mhd_raw.astype(str).str.fullmatch(r"\d+")
+    if mask_digit_str.any():
+        mhd_parsed.loc[mask_digit_str] = pd.to_datetime(mhd_raw[mask_digit_str].astype(float), unit="D", origin="1899-12-30")
+
+    return mhd_parsed.dt.strftime("%d.%m.%Y")
+
+
+def bench_mhd(args):
+    col = make_mhd_column(args.rows)
+    print(f"MHD: {len(col)} Zeilen, {col.nunique()} unterschiedliche Werte\n")
+
+    t_old, old = best_of(lambda: legacy_mhd(col), args.repeat)
+    t_new, new = best_of(lambda: ui.format_mhd(col), args.repeat)
+
+    mismatches = int((old.fillna("") != new.fillna("")).sum())
+    print_table(
+        [("bisher (3 Durchläufe)", f"{t_old * 1000:.1f}", "1.0x"),
+         ("format_mhd (eindeutige Werte)", f"{t_new * 1000:.1f}", f"{t_old / t_new:.1f}x")],
+        ("Variante", "ms", "Faktor"),
+    )
+    print(f"\nAbweichende Zeilen: {mismatches}")
+    return 1 if mismatches else 0
+
+
+# =====================================
+# Excel-Export
+# =====================================
+
+def make_output_frame(rows: int, seed: int = 1) -> pd.DataFrame:
+    """Fertige Import-Tabelle (Stand nach finalize) mit MB-Spalten."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Nr.": np.arange(1, rows + 1),
+        "Artikel-Nr.": "MB " + pd.Series(rng.integers(1, 999_999, rows)).astype(str).str.zfill(6),
+        "Artikelbezeichnung": pd.Series(rng.integers(0, 500, rows)).map(lambda i: f"Artikel {i} Marzipan Brot"),
+        "LG ID": rng.integers(10**9, 10**10, rows),
+        "Charge": pd.Series(rng.integers(1000, 9999, rows)).astype(str),
+        "Menge PS": rng.integers(1, 200, rows),
+        "Einheit": rng.choice(["Karton", "UMK", "BigBag"], rows),
+        "Lademittel": rng.choice(["Euro", "H1", "Industrie", ""], rows),
+        "MHD": rng.choice(["31.12.2026", "15.04.2026", "01.01.2027"], rows),
+        "Gewicht kg": pd.Series(rng.integers(100, 99_999, rows) / 10).astype(str).str.replace(".", ",", regex=False),
+        "Lagerort": "",
+        "Sonstiger Text": "",
+    })
+
+
+def legacy_write_xlsx(df: pd.DataFrame, path: str, extra_excel_line: str = ""):
+    """Bisheriger Weg aus main() (Version 2.2.7) – nur zum Vergleich."""
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.properties import PageSetupProperties
+
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        sheet_name = "Ruecktour"
+
+        start_row = 2 if extra_excel_line else 0
+        df.to_excel(writer, sheet_name=sheet_name, index=False, startrow=start_row)
+
+        wb = writer.book
+        ws = writer.sheets[sheet_name]
+
+        if extra_excel_line:
+            ws.cell(row=1, column=1, value=extra_excel_line)
+
+        if not wb.worksheets:
+            wb.create_sheet(title=sheet_name)
+        if all(sh.sheet_state != "visible" for sh in wb.worksheets):
+            wb.worksheets[0].sheet_state = "visible"
+
+        max_row = ws.max_row
+        max_col = ws.max_column
+        last_col_letter = get_column_letter(max_col)
+
+        ws.print_area = f"A1:{last_col_letter}{max_row}"
+
+        ws.page_setup.orientation = "landscape"
+        ws.page_setup.fitToWidth = 1
+        ws.page_setup.fitToHeight = 1
+        ws.sheet_properties.pageSetUpPr = PageSetupProperties(fitToPage=True)
+
+        ws.page_margins.left = 0.3
+        ws.page_margins.right = 0.3
+        ws.page_margins.top = 0.5
+        ws.page_margins.bottom = 0.5
+
+        for col_idx, column_cells in enumerate(ws.columns, start=1):
+            max_length = max((len(str(cell.value)) for cell in column_cells), default=10)
+            adjusted_width = min(max_length + 2, 25)
+            ws.column_dimensions[get_column_letter(col_idx)].width = adjusted_width
+
+
+def bench_xlsx(args):
+    df = make_output_frame(args.rows)
+    print(f"Excel-Export: {len(df)} Zeilen x {len(df.columns)} Spalten\n")
+
+    variants = [("bisher (ExcelWriter + Zellschleife)", lambda p: legacy_write_xlsx(df, p, "Kopfzeile"))]
+    for engine in ui.XLSX_ENGINES:
+        if importlib.util.find_spec(engine) is None:
+            print(f"({engine} nicht installiert – übersprungen)")
+            continue
+        variants.append((f"write_xlsx engine={engine}", lambda p, e=engine: ui.write_xlsx(df, p, "Kopfzeile", engine=e)))
+
+    rows = []
+    t_ref = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, func in variants:
+            path = os.path.join(tmp, "bench.xlsx")
+            t, _ = best_of(lambda: func(path), args.repeat)
+            t_ref = t_ref or t
+            rows.append((label, f"{t * 1000:.0f}", f"{t_ref / t:.1f}x", f"{os.path.getsize(path) / 1024:.0f}"))
+    print()
+    print_table(rows, ("Variante", "ms", "Faktor", "KB"))
+    return 0
+
+
+# =====================================
+# Startzeit
+# =====================================
+SCRIPT_DIR = os.path.dirname(os.path.abspath(ui.__file__))
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """Zeilen aus '-X importtime' → (self_us, cumulative_us, modul)."""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        entries.append((int(self_us), int(cum_us), name.rstrip()))
+    return entries
+
+
+def bench_importtime(args):
+    # 1) Import des Scripts aufgeschlüsselt nach Modulen
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import UnivImport"],
+        cwd=SCRIPT_DIR, capture_output=True, text=True,
+    )
+    entries = parse_importtime(proc.stderr)
+    total = next((cum for _, cum, name in entries if name.strip() == "UnivImport"), 0)
+    heavy = [e for e in entries if e[2].strip().split(".")[0] in ("pandas", "numpy", "openpyxl")]
+
+    print(f"import UnivImport: {total / 1000:.1f} ms (pandas/numpy/openpyxl geladen: {'ja' if heavy else 'nein'})\n")
+    top = sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]
+    print_table([(name, f"{cum / 1000:.1f}", f"{self_us / 1000:.1f}") for self_us, cum, name in top],
+                ("Modul", "kumuliert ms", "selbst ms"))
+
+    # 2) Start bis zur Kundenauswahl: Script starten und sofort "0 = BEENDEN" wählen
+    def start_to_prompt():
+        subprocess.run([sys.executable, os.path.join(SCRIPT_DIR, "UnivImport.py")], input="0\n",
+                       cwd=SCRIPT_DIR, capture_output=True, text=True)
+
+    t_prompt, _ = best_of(start_to_prompt, args.repeat)
+
+    def import_pandas():
+        subprocess.run([sys.executable, "-c", "import pandas, openpyxl"], capture_output=True)
+
+    t_pandas, _ = best_of(import_pandas, args.repeat)
+    print()
+    print_table([("Start → Kundenauswahl (inkl. Update-Check)", f"{t_prompt * 1000:.0f}"),
+                 ("zum Vergleich: python -c 'import pandas, openpyxl'", f"{t_pandas * 1000:.0f}")],
+                ("Messung", "ms"))
+    return 0
+
+
+# =====================================
+# Synthetische Eingabedateien
+# =====================================
+DATA_DIR = os.path.join(SCRIPT_DIR, "bench_data")
+SIZE_UNITS = {"k": 1_000, "m": 1_000_000}
+INPUT_NAMES = {"standard": "Mappe1", "ng": "NG", "nef": "NEF"}
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    if text and text[-1] in SIZE_UNITS:
+        return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+    return int(text)
+
+
+def size_label(rows: int) -> str:
+    if rows >= 1_000_000 and rows % 1_000_000 == 0:
+        return f"{rows // 1_000_000}m"
+    if rows >= 1_000 and rows % 1_000 == 0:
+        return f"{rows // 1_000}k"
+    return str(rows)
+
+
+def input_path(kunde: str, rows: int) -> str:
+    ext = ".csv" if kunde == "nef" else ".xlsx"
+    return os.path.join(DATA_DIR, f"{INPUT_NAMES[kunde]}_{size_label(rows)}{ext}")
+
+
+def _xlsx_sheet_writer(path: str):
+    """Minimaler Zeilen-Schreiber (xlsxwriter falls installiert, sonst openpyxl write-only)."""
+    if importlib.util.find_spec("xlsxwriter") is not None:
+        import xlsxwriter
+
+        wb = xlsxwriter.Workbook(path, {"constant_memory": True})
+        ws = wb.add_worksheet("Tabelle1")
+        date_format = wb.add_format({"num_format": "dd.mm.yyyy"})
+        row_no = [0]
+
+        def append(values):
+            for col, v in enumerate(values):
+                if isinstance(v, datetime):
+                    ws.write_datetime(row_no[0], col, v, date_format)
+                elif v is not None:
+                    ws.write(row_no[0], col, v)
+            row_no[0] += 1
+
+        return append, wb.close
+
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Tabelle1")
+    return ws.append, lambda: wb.save(path)
+
+
+def _pallets(rows: int, rnd: random.Random):
+    """LG IDs wie im Lager: 1–3 Zeilen je Palette, fortlaufend mit Lücken."""
+    lg = 340_000_000
+    left = 0
+    for _ in range(rows):
+        if left == 0:
+            lg += rnd.randint(1, 5)
+            left = rnd.choice([1, 1, 2, 3])
+        left -= 1
+        yield lg
+
+
+def _mhd_date(rnd: random.Random) -> datetime:
+    return datetime(2026, 1, 1) + timedelta(days=rnd.randrange(0, 720, 7))
+
+
+def _mhd_value(rnd: random.Random):
+    """MHD wie in Excel-Exporten: meist Datum, teils Seriennummer oder Text."""
+    d = _mhd_date(rnd)
+    kind = rnd.random()
+    if kind < 0.7:
+        return d
+    if kind < 0.85:
+        return (d - datetime(1899, 12, 30)).days
+    return d.strftime("%d.%m.%Y")
+
+
+def _gewicht_value(rnd: random.Random):
+    kg = rnd.randint(50, 120_000) / 10
+    if rnd.random() < 0.6:
+        return kg
+    text = f"{kg:,.1f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return text + (" kg" if rnd.random() < 0.5 else "")
+
+
+def generate_mappe(path: str, rows: int, seed: int = 1):
+    """Mappe1.xlsx: Vorspann, Kopfzeile mit Zusatzspalten, Datenzeilen, Summenzeile."""
+    rnd = random.Random(seed)
+    append, close = _xlsx_sheet_writer(path)
+    append(["Bestandsliste Lager 3/4"])
+    append(["Stand:", datetime(2026, 1, 15)])
+    append(["Filter:", "Mandant MB, alle Lagerorte"])
+    append([])
+    append(["Erstellt von", "WMS-Export"])
+    append([])
+    append(["Pos", "Lagerplatz", "Artikelnummer", "Benennung", "LHM-Nr.", "Charge", "Menge", "Einheit",
+            "Stelltyp", "MHD", "Gesamtgewicht", "Bemerkung", "Bemerkung 2"])
+    articles = [str(rnd.randint(1, 99_999)) for _ in range(400)]
+    for i, lg in enumerate(_pallets(rows, rnd), start=1):
+        art = rnd.choice(articles)
+        append([
+            i, f"L{rnd.randint(1, 40):02d}-{rnd.randint(1, 99):02d}", art, f"Artikel {art} Marzipan",
+            lg, rnd.choice([23011, 23012, "23013", 24001]), rnd.randint(1, 120),
+            rnd.choice(["Karton", "Karton", "Container", "Stück"]),
+            rnd.choice(["Europalette", "EURO-Pal.", "H1 Kunststoff", "Industriepalette", ""]),
+            _mhd_value(rnd), _gewicht_value(rnd), rnd.choice(["", "", "Kommentar " * 5]), "",
+        ])
+    append([])
+    append(["Summe", None, None, None, None, None, rows])
+    close()
+
+
+def generate_ng(path: str, rows: int, seed: int = 2):
+    """NG.xlsx: ohne Kopfzeile, Spalten 0/1/5/6/7 = Artikel, Gewicht, MHD, Charge, LG ID."""
+    rnd = random.Random(seed)
+    append, close = _xlsx_sheet_writer(path)
+    articles = [f"{10_030_000 + i}" + rnd.choice([".112", ".1", ""]) for i in range(200)]
+    for lg in _pallets(rows, rnd):
+        append([
+            rnd.choice(articles), _gewicht_value(rnd), "BigBag", rnd.choice(["A", "B"]), None,
+            _mhd_value(rnd), rnd.choice([111, 222, "333"]), lg, "Kommentar " * rnd.randint(0, 6),
+        ])
+    close()
+
+
+def generate_artikel(path: str, seed: int = 2):
+    """artikel.xlsx passend zu generate_ng (plus Einträge anderer Kunden)."""
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(200):
+        rows.append({"Match": f"{10_030_000 + i}.112", "Bezeichnung": f"NG Rohstoff {i}", "Kunde": "NG"})
+        rows.append({"Match": f"{20_000 + i}", "Bezeichnung": f"MB Artikel {i}", "Kunde": "MB"})
+    rnd.shuffle(rows)
+    pd.DataFrame(rows).to_excel(path, index=False)
+
+
+def generate_nef(path: str, rows: int, seed: int = 3):
+    """NEF.csv: cp1252, Trenner ';', Gewichte mit Dezimalkomma."""
+    rnd = random.Random(seed)
+    names = ["Marzipanbrot", "Nougat-Würfel", "Mozartkugeln", "Lübecker Herzen", "Krokant groß"]
+    with open(path, "w", encoding="cp1252", newline="") as f:
+        f.write("LG ID;Artikel-Nr.;Artikelbezeichnung;Menge Kart.;MHD;Charge;Bruttogewicht kg\r\n")
+        for lg in _pallets(rows, rnd):
+            art = rnd.randint(1000, 1400)
+            f.write(
+                f"{lg};{art};{rnd.choice(names)} {art % 7};{rnd.randint(1, 96)};"
+                f"{_mhd_date(rnd).strftime('%d.%m.%Y') if rnd.random() < 0.98 else ''};"
+                f"{rnd.randint(1, 99)};{_gewicht_value(rnd)}\r\n"
+            )
+
+
+GENERATORS = {"standard": generate_mappe, "ng": generate_ng, "nef": generate_nef}
+
+
+def ensure_inputs(kunden: list[str], sizes: list[int], regenerate: bool = False):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    artikel_path = os.path.join(DATA_DIR, "artikel.xlsx")
+    if regenerate or not os.path.exists(artikel_path):
+        generate_artikel(artikel_path)
+    for kunde in kunden:
+        for rows in sizes:
+            path = input_path(kunde, rows)
+            if regenerate or not os.path.exists(path):
+                # erst unter Zwischennamen erzeugen – ein abgebrochener Lauf hinterlässt keine halbe Datei
+                base, ext = os.path.splitext(path)
+                tmp_path = base + ".tmp" + ext
+                t0 = time.perf_counter()
+                GENERATORS[kunde](tmp_path, rows)
+                os.replace(tmp_path, path)
+                print(f"  erzeugt: {os.path.basename(path)} ({time.perf_counter() - t0:.1f}s)")
+
+
+def parse_kunden(text: str) -> list[str]:
+    return [ui.resolve_kunde(k) for k in text.split(",") if k.strip()]
+
+
+def bench_generate(args):
+    ensure_inputs(parse_kunden(args.kunden), [parse_size(x) for x in args.sizes.split(",")], regenerate=args.neu)
+    return 0
+
+
+# =====================================
+# Stufen-Benchmark der Pipeline
+# =====================================
+STAGES = ["header", "read", "normalize", "groupby", "finalize", "csv", "xlsx"]
+
+
+def run_pipeline_stages(kunde: str, path: str, out_dir: str, measure_memory: bool) -> dict:
+    """Führt die Pipeline Stufe für Stufe aus. Rückgabe: {stufe: (sekunden, peak_mb | None)}."""
+    results = {}
+
+    def stage(name, func):
+        if measure_memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            value = func()
+        elapsed = time.perf_counter() - t0
+        peak = (tracemalloc.get_traced_memory()[1] - base) / 2**20 if measure_memory else None
+        results[name] = (elapsed, peak)
+        return value
+
+    if kunde == "standard":
+        stage("header", lambda: ui.find_header_row(path, ui.columns_to_keep))
+    df = stage("read", lambda: ui.read_input(path, kunde))
+    df = stage("normalize", lambda: ui.normalize(df, kunde))
+    df = stage("groupby", lambda: ui.group_by_lg(df, kunde))
+
+    def finalize():
+        out = df.copy()
+        out["Lagerort"] = ""
+        out["Sonstiger Text"] = ""
+        return ui.finalize(ui.apply_prefix(out, kunde), kunde)
+
+    df = stage("finalize", finalize)
+    stage("csv", lambda: ui.write_csv(df, os.path.join(out_dir, "import.csv")))
+    stage("xlsx", lambda: ui.write_xlsx(df, os.path.join(out_dir, "import.xlsx")))
+    results["rows_out"] = len(df)
+    return results
+
+
+def bench_suite(args):
+    kunden = parse_kunden(args.kunden)
+    sizes = [parse_size(x) for x in args.sizes.split(",")]
+    ensure_inputs(kunden, sizes, regenerate=args.neu)
+    json_path = os.path.abspath(args.json) if args.json else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    # read_input sucht artikel.xlsx im aktuellen Verzeichnis
+    os.chdir(DATA_DIR)
+    # Importkosten nicht der ersten Stufe anrechnen
+    import openpyxl  # noqa: F401
+    ui.pd.DataFrame()
+    report = []
+    for kunde in kunden:
+        for rows in sizes:
+            path = input_path(kunde, rows)
+            with tempfile.TemporaryDirectory() as out_dir:
+                timings = run_pipeline_stages(kunde, path, out_dir, measure_memory=False)
+                memory = {}
+                if not args.ohne_speicher:
+                    tracemalloc.start()
+                    try:
+                        memory = run_pipeline_stages(kunde, path, out_dir, measure_memory=True)
+                    finally:
+                        tracemalloc.stop()
+            for name in STAGES:
+                if name not in timings:
+                    continue
+                peak = memory.get(name, (None, None))[1]
+                report.append({
+                    "kunde": kunde, "rows": rows, "stage": name,
+                    "ms": round(timings[name][0] * 1000, 1),
+                    "peak_mb": None if peak is None else round(peak, 1),
+                })
+            print(f"{kunde:>8} {size_label(rows):>5}: {timings['rows_out']} Paletten")
+
+    baseline = {}
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = {(r["kunde"], r["rows"], r["stage"]): r for r in json.load(f)}
+
+    table = []
+    regressions = 0
+    for r in report:
+        old = baseline.get((r["kunde"], r["rows"], r["stage"]))
+        delta = ""
+        if old and old["ms"] > 0:
+            change = (r["ms"] - old["ms"]) / old["ms"]
+            delta = f"{change:+.0%}"
+            # kleine Stufen schwanken stark – erst ab 50 ms werten
+            if change > args.toleranz and r["ms"] >= 50:
+                delta += " !"
+                regressions += 1
+        table.append((r["kunde"], size_label(r["rows"]), r["stage"], f"{r['ms']:.1f}",
+                      "" if r["peak_mb"] is None else f"{r['peak_mb']:.1f}", delta))
+    print()
+    print_table(table, ("Kunde", "Zeilen", "Stufe", "ms", "Peak MB", "vs. Basis"))
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    if regressions:
+        print(f"\n{regressions} Stufe(n) mehr als {args.toleranz:.0%} langsamer als die Basis.")
+        return 1
+    return 0
+
+
+# =====================================
+# Excel-Einlesen je Engine
+# =====================================
+
+def bench_excel(args):
+    kunden = parse_kunden(args.kunden)
+    ensure_inputs(kunden, [args.rows])
+    os.chdir(DATA_DIR)
+    # openpyxl zuerst – Bezug für Faktor und Datenvergleich; xml ist eingebaut und braucht kein Paket
+    needs = {"calamine": "python_calamine"}
+    engines = ["openpyxl"]
+    for e in ui.EXCEL_READERS:
+        if e == "openpyxl":
+            continue
+        if e in needs and importlib.util.find_spec(needs[e]) is None:
+            print(f"({e} nicht installiert – übersprungen)")
+            continue
+        engines.append(e)
+
+    rows = []
+    mismatches = 0
+    for kunde in kunden:
+        if kunde == "nef":
+            continue  # CSV
+        path = input_path(kunde, args.rows)
+        reference = None
+        t_ref = None
+        for engine in engines:
+            ui.EXCEL_READER = engine
+            with contextlib.redirect_stdout(io.StringIO()):
+                t, df = best_of(lambda: ui.read_input(path, kunde), args.repeat)
+            if reference is None:
+                reference, t_ref = df, t
+            same = df.equals(reference)
+            mismatches += not same
+            rows.append((kunde, engine, f"{t * 1000:.0f}", f"{t_ref / t:.1f}x", "ja" if same else "NEIN"))
+
+        # Artikelstamm (NG) läuft über pd.read_excel mit derselben Engine
+        if kunde == "ng":
+            reference = None
+            for engine in engines:
+                ui.EXCEL_READER = engine
+                t, artikel = best_of(lambda: ui.load_artikelmap_from_excel_fuzzy("artikel.xlsx", "NG"), args.repeat)
+                if reference is None:
+                    reference, t_ref = artikel, t
+                same = artikel == reference
+                mismatches += not same
+                rows.append(("artikel", engine, f"{t * 1000:.0f}", f"{t_ref / t:.1f}x", "ja" if same else "NEIN"))
+    ui.EXCEL_READER = "auto"
+
+    print(f"Excel einlesen: {size_label(args.rows)} Zeilen, bester von {args.repeat} Läufen\n")
+    print_table(rows, ("Eingabe", "Engine", "ms", "Faktor", "gleich"))
+    return 1 if mismatches else 0
+
+
+# =====================================
+# Gruppierung je LG ID
+# =====================================
+
+def legacy_aggregate(df: pd.DataFrame, kunde: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Bisheriger Weg (Version 2.2.7): zeilenweises Parsen, object-Spalten, sortiertes groupby auf der
+    rohen LHM-Nr., LG ID erst danach als int. Rückgabe: (gruppiert, normalisiert)"""
+    # read_input liefert seit den Kundenprofilen schon die Zielnamen – zurück auf die Originalüberschriften
+    df = df.rename(columns={ziel: quelle for quelle, ziel in ui.rename_map.items()})
+    df = df[ui.columns_to_keep].dropna(how="all")
+    art_raw = df["Artikelnummer"].astype(str).str.strip()
+    mask_art = art_raw.str.fullmatch(r"\d+(?:\.\d+)?" if kunde == "ng" else r"\d+")
+    df = df[mask_art].copy()
+    df["Artikelnummer"] = art_raw[mask_art]
+    df["MHD"] = legacy_mhd(df["MHD"])
+    df = df.rename(columns=ui.rename_map)
+    df["Einheit"] = df["Einheit"].apply(lambda x: "UMK" if isinstance(x, str) and x.strip().lower() == "container" else x)
+    df["Lademittel"] = df["Lademittel"].apply(ui.map_lademittel)
+    df["Menge PS"] = pd.to_numeric(df["Menge PS"], errors="coerce").fillna(0)
+
+    gewicht_raw = df["Gewicht kg"].astype(str).str.strip()
+    gewicht_raw = gewicht_raw.str.replace(r"[^0-9,\.]", "", regex=True)
+    gewicht_raw = gewicht_raw.str.replace(r"\.(?=[0-9]{3}(?:$|,))", "", regex=True)
+    gewicht_raw = gewicht_raw.str.replace(",", ".", regex=False)
+    df["Gewicht kg"] = pd.to_numeric(gewicht_raw, errors="coerce").fillna(0)
+
+    grouped = df.groupby("LG ID", as_index=False).agg({
+        "Artikel-Nr.": "first", "Artikelbezeichnung": "first", "Charge": "first", "Menge PS": "sum",
+        "Einheit": "first", "Lademittel": "first", "MHD": "first", "Gewicht kg": "sum",
+    })
+    grouped["Artikel-Nr."] = grouped["Artikel-Nr."].astype(str).str.strip()
+    if kunde == "standard":
+        grouped["Artikel-Nr."] = grouped["Artikel-Nr."].str.zfill(6)
+    grouped["LG ID"] = pd.to_numeric(grouped["LG ID"], errors="coerce").fillna(0).astype(int)
+    grouped["Menge PS"] = grouped["Menge PS"].fillna(0).astype(int)
+    grouped["Charge"] = pd.to_numeric(grouped["Charge"], errors="coerce").fillna(0).astype(int).astype(str)
+    grouped["Gewicht kg"] = grouped["Gewicht kg"].round(2)
+    return grouped, df
+
+
+def _comparable(grouped: pd.DataFrame, columns) -> pd.DataFrame:
+    """Gruppierte Zeilen unabhängig von der Reihenfolge vergleichbar (mehrere Paletten können LG ID 0 haben)."""
+    text = grouped[list(columns)].astype(str)
+    return text.sort_values(list(columns)).reset_index(drop=True)
+
+
+def groupby_regression() -> int:
+    """Feste Fälle: nicht-numerische LHM-Nr. bleiben eigene Paletten, Zeilen ohne LHM-Nr. entfallen."""
+    raw = pd.DataFrame({
+        "Artikel-Nr.": ["100", "100", "100", "200", "200", "300"],
+        "Artikelbezeichnung": ["Marzipan"] * 6,
+        "LG ID": ["PAL-1", "PAL-2", None, 340000001, 340000001, float("nan")],
+        "Charge": [23011] * 6,
+        "Menge PS": [5, 7, 9, 2, 3, 4],
+        "Einheit": ["Karton"] * 6,
+        "Lademittel": ["Europalette"] * 6,
+        "MHD": ["31.12.2026"] * 6,
+        "Gewicht kg": ["1,5", "2,5", "1", "1", "1", "1"],
+    })
+    old = legacy_aggregate(raw, "standard")[0]
+    new = ui.group_by_lg(ui.normalize(raw, "standard"), "standard")
+    old, new = _comparable(old, old.columns), _comparable(new, old.columns)
+    ok = len(old) == len(new) == 3 and old.equals(new)
+    print(f"Regression LHM-Nr. (PAL-1/PAL-2/fehlend): {'ok' if ok else 'ABWEICHUNG'}")
+    if not ok:
+        print(old.to_string(), new.to_string(), sep="\n\n")
+    return 0 if ok else 1
+
+
+def bench_groupby(args):
+    kunde = ui.resolve_kunde(args.kunde)
+    ensure_inputs([kunde], [args.rows])
+    os.chdir(DATA_DIR)
+    with contextlib.redirect_stdout(io.StringIO()):
+        raw = ui.read_input(input_path(kunde, args.rows), kunde)
+    print(f"Gruppierung {kunde}: {len(raw)} Zeilen\n")
+
+    def legacy():
+        return legacy_aggregate(raw, kunde)
+
+    def current():
+        normalized = ui.normalize(raw, kunde)
+        return ui.group_by_lg(normalized, kunde), normalized
+
+    rows = []
+    results = []
+    t_ref = None
+    for label, func in [("bisher (object, sortiert)", legacy), ("kompakte Typen, unsortiert", current)]:
+        t, (grouped, normalized) = best_of(func, args.repeat)
+        # Peak getrennt messen – tracemalloc bremst die Zeitmessung
+        tracemalloc.start()
+        try:
+            func()
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+        frame_mb = normalized.memory_usage(deep=True).sum() / 2**20
+        t_ref = t_ref or t
+        rows.append((label, f"{t * 1000:.1f}", f"{t_ref / t:.1f}x", f"{peak:.1f}", f"{frame_mb:.1f}"))
+        results.append(grouped)
+    print_table(rows, ("Variante", "ms", "Faktor", "Peak MB", "Tabelle MB"))
+
+    old, new = results
+    old, new = _comparable(old, old.columns), _comparable(new, old.columns)
+    mismatches = int((old != new).any(axis=1).sum()) if len(old) == len(new) else -1
+    print(f"\nAbweichende Paletten: {mismatches}")
+    return 1 if mismatches or groupby_regression() else 0
+
+
+# =====================================
+# Streaming: Spitzenspeicher gegen --speicher
+# =====================================
+
+# Läuft in einem eigenen Prozess: ru_maxrss ist ein Höchststand und lässt sich nicht zurücksetzen
+STREAM_CHILD = r"""
+import contextlib, io, json, resource, sys, time
+sys.path.insert(0, {script_dir!r})
+import UnivImport as ui
+
+def rss_mb():
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r / 2**20 if sys.platform == "darwin" else r / 1024
+
+def current_mb():
+    # aktueller Stand statt Höchststand: Spitzen beim Importieren zählen sonst zur Basis
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        return rss_mb()
+
+# Aufwärmlauf mit der kleinen Datei: Module, Thread-Pools und Artikelzuordnung sind danach geladen –
+# gemessen wird nur, was die Daten kosten
+with contextlib.redirect_stdout(io.StringIO()):
+    if {max_mb!r}:
+        ui.process_file_streaming({warm_path!r}, {kunde!r}, {csv!r}, {xlsx!r}, max_mb={max_mb!r})
+    else:
+        ui.write_outputs(ui.process_file({warm_path!r}, {kunde!r}), {csv!r}, {xlsx!r})
+base = current_mb()
+
+t0 = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    if {max_mb!r}:
+        rows = ui.process_file_streaming({path!r}, {kunde!r}, {csv!r}, {xlsx!r}, max_mb={max_mb!r})
+    else:
+        df = ui.process_file({path!r}, {kunde!r})
+        ui.write_outputs(df, {csv!r}, {xlsx!r})
+        rows = len(df)
+print(json.dumps({{"base": base, "peak": rss_mb(), "sekunden": time.perf_counter() - t0, "rows": rows}}))
+"""
+
+
+def run_stream_child(kunde: str, path: str, warm_path: str, out_dir: str, max_mb: float | None) -> dict:
+    name = f"stream_{max_mb:g}" if max_mb else "komplett"
+    code = STREAM_CHILD.format(script_dir=SCRIPT_DIR, kunde=kunde, path=path, warm_path=warm_path, max_mb=max_mb,
+                               csv=os.path.join(out_dir, name + ".csv"), xlsx=os.path.join(out_dir, name + ".xlsx"))
+    proc = subprocess.run([sys.executable, "-c", code], cwd=DATA_DIR, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{kunde} {name}: {proc.stderr.strip().splitlines()[-1]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["csv"] = os.path.join(out_dir, name + ".csv")
+    return result
+
+
+def bench_stream(args):
+    if importlib.util.find_spec("resource") is None:
+        print("Spitzenspeicher wird über resource.getrusage gemessen – unter Windows nicht verfügbar.")
+        return 2
+    kunden = parse_kunden(args.kunden)
+    warm_rows = parse_size("1k")
+    ensure_inputs(kunden, [args.rows, warm_rows])
+    limits = [float(x) for x in args.speicher.split(",")]
+
+    rows = []
+    failed = 0
+    for kunde in kunden:
+        path = input_path(kunde, args.rows)
+        warm_path = input_path(kunde, warm_rows)
+        with tempfile.TemporaryDirectory() as out_dir:
+            ref = run_stream_child(kunde, path, warm_path, out_dir, None)
+            rows.append((kunde, size_label(args.rows), "komplett", f"{ref['sekunden']:.1f}",
+                         f"{ref['peak'] - ref['base']:.0f}", "", ""))
+            with open(ref["csv"], "rb") as f:
+                expected = f.read()
+            for limit in limits:
+                r = run_stream_child(kunde, path, warm_path, out_dir, limit)
+                used = r["peak"] - r["base"]
+                with open(r["csv"], "rb") as f:
+                    same = f.read() == expected
+                ok = same and used <= max(limit, ui.STREAM_MIN_MB)  # darunter hebt --stream die Grenze an
+                failed += not ok
+                rows.append((kunde, size_label(args.rows), f"--stream --speicher {limit:g}", f"{r['sekunden']:.1f}",
+                             f"{used:.0f}", "ja" if same else "NEIN", "ok" if ok else "ÜBER" if same else "FEHLER"))
+    print_table(rows, ("Kunde", "Zeilen", "Variante", "s", "Peak MB", "CSV gleich", "Grenze"))
+    print("\nPeak MB = Höchststand RSS über dem aktuellen Stand nach einem Aufwärmlauf mit 1k Zeilen.")
+    return 1 if failed else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks für UnivImport.py")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("mhd", help="MHD-Parsing: bisheriger Weg gegen format_mhd")
+    p.add_argument("--rows", type=int, default=200_000)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_mhd)
+
+    p = sub.add_parser("xlsx", help="Excel-Export: bisheriger Weg gegen write_xlsx je Engine")
+    p.add_argument("--rows", type=int, default=50_000)
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_xlsx)
+
+    p = sub.add_parser("importtime", help="Startzeit: Import-Aufschlüsselung und Zeit bis zur Kundenauswahl")
+    p.add_argument("--top", type=int, default=15)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_importtime)
+
+    p = sub.add_parser("excel", help="Excel-Eingaben einlesen: openpyxl gegen calamine (Zeit + gleiche Daten)")
+    p.add_argument("--rows", type=parse_size, default=parse_size("10k"))
+    p.add_argument("--kunden", default="mb,ng")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_excel)
+
+    p = sub.add_parser("groupby", help="Normalisieren + Gruppieren je LG ID: bisher gegen kompakte Typen (Zeit + Peak)")
+    p.add_argument("--rows", type=parse_size, default=parse_size("100k"))
+    p.add_argument("--kunde", default="mb")
+    p.add_argument("--repeat", type=int, default=3)
+    p.set_defaults(func=bench_groupby)
+
+    p = sub.add_parser("stream", help="Streaming: Spitzenspeicher je --speicher gegen die komplette Verarbeitung")
+    p.add_argument("--rows", type=parse_size, default=parse_size("1m"))
+    p.add_argument("--kunden", default="nef,mb")
+    p.add_argument("--speicher", default="64,256", help="Speichergrenzen in MB, z.B. 64,256")
+    p.set_defaults(func=bench_stream)
+
+    p = sub.add_parser("generate", help="Synthetische Mappe1/NG/NEF-Dateien erzeugen")
+    p.add_argument("--sizes", default="1k,10k,100k,1m", help="Zeilenzahlen, z.B. 1k,10k,100k,1m")
+    p.add_argument("--kunden", default="mb,ng,nef")
+    p.add_argument("--neu", action="store_true", help="vorhandene Dateien neu erzeugen")
+    p.set_defaults(func=bench_generate)
+
+    p = sub.add_parser("suite", help="Alle Pipeline-Stufen je Kunde und Größe messen (Zeit + Peak-Speicher)")
+    p.add_argument("--sizes", default="1k,10k,100k")
+    p.add_argument("--kunden", default="mb,ng,nef")
+    p.add_argument("--neu", action="store_true", help="Testdaten neu erzeugen")
+    p.add_argument("--ohne-speicher", action="store_true", help="keinen zweiten Lauf mit tracemalloc")
+    p.add_argument("--json", help="Ergebnisse als JSON speichern (z.B. als spätere Basis)")
+    p.add_argument("--baseline", help="JSON eines früheren Laufs zum Vergleich")
+    p.add_argument("--toleranz", type=float, default=0.2, help="erlaubte Verlangsamung ggü. Basis (0.2 = 20%%)")
+    p.set_defaults(func=bench_suite)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())